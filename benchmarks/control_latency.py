@@ -0,0 +1,122 @@
+"""Measure how long volume and mute changes take to reach the output.
+
+Plays a local test stream per latency profile into a CaptureSink, so no
+audio device is needed, then repeatedly turns the volume up, applies a
+control and looks for the last audible frame in the captured output.
+Controls are ``set_volume(0)`` and ``toggle_mute``. Reported per profile
+and control, as the median and worst of the trials:
+
+- periods: device periods from the control to silent output
+- ms: the same in milliseconds
+
+Usage: python benchmarks/control_latency.py [--trials 5] [--decoder ffmpeg] [FILE]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from decoders import make_test_streams
+from pcm import stub_sounddevice
+
+SAMPLERATE = 44100
+# Warm-up after starting playback, and after restoring the volume
+SETTLE_SECONDS = 1.0
+RESTORE_SECONDS = 0.3
+# Output quieter than this (-80 dBFS) counts as silent
+SILENCE = 1e-4
+
+
+async def volume_zero(controller) -> None:
+    await controller.set_volume(0)
+
+
+async def mute(controller) -> None:
+    await controller.toggle_mute()
+
+
+CONTROLS = {"set_volume(0)": volume_zero, "mute": mute}
+
+
+async def trial(controller, sink, control, blocksize: int) -> int:
+    """Frames played at full volume after ``control`` was applied."""
+    if controller.is_muted:
+        await controller.toggle_mute()
+    await controller.set_volume(100)
+    await asyncio.sleep(RESTORE_SECONDS)
+    sink.clear()
+    await asyncio.sleep(2 * blocksize / SAMPLERATE)
+    issued = len(sink.frames())
+    await control(controller)
+    await asyncio.sleep(4 * blocksize / SAMPLERATE + 0.1)
+    frames = sink.frames()
+    loud = np.flatnonzero(np.abs(frames).max(axis=1) > SILENCE)
+    if len(loud) == 0 or loud[-1] < issued:
+        return 0
+    return int(loud[-1]) + 1 - issued
+
+
+async def run(profile_name: str, path: Path, args: argparse.Namespace) -> dict:
+    from terminal_radio.controllers.latency import get_latency_profile
+    from terminal_radio.controllers.options import Options
+    from terminal_radio.controllers.player import PlayerController
+    from terminal_radio.controllers.sinks import CaptureSink
+
+    blocksize = get_latency_profile(profile_name).device_blocksize
+    sink = CaptureSink(max_seconds=5.0)
+    controller = PlayerController(
+        Options(latency_profile=profile_name, decoder=args.decoder), sink=sink
+    )
+    results = {}
+    try:
+        if not await controller.start_playback(str(path)):
+            raise SystemExit(f"Could not play {path}")
+        await asyncio.sleep(SETTLE_SECONDS)
+        for name, control in CONTROLS.items():
+            results[name] = [
+                await trial(controller, sink, control, blocksize)
+                for _ in range(args.trials)
+            ]
+    finally:
+        await controller.cleanup()
+    return {"blocksize": blocksize, **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", nargs="?", help="stream to play")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--decoder", default="ffmpeg")
+    args = parser.parse_args()
+
+    stub_sounddevice()
+    from terminal_radio.controllers.latency import LATENCY_PROFILES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.file:
+            path = Path(args.file)
+        else:
+            path = make_test_streams(Path(tmp), 30)[0]
+        print(
+            f"{'profile':<12} {'control':<14} {'period':>6}"
+            f" {'periods med/max':>16} {'ms med/max':>12}"
+        )
+        for profile_name in LATENCY_PROFILES:
+            result = asyncio.run(run(profile_name, path, args))
+            blocksize = result.pop("blocksize")
+            for control, frames in result.items():
+                periods = [f / blocksize for f in frames]
+                ms = [f / SAMPLERATE * 1000 for f in frames]
+                print(
+                    f"{profile_name:<12} {control:<14} {blocksize:>6}"
+                    f" {statistics.median(periods):>7.2f} / {max(periods):>6.2f}"
+                    f" {statistics.median(ms):>5.1f} / {max(ms):>4.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Compare decoder backends on the same local test streams.
+
+Each backend decodes each file as fast as it can in a fresh child process,
+so peak memory is not shared between runs. Reported per run:
+
+- startup: seconds until the first PCM frames are available
+- hinted: the same when opened with the probe hint the first run detected
+- cpu: user + system seconds of the child and its subprocesses
+- rss: peak resident set size in MiB (max of child and subprocesses)
+
+Usage: python benchmarks/decoders.py [--seconds 60] [FILE ...]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+TEST_FORMATS = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k"],
+    "aac": ["-c:a", "aac", "-b:a", "128k", "-f", "adts"],
+    "ogg": ["-c:a", "libvorbis", "-q:a", "4"],
+}
+
+
+def make_test_streams(directory: Path, seconds: int) -> list[Path]:
+    """Encode a stereo test signal into each test format with ffmpeg."""
+    paths = []
+    for extension, codec_args in TEST_FORMATS.items():
+        path = directory / f"test.{extension}"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                f"sine=frequency=440:duration={seconds}",
+                "-f",
+                "lavfi",
+                "-i",
+                f"anoisesrc=color=pink:amplitude=0.1:duration={seconds}",
+                "-filter_complex",
+                "[0:a][1:a]amerge=inputs=2",
+                "-ar",
+                "44100",
+                *codec_args,
+                str(path),
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def run_child(backend: str, path: str, hint: dict | None = None) -> None:
+    """Decode one file and print the measurements as JSON."""
+    from terminal_radio.controllers.decoders import create_decoder
+    from terminal_radio.controllers.latency import get_latency_profile
+
+    profile = get_latency_profile("balanced")
+    decoder = create_decoder(backend)
+    start = time.perf_counter()
+    decoder.open(path, profile, hint=hint)
+    startup = None
+    frames = 0
+    while (block := decoder.read(profile.read_frames)) is not None:
+        if startup is None:
+            startup = time.perf_counter() - start
+        frames += len(block)
+    wall = time.perf_counter() - start
+    decoder.close()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    print(
+        json.dumps(
+            {
+                "startup": startup,
+                "detected": decoder.detected,
+                "wall": wall,
+                "frames": frames,
+                "cpu": own.ru_utime
+                + own.ru_stime
+                + children.ru_utime
+                + children.ru_stime,
+                # ru_maxrss is KiB on Linux
+                "rss": max(own.ru_maxrss, children.ru_maxrss) / 1024,
+            }
+        )
+    )
+
+
+def run(backend: str, path: Path, hint: dict | None = None) -> dict:
+    """Measure one decode in a child process."""
+    command = [sys.executable, __file__, "--child", backend, str(path)]
+    if hint:
+        command += ["--hint", json.dumps(hint)]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="streams to decode")
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--hint", type=json.loads, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child, args.hint)
+        return
+
+    from terminal_radio.controllers.decoders import available_decoders
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(f) for f in args.files] or make_test_streams(
+            Path(tmp), args.seconds
+        )
+        print(
+            f"{'file':<12} {'backend':<8} {'startup ms':>10} {'hinted ms':>9} "
+            f"{'cpu s':>7} {'rss MiB':>8} {'x realtime':>10}"
+        )
+        for path in files:
+            for backend in available_decoders():
+                r = run(backend, path)
+                hinted = "-"
+                if r["detected"]:
+                    startup = run(backend, path, r["detected"])["startup"]
+                    hinted = f"{startup * 1000:.1f}"
+                speed = r["frames"] / 44100 / r["wall"]
+                print(
+                    f"{path.name:<12} {backend:<8} {r['startup'] * 1000:>10.1f} "
+                    f"{hinted:>9} {r['cpu']:>7.2f} {r['rss']:>8.1f} {speed:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
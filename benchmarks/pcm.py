@@ -0,0 +1,286 @@
+"""Micro-benchmarks of the PCM path, with regression checks against baselines.
+
+Synthetic blocks of each size go through one stage of the pipeline at a
+time, with sounddevice replaced by a stub so no audio device is needed:
+
+- buffer write / buffer read: the TimeShiftBuffer ring the reader fills
+- output callback: a reference AudioOutput period (read, int16 to float,
+  metering and gain)
+- gain ramp: a volume change ramped over a period
+- dsp chain: the "speech" DSP preset (high-pass, compressor, loudness)
+- metering: LevelMeter on a period
+- spectrum analyze / spectrum update: the spectrum widget's FFT, and its
+  whole update without painting
+
+Reported per stage and block size:
+
+- ns/frame: wall time of a call, best of several batches, divided by the
+  block size
+- KiB/block: memory allocated while processing one block (tracemalloc
+  peak above the memory in use before the call)
+- peak KiB: the same over a run of calls, which also shows memory kept
+
+Results are compared with benchmarks/pcm_baseline.json; the run fails if
+any figure exceeds its baseline by more than the threshold. Baselines are
+only comparable on the machine that recorded them: record your own with
+--save before changing the code.
+
+Usage: python benchmarks/pcm.py [--blocks 256 1024 4096] [--threshold 0.5] [--save]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+import numpy as np
+
+BASELINE_PATH = Path(__file__).with_name("pcm_baseline.json")
+SAMPLERATE = 44100
+# Timing batches per measurement, and the minimum length of each
+BATCHES = 5
+BATCH_SECONDS = 0.05
+# Calls measured for the peak, and the allocation noise ignored in checks
+PEAK_CALLS = 50
+ALLOC_SLACK_KIB = 1.0
+
+
+def stub_sounddevice() -> None:
+    """Replace sounddevice before the player imports it."""
+    stub = types.ModuleType("sounddevice")
+    stub.PortAudioError = type("PortAudioError", (Exception,), {})
+    stub.default = types.SimpleNamespace(device=(None, None))
+    stub.query_devices = lambda *args, **kwargs: []
+
+    def output_stream(*args, **kwargs):
+        raise stub.PortAudioError("sounddevice is stubbed out in benchmarks")
+
+    stub.OutputStream = output_stream
+    sys.modules["sounddevice"] = stub
+
+
+def test_signal(frames: int) -> np.ndarray:
+    """Stereo int16 frames: a 440 Hz tone with some noise."""
+    t = np.arange(frames) / SAMPLERATE
+    rng = np.random.default_rng(0)
+    tone = np.sin(2 * np.pi * 440 * t)[:, np.newaxis]
+    signal = 0.5 * tone + 0.05 * rng.standard_normal((frames, 2))
+    return (signal * 32767).astype(np.int16)
+
+
+def buffer_write(frames: int):
+    from terminal_radio.controllers.timeshift import TimeShiftBuffer
+
+    buffer = TimeShiftBuffer(2.0, ram_seconds=2.0)
+    block = test_signal(frames)
+    return lambda: buffer.write(block)
+
+
+def buffer_read(frames: int):
+    from terminal_radio.controllers.timeshift import TimeShiftBuffer
+
+    buffer = TimeShiftBuffer(2.0, ram_seconds=2.0)
+    buffer.write(test_signal(2 * SAMPLERATE))
+    cursor = [buffer.oldest_pos]
+
+    def run():
+        data, cursor[0] = buffer.read(cursor[0], frames)
+        if buffer.write_pos - cursor[0] < frames:
+            cursor[0] = buffer.oldest_pos
+
+    return run
+
+
+def output_callback(frames: int):
+    from terminal_radio.controllers.player import AudioOutput, AudioStreamer
+    from terminal_radio.controllers.timeshift import TimeShiftBuffer
+
+    streamer = AudioStreamer()
+    streamer.set_volume(0.5)
+    streamer._buffer = buffer = TimeShiftBuffer(2.0, ram_seconds=2.0)
+    buffer.write(test_signal(2 * SAMPLERATE))
+    output = AudioOutput(streamer, volume=1.0)
+    output.position = buffer.oldest_pos
+    outdata = np.zeros((frames, AudioStreamer.CHANNELS), dtype=np.float32)
+    status = types.SimpleNamespace(output_underflow=False)
+
+    def run():
+        if buffer.write_pos - output.position < frames:
+            output.position = buffer.oldest_pos
+        output._callback(outdata, frames, None, status)
+
+    return run
+
+
+def gain_ramp(frames: int):
+    from terminal_radio.controllers.player import AudioOutput, AudioStreamer
+
+    output = AudioOutput(AudioStreamer())
+    block = test_signal(frames).astype(np.float32) / 32768
+    targets = [0.2, 0.8]
+
+    def run():
+        targets.reverse()
+        output._apply_gain(block, targets[0])
+
+    return run
+
+
+def dsp_chain(frames: int):
+    from terminal_radio.controllers.dsp import DSP_PRESETS, DspChain
+
+    chain = DspChain.from_specs(DSP_PRESETS["speech"], SAMPLERATE)
+    block = test_signal(frames)
+    return lambda: chain.process(block)
+
+
+def metering(frames: int):
+    from terminal_radio.controllers.metering import LevelMeter
+
+    meter = LevelMeter(SAMPLERATE)
+    block = test_signal(frames).astype(np.float32) / 32768
+    return lambda: meter.measure(block)
+
+
+def spectrum_analyze(frames: int):
+    from terminal_radio.ui.widgets.spectrum import SpectrumVisualizer
+
+    spectrum = SpectrumVisualizer()
+    block = test_signal(frames).astype(np.float32) / 32768
+    return lambda: spectrum._analyze(block)
+
+
+def spectrum_update(frames: int):
+    from terminal_radio.controllers.metering import LevelMeter
+    from terminal_radio.ui.widgets.spectrum import SpectrumVisualizer
+
+    # No frame budget, so no update is skipped
+    spectrum = SpectrumVisualizer(frame_budget=float("inf"))
+    meter = LevelMeter(SAMPLERATE)
+    block = test_signal(frames).astype(np.float32) / 32768
+
+    def run():
+        meter.measure(block)
+        spectrum.update_spectrum(block, meter.snapshot)
+
+    return run
+
+
+CASES = {
+    "buffer write": buffer_write,
+    "buffer read": buffer_read,
+    "output callback": output_callback,
+    "gain ramp": gain_ramp,
+    "dsp chain": dsp_chain,
+    "metering": metering,
+    "spectrum analyze": spectrum_analyze,
+    "spectrum update": spectrum_update,
+}
+
+
+def measure(run, frames: int) -> dict:
+    """Time and trace the allocations of ``run``, one block per call."""
+    # Warm-up, also filling caches such as the spectrum's band edges
+    run()
+    calls = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            run()
+        if time.perf_counter_ns() - start >= BATCH_SECONDS * 1e9:
+            break
+        calls *= 2
+    batches = []
+    for _ in range(BATCHES):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            run()
+        batches.append((time.perf_counter_ns() - start) / calls)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run()
+        per_block = tracemalloc.get_traced_memory()[1] - before
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(PEAK_CALLS):
+            run()
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return {
+        "ns_per_frame": min(batches) / frames,
+        "alloc_kib": per_block / 1024,
+        "peak_kib": peak / 1024,
+    }
+
+
+def regressions(result: dict, baseline: dict, threshold: float) -> list[str]:
+    """Figures of ``result`` over their baseline by more than ``threshold``."""
+    worse = []
+    if result["ns_per_frame"] > baseline["ns_per_frame"] * (1 + threshold):
+        worse.append("ns/frame")
+    for key, label in (("alloc_kib", "KiB/block"), ("peak_kib", "peak KiB")):
+        if result[key] > baseline[key] * (1 + threshold) + ALLOC_SLACK_KIB:
+            worse.append(label)
+    return worse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="allowed slowdown or growth over the baseline, as a fraction",
+    )
+    parser.add_argument("--save", action="store_true", help="record new baselines")
+    args = parser.parse_args()
+
+    stub_sounddevice()
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results = {}
+    failed = []
+    print(
+        f"{'case':<18} {'frames':>6} {'ns/frame':>9} {'KiB/block':>9} "
+        f"{'peak KiB':>9} {'vs baseline':>11}"
+    )
+    for name in args.cases:
+        for frames in args.blocks:
+            key = f"{name}/{frames}"
+            result = results[key] = measure(CASES[name](frames), frames)
+            baseline = baselines.get(key)
+            verdict = "-"
+            if baseline:
+                change = result["ns_per_frame"] / baseline["ns_per_frame"] - 1
+                verdict = f"{change:+.0%}"
+                worse = regressions(result, baseline, args.threshold)
+                if worse and not args.save:
+                    failed.append(f"{key}: {', '.join(worse)}")
+                    verdict += " FAIL"
+            print(
+                f"{name:<18} {frames:>6} {result['ns_per_frame']:>9.2f} "
+                f"{result['alloc_kib']:>9.1f} {result['peak_kib']:>9.1f} "
+                f"{verdict:>11}"
+            )
+
+    if args.save:
+        baselines.update(results)
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines saved to {BASELINE_PATH}")
+    elif failed:
+        print(f"Regressions over {args.threshold:.0%}:")
+        for line in failed:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
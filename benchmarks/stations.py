@@ -0,0 +1,106 @@
+"""Time station filter queries on a large generated station list.
+
+Stations get random tags, countries, codecs and bitrates with skewed
+frequencies, as in real directories: a few popular values and a long tail.
+Reported per query: the number of matches, and the best and median time
+of the index query alone and of the query that returns the stations.
+
+Usage: python benchmarks/stations.py [--stations 100000] [--runs 200]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from pcm import stub_sounddevice
+
+# Popular values first, then the long tail
+TAGS = ["rock", "news", "jazz", "talk", "pop"] + [f"tag{i}" for i in range(300)]
+COUNTRIES = ["US", "DE", "GB", "FR"] + [f"C{i}" for i in range(80)]
+CODECS = ["mp3", "aac", "opus", "vorbis", "flac"]
+BITRATES = [32, 48, 64, 96, 128, 160, 192, 256, 320]
+
+QUERIES = {
+    "popular tag": {"tags": {"rock"}},
+    "tag and country": {"tags": {"rock"}, "countries": {"US"}},
+    "two tags or'ed": {"tags": {"rock", "pop"}},
+    "codec and bitrate": {"codecs": {"aac"}, "min_bitrate": 128},
+    "all four": {
+        "tags": {"jazz", "talk"},
+        "countries": {"DE", "FR"},
+        "codecs": {"mp3"},
+        "min_bitrate": 96,
+    },
+    "rare tag": {"tags": {"tag299"}},
+}
+
+
+def skewed(rng: random.Random, values: list):
+    """A value, the first ones far more often than the last."""
+    return values[int(len(values) * rng.random() ** 4)]
+
+
+def write_stations(path: Path, count: int) -> None:
+    rng = random.Random(0)
+    stations = [
+        {
+            "name": f"Station {station_id}",
+            "url": f"http://example.com/{station_id}",
+            "id": station_id,
+            "tags": sorted({skewed(rng, TAGS) for _ in range(rng.randint(0, 4))}),
+            "country": skewed(rng, COUNTRIES),
+            "codec": skewed(rng, CODECS),
+            "bitrate": rng.choice(BITRATES),
+        }
+        for station_id in range(1, count + 1)
+    ]
+    path.write_text(json.dumps(stations))
+
+
+def timed(run, runs: int) -> tuple[float, float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    stub_sounddevice()
+    from terminal_radio.controllers.stations import StationController
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "stations.json"
+        write_stations(path, args.stations)
+        start = time.perf_counter()
+        controller = StationController(path)
+    print(
+        f"Loaded and indexed {args.stations} stations"
+        f" in {time.perf_counter() - start:.2f} s"
+    )
+    print(
+        f"{'query':<18} {'matches':>8} {'index best':>11} {'median':>8}"
+        f" {'stations median':>16}"
+    )
+    for name, query in QUERIES.items():
+        matches = len(controller.index.query(**query))
+        best, median = timed(lambda: controller.index.query(**query), args.runs)
+        _, full = timed(lambda: controller.filter_stations(**query), args.runs // 10)
+        print(
+            f"{name:<18} {matches:>8} {best * 1e6:>8.0f} us {median * 1e6:>5.0f} us"
+            f" {full * 1e3:>13.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
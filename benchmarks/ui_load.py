@@ -0,0 +1,99 @@
+"""Check that UI load does not cause audio underruns with the worker process.
+
+Plays a local test stream on the default output device twice, once with
+the streamer in this process and once in the worker process, while threads
+in this process imitate a busy UI: pure-Python work holding the GIL like
+Textual rendering does, plus a spectrum-sized FFT at 60 fps. Reported per
+mode:
+
+- underruns: device output underflows while the load was running
+- min buffer: lowest seconds of decoded audio queued ahead of the device
+
+Usage: python benchmarks/ui_load.py [--seconds 20] [--profile low-latency] [FILE]
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from decoders import make_test_streams
+from terminal_radio.controllers.latency import get_latency_profile
+from terminal_radio.controllers.player import AudioStreamer
+from terminal_radio.controllers.worker import ProcessStreamer
+
+# Warm-up before the load starts, so startup buffering is not measured
+SETTLE_SECONDS = 2.0
+
+
+def render_load(stop: threading.Event) -> None:
+    """Hold the GIL the way widget rendering does: many small objects."""
+    while not stop.is_set():
+        [str(i).rjust(8) for i in range(20000)]
+
+
+def spectrum_load(stop: threading.Event) -> None:
+    """The spectrum widget's FFT at its refresh rate."""
+    block = np.random.default_rng().random((4096, 2))
+    window = np.hanning(4096)
+    while not stop.is_set():
+        np.abs(np.fft.rfft(block.mean(axis=1) * window))
+        time.sleep(1 / 60)
+
+
+def run(mode: str, path: Path, args: argparse.Namespace) -> tuple[int, float]:
+    streamer = ProcessStreamer() if mode == "process" else AudioStreamer()
+    streamer.profile = get_latency_profile(args.profile)
+    streamer.decoder_name = args.decoder
+    streamer.set_volume(0.1)
+    stop = threading.Event()
+    try:
+        streamer.play(str(path))
+        time.sleep(SETTLE_SECONDS)
+        underruns = streamer.stats()["underruns"]
+        load = [
+            threading.Thread(target=render_load, args=(stop,))
+            for _ in range(args.threads)
+        ]
+        load.append(threading.Thread(target=spectrum_load, args=(stop,)))
+        for thread in load:
+            thread.start()
+        min_buffer = float("inf")
+        deadline = time.monotonic() + args.seconds
+        while time.monotonic() < deadline:
+            streamer.check_streaming_thread()
+            stats = streamer.stats()
+            min_buffer = min(min_buffer, stats["buffered_seconds"])
+            time.sleep(0.05)
+        underruns = streamer.stats()["underruns"] - underruns
+    finally:
+        stop.set()
+        streamer.cleanup()
+    return underruns, min_buffer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", nargs="?", help="stream to play")
+    parser.add_argument("--seconds", type=int, default=20)
+    parser.add_argument("--profile", default="low-latency")
+    parser.add_argument("--decoder", default="ffmpeg")
+    parser.add_argument("--threads", type=int, default=2, help="render threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.file:
+            path = Path(args.file)
+        else:
+            path = make_test_streams(Path(tmp), args.seconds + 10)[0]
+        print(f"{'mode':<10} {'underruns':>9} {'min buffer s':>12}")
+        for mode in ("thread", "process"):
+            underruns, min_buffer = run(mode, path, args)
+            print(f"{mode:<10} {underruns:>9} {min_buffer:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
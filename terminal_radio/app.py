@@ -1,15 +1,21 @@
 # app.py
 
+import argparse
 import logging
+import os
+from pathlib import Path
 from textual.app import App
 from textual.widgets import ListView
 from textual.binding import Binding
 from textual import on
 
+from terminal_radio.controllers import trace
 from terminal_radio.controllers.log import LogController
 from terminal_radio.controllers.options import OptionsController
 from terminal_radio.controllers.player import PlayerController
+from terminal_radio.controllers.remote import RemotePlayerController
 from terminal_radio.controllers.stations import StationController
+from terminal_radio.daemon import DEFAULT_SOCKET_PATH, run_daemon
 from terminal_radio.ui.add_station import AddStationScreen
 from terminal_radio.ui.edit_station import EditStationScreen
 from terminal_radio.ui.log import LogScreen
@@ -36,8 +42,14 @@ class RadioPlayerApp(App):
         Binding("f", "search", "Search Stations", show=True),
         Binding("l", "log", "Log", show=True),
         Binding("o", "options_screen", "Options", show=True),
+        Binding("p", "toggle_pause", "Pause/Resume", show=True),
+        Binding("left_square_bracket", "rewind", "Rewind", show=False),
+        Binding("right_square_bracket", "fast_forward", "Forward", show=False),
+        Binding("g", "go_live", "Go Live", show=False),
     ]
 
+    SEEK_STEP = 10
+
     SCREENS = {
         "add_station": AddStationScreen,
         "quit_screen": QuitScreen,
@@ -45,12 +57,15 @@ class RadioPlayerApp(App):
         "options_screen": OptionsScreen,
     }
 
-    def __init__(self):
+    def __init__(self, player_controller: RemotePlayerController | None = None):
         super().__init__()
-        self.player_controller = PlayerController()
+        self.options_controller = OptionsController()
+        self.player_controller = player_controller or PlayerController(
+            self.options_controller.options
+        )
         self.station_controller = StationController()
         self.log_controller = LogController()
-        self.options_controller = OptionsController()
+        self.log_controller.apply_options(self.options_controller.options)
 
     async def on_mount(self) -> None:
         """Called when app is mounted."""
@@ -60,6 +75,15 @@ class RadioPlayerApp(App):
             options_controller=self.options_controller,
         )
         await self.push_screen(self.main_screen)
+        self.player_controller.set_title_listener(
+            lambda title: self.call_from_thread(self.main_screen.show_title, title)
+        )
+        self.player_controller.station_lookup = self.station_controller.get_station
+        self.player_controller.set_dead_air_listener(self.main_screen.show_recovery)
+        self.player_controller.probe_hint_store = self.station_controller.set_probe_hint
+        if isinstance(self.player_controller, RemotePlayerController):
+            # The daemon changes titles and stations without being asked
+            self.set_interval(1, self.player_controller.poll)
         self.log_controller.log(logging.DEBUG, "App mounted")
         self.theme = self.options_controller.options.theme
 
@@ -85,7 +109,9 @@ class RadioPlayerApp(App):
                     and self.main_screen.selected_station
                 ):
                     station = self.main_screen.selected_station
-                    success = await self.player_controller.start_playback(station.url)
+                    success = await self.player_controller.start_playback(
+                        station.url, station
+                    )
                     if success:
                         self.main_screen.update_status(f"Now playing: {station.name}")
                     else:
@@ -162,9 +188,59 @@ class RadioPlayerApp(App):
                 "Scroll stations with arrows, enter to select"
             )
 
+    async def action_toggle_pause(self) -> None:
+        """Pause or resume time-shifted playback."""
+        if not self._check_timeshift():
+            return
+        paused = await self.player_controller.toggle_pause()
+        if paused:
+            self.main_screen.update_status("Paused, buffering live stream")
+        else:
+            self._show_timeshift_status()
+
+    async def action_rewind(self) -> None:
+        """Seek back in the time-shift buffer."""
+        if self._check_timeshift():
+            await self.player_controller.seek(-self.SEEK_STEP)
+            self._show_timeshift_status()
+
+    async def action_fast_forward(self) -> None:
+        """Seek forward in the time-shift buffer."""
+        if self._check_timeshift():
+            await self.player_controller.seek(self.SEEK_STEP)
+            self._show_timeshift_status()
+
+    async def action_go_live(self) -> None:
+        """Jump to the live edge."""
+        if self._check_timeshift():
+            await self.player_controller.go_live()
+            self._show_timeshift_status()
+
+    def _check_timeshift(self) -> bool:
+        if not self.player_controller.timeshift_enabled:
+            self.notify(
+                "enable time-shift in options",
+                title="Time-shift is off",
+                severity="warning",
+            )
+            return False
+        return self.player_controller.timeshift_active
+
+    def _show_timeshift_status(self) -> None:
+        station = self.main_screen.selected_station
+        name = station.name if station else ""
+        delay = int(self.player_controller.timeshift_delay)
+        if self.player_controller.is_paused:
+            status = f"Paused: {name}"
+        elif delay:
+            status = f"Now playing: {name} (-{delay // 60}:{delay % 60:02d})"
+        else:
+            status = f"Now playing: {name} (live)"
+        self.main_screen.update_status(status)
+
     async def action_search(self) -> None:
         """Handle search action."""
-        stations = self.station_controller.get_stations()
+        stations = self.main_screen.visible_stations
         await self.push_screen(SearchScreen(stations))
 
     async def action_log(self) -> None:
@@ -194,22 +270,28 @@ class RadioPlayerApp(App):
             logging.DEBUG,
             "Options updated",
         )
-        if (
+        outputs_changed = self.player_controller.apply_options(
+            self.options_controller.options
+        )
+        device_changed = (
             self.options_controller.options.output_device is not None
             and self.options_controller.options.output_device
             != self.player_controller.get_output_device()
-        ):
+        )
+        if outputs_changed or device_changed:
             was_playing = False
             if self.player_controller.is_playing:
                 await self.player_controller.stop_playback()
                 was_playing = True
 
-            self.player_controller.set_output_device(
-                self.options_controller.options.output_device,
-            )
+            if device_changed:
+                self.player_controller.set_output_device(
+                    self.options_controller.options.output_device,
+                )
             if was_playing and self.main_screen.selected_station:
                 await self.player_controller.start_playback(
-                    self.main_screen.selected_station.url
+                    self.main_screen.selected_station.url,
+                    self.main_screen.selected_station,
                 )
         if self.options_controller.options.theme != self.app.theme:
             self.app.theme = self.options_controller.options.theme
@@ -217,8 +299,36 @@ class RadioPlayerApp(App):
 
 def main() -> None:
     """Run the application."""
+    parser = argparse.ArgumentParser(prog="terminal-radio")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=f"play headless, controlled through {DEFAULT_SOCKET_PATH}",
+    )
+    parser.add_argument(
+        "--standalone",
+        action="store_true",
+        help="do not attach to a running daemon",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=os.environ.get(trace.ENV_VAR),
+        help="save a Chrome trace of playback events to FILE on exit",
+    )
+    args = parser.parse_args()
+    if args.trace:
+        trace.enable(Path(args.trace).expanduser())
+    if args.daemon:
+        run_daemon()
+        return
 
-    app = RadioPlayerApp()
+    player_controller = None
+    if not args.standalone and RemotePlayerController.daemon_running(
+        DEFAULT_SOCKET_PATH
+    ):
+        player_controller = RemotePlayerController(DEFAULT_SOCKET_PATH)
+    app = RadioPlayerApp(player_controller=player_controller)
     app.run()
 
 
@@ -0,0 +1,131 @@
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class BitrateSelector:
+    """Chooses among the quality variants of a station.
+
+    Fed periodically with the bytes received on the connection so far, the
+    times the output has run out of audio and the audio buffered ahead of
+    it. Repeated starvation, or a link that has not kept up with the
+    variant's bitrate for a whole sample window while the buffer drains,
+    steps down to the best variant the measured throughput can sustain.
+    After ``PROBE_AFTER`` healthy seconds one level up is tried; if that
+    starves right away the wait before the next probe doubles.
+    """
+
+    # Seconds of throughput samples averaged
+    SAMPLE_WINDOW = 10.0
+    STARVATIONS_TO_STEP_DOWN = 2
+    STARVATION_WINDOW = 30.0
+    # Throughput needed over a variant's bitrate to choose it when stepping down
+    HEADROOM = 1.2
+    # Throughput below this share of the bitrate means the link falls behind
+    SHORTFALL = 0.9
+    # Buffer below this share of its peak since the switch counts as draining
+    LOW_BUFFER = 0.5
+    PROBE_AFTER = 60.0
+    MAX_PROBE_AFTER = 600.0
+    # A step down this soon after probing up means the probe failed
+    PROBE_GRACE = 30.0
+
+    def __init__(self, variants: dict[str, str], start_url: str) -> None:
+        # (kbps, url), lowest first; keys that are not numbers are skipped
+        self.variants = sorted(
+            (int(kbps), url) for kbps, url in variants.items() if kbps.isdigit()
+        )
+        urls = [url for _, url in self.variants]
+        self.level = urls.index(start_url) if start_url in urls else len(urls) - 1
+        self.throughput: float | None = None
+        self._probe_after = self.PROBE_AFTER
+        self._probed_at: float | None = None
+        self.restart(0.0)
+
+    @property
+    def url(self) -> str:
+        return self.variants[self.level][1]
+
+    @property
+    def bitrate(self) -> int:
+        """Nominal bitrate of the current variant, in kbps."""
+        return self.variants[self.level][0]
+
+    def restart(self, now: float) -> None:
+        """Start measuring a new connection, whose counters start at 0."""
+        self._samples: deque[tuple[float, int]] = deque()
+        self._starvations: deque[float] = deque()
+        self._last_starvations = 0
+        self._buffer_peak = 0.0
+        self._healthy_since = now
+        self.throughput = None
+
+    def update(
+        self,
+        now: float,
+        received_bytes: int | None,
+        starvations: int,
+        buffered_seconds: float,
+    ) -> str | None:
+        """Return the URL to switch to, or None to stay."""
+        for _ in range(starvations - self._last_starvations):
+            self._starvations.append(now)
+        self._last_starvations = starvations
+        while self._starvations and self._starvations[0] < now - self.STARVATION_WINDOW:
+            self._starvations.popleft()
+        self._buffer_peak = max(self._buffer_peak, buffered_seconds)
+
+        if received_bytes is not None:
+            self._samples.append((now, received_bytes))
+            while self._samples[0][0] < now - self.SAMPLE_WINDOW:
+                self._samples.popleft()
+            # Throughput is only judged once a whole window is covered,
+            # which also leaves the connect burst out
+            if self._samples[-1][0] - self._samples[0][0] >= 0.8 * self.SAMPLE_WINDOW:
+                (start, first), (end, last) = self._samples[0], self._samples[-1]
+                self.throughput = (last - first) * 8 / 1000 / (end - start)
+
+        draining = buffered_seconds < self.LOW_BUFFER * self._buffer_peak
+        if len(self._starvations) >= self.STARVATIONS_TO_STEP_DOWN:
+            return self._step_down(now, f"{len(self._starvations)} buffer underruns")
+        if (
+            self.throughput is not None
+            and self.throughput < self.SHORTFALL * self.bitrate
+            and draining
+        ):
+            return self._step_down(now, f"throughput {self.throughput:.0f} kbps")
+        if self._starvations or draining:
+            self._healthy_since = now
+        elif (
+            self.level < len(self.variants) - 1
+            and now - self._healthy_since >= self._probe_after
+        ):
+            self._probed_at = now
+            return self._switch(self.level + 1, "probing for a higher bitrate")
+        return None
+
+    def _step_down(self, now: float, reason: str) -> str | None:
+        if self.level == 0:
+            self._starvations.clear()
+            return None
+        if self._probed_at is not None and now - self._probed_at < self.PROBE_GRACE:
+            self._probe_after = min(2 * self._probe_after, self.MAX_PROBE_AFTER)
+        else:
+            self._probe_after = self.PROBE_AFTER
+        self._probed_at = None
+        level = self.level - 1
+        if self.throughput is not None:
+            # Skip straight to what the link sustains
+            while level > 0 and self.variants[level][0] * self.HEADROOM > (
+                self.throughput
+            ):
+                level -= 1
+        return self._switch(level, reason)
+
+    def _switch(self, level: int, reason: str) -> str:
+        logger.info(
+            f"Bitrate {self.bitrate} -> {self.variants[level][0]} kbps: {reason}"
+        )
+        self.level = level
+        return self.url
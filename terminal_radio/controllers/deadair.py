@@ -0,0 +1,42 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DeadAirDetector:
+    """Notices when a stream stays silent or stops delivering audio.
+
+    Fed periodically with the length of the current run of silence, as
+    metered in the device callback, and the time since the decoder last
+    produced a chunk. Each episode is reported once, when it exceeds
+    ``timeout`` seconds, and logged again with its length when it ends.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.kind: str | None = None
+        self.duration = 0.0
+
+    def check(self, silence_seconds: float, stalled_seconds: float) -> bool:
+        """Return True when a new episode of dead air has just started."""
+        if stalled_seconds >= self.timeout:
+            kind, duration = "stall", stalled_seconds
+        elif silence_seconds >= self.timeout:
+            kind, duration = "silence", silence_seconds
+        else:
+            self.end("audio is back")
+            return False
+        self.duration = duration
+        if self.kind is not None:
+            return False
+        self.kind = kind
+        logger.warning(f"Dead air: {kind} for {duration:.1f} s")
+        return True
+
+    def end(self, reason: str) -> None:
+        """Log the length of the current episode, if any, and clear it."""
+        if self.kind is not None:
+            logger.info(
+                f"Dead air ({self.kind}) lasted {self.duration:.1f} s; {reason}"
+            )
+        self.kind = None
@@ -0,0 +1,273 @@
+import re
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from terminal_radio.controllers.latency import LatencyProfile
+
+try:
+    import av
+except ImportError:  # optional, enables the in-process backend
+    av = None
+
+
+class DecoderError(Exception):
+    pass
+
+
+class DecoderBackend(ABC):
+    """Turns a stream URL into interleaved int16 frames at 44.1 kHz stereo.
+
+    ``open`` and ``read`` run on the streaming thread; ``interrupt`` may be
+    called from any thread to make a blocked ``read`` return. When ``stdin``
+    is given, the encoded stream is read from it instead of fetching ``url``.
+
+    ``detected`` describes the input found by the last ``open``: a probe
+    hint with the demuxer ``format``, ``codec``, ``sample_rate`` and channel
+    ``layout``, or None if not known (yet). Passing a previous hint to
+    ``open`` forces that format and skips most of the stream analysis.
+    """
+
+    name = ""
+    SAMPLERATE = 44100
+    CHANNELS = 2
+    # Probing left to do with a hint: the least libavformat accepts
+    HINTED_PROBESIZE = 32
+    HINTED_ANALYZEDURATION = 0
+
+    detected: dict | None = None
+
+    @abstractmethod
+    def open(
+        self, url: str, profile: LatencyProfile, stdin=None, hint: dict | None = None
+    ) -> None:
+        """Start decoding ``url``, or the stream on ``stdin``."""
+
+    @abstractmethod
+    def read(self, frames: int) -> np.ndarray | None:
+        """Return up to ``frames`` frames, or None at the end of the stream."""
+
+    def interrupt(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FfmpegDecoder(DecoderBackend):
+    """Decodes in an ffmpeg subprocess and reads PCM from its stdout."""
+
+    name = "ffmpeg"
+    # Input description ffmpeg logs once it has probed the stream
+    INPUT_PATTERN = re.compile(r"^Input #0, (?P<format>[^,]+).*, from ")
+    STREAM_PATTERN = re.compile(
+        r"Stream #0:\d+.*: Audio: (?P<codec>\w+).*?, (?P<sample_rate>\d+) Hz, "
+        r"(?P<layout>[^,]+)"
+    )
+
+    def __init__(self) -> None:
+        self._process: subprocess.Popen | None = None
+        self._stderr_lines: list[str] = []
+        self._stderr_thread: threading.Thread | None = None
+
+    def open(
+        self, url: str, profile: LatencyProfile, stdin=None, hint: dict | None = None
+    ) -> None:
+        args = profile.ffmpeg_input_args(network=stdin is None)
+        if hint:
+            # Later options override the profile's
+            args += [
+                "-f",
+                hint["format"],
+                "-probesize",
+                str(self.HINTED_PROBESIZE),
+                "-analyzeduration",
+                str(self.HINTED_ANALYZEDURATION),
+            ]
+        self.detected = None
+        self._stderr_lines = []
+        try:
+            self._process = subprocess.Popen(
+                [
+                    "ffmpeg",
+                    *args,
+                    "-i",
+                    url if stdin is None else "pipe:0",
+                    "-acodec",
+                    "pcm_s16le",
+                    "-f",
+                    "s16le",
+                    "-ar",
+                    str(self.SAMPLERATE),
+                    "-ac",
+                    str(self.CHANNELS),
+                    "pipe:1",
+                ],
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,  # Changed to PIPE to capture errors
+            )
+        except Exception as e:
+            raise DecoderError(f"Failed to start ffmpeg process: {str(e)}")
+        # Read continuously, to learn the input format as soon as it is logged
+        self._stderr_thread = threading.Thread(
+            target=self._read_stderr, args=(self._process.stderr,), daemon=True
+        )
+        self._stderr_thread.start()
+
+    def _read_stderr(self, stderr) -> None:
+        found: dict = {}
+        for line in stderr:
+            text = line.decode("utf-8", errors="ignore")
+            self._stderr_lines.append(text)
+            if self.detected is not None:
+                continue
+            if match := self.INPUT_PATTERN.match(text):
+                found["format"] = match["format"]
+            elif "format" in found and (match := self.STREAM_PATTERN.search(text)):
+                self.detected = {
+                    "format": found["format"],
+                    "codec": match["codec"],
+                    "sample_rate": int(match["sample_rate"]),
+                    "layout": match["layout"].strip(),
+                }
+
+    def _stderr(self) -> str:
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=1)
+        return "".join(self._stderr_lines)
+
+    def read(self, frames: int) -> np.ndarray | None:
+        process = self._process
+        if not process:
+            raise DecoderError("FFmpeg process not found")
+        elif process.poll() is not None:
+            raise DecoderError(
+                f"FFmpeg process terminated unexpectedly: {self._stderr()}"
+            )
+
+        data = process.stdout.read(frames * self.CHANNELS * 2)  # 16-bit PCM
+
+        if not data:
+            if process.poll() is not None:
+                raise DecoderError(f"Stream ended unexpectedly: {self._stderr()}")
+            return None
+        return np.frombuffer(data, dtype=np.int16).reshape(-1, self.CHANNELS)
+
+    def interrupt(self) -> None:
+        if self._process:
+            self._process.terminate()
+
+    def close(self) -> None:
+        process, self._process = self._process, None
+        if process:
+            try:
+                process.terminate()
+                process.wait(timeout=1)  # Wait for process to terminate
+            except subprocess.TimeoutExpired:
+                process.kill()  # Force kill if terminate fails
+
+
+class PyAvDecoder(DecoderBackend):
+    """Decodes in-process with PyAV (libav bindings) straight into numpy."""
+
+    name = "pyav"
+    # Seconds a network read may block, so interrupt() takes effect
+    READ_TIMEOUT = 5.0
+
+    def __init__(self) -> None:
+        if av is None:
+            raise DecoderError("The pyav decoder needs the 'av' package")
+        self._container = None
+        self._frames = None
+        self._resampler = None
+        self._pending: list[np.ndarray] = []
+        self._pending_frames = 0
+        self._interrupted = False
+
+    def open(
+        self, url: str, profile: LatencyProfile, stdin=None, hint: dict | None = None
+    ) -> None:
+        flags = profile.ffmpeg_input_flags
+        options = {
+            flag.lstrip("-"): value for flag, value in zip(flags[::2], flags[1::2])
+        }
+        if profile.probesize is not None:
+            options["probesize"] = str(profile.probesize)
+        if profile.analyzeduration is not None:
+            options["analyzeduration"] = str(profile.analyzeduration)
+        if hint:
+            options["probesize"] = str(self.HINTED_PROBESIZE)
+            options["analyzeduration"] = str(self.HINTED_ANALYZEDURATION)
+        self.detected = None
+        try:
+            self._container = av.open(
+                url if stdin is None else stdin,
+                format=hint["format"] if hint else None,
+                options=options,
+                timeout=self.READ_TIMEOUT,
+            )
+            self._frames = self._container.decode(audio=0)
+        except Exception as e:
+            raise DecoderError(f"Failed to open stream: {str(e)}")
+        codec = self._container.streams.audio[0].codec_context
+        self.detected = {
+            # Demuxers may have several names; the first one selects it
+            "format": self._container.format.name.split(",")[0],
+            "codec": codec.codec.canonical_name,
+            "sample_rate": codec.sample_rate,
+            "layout": codec.layout.name,
+        }
+        self._resampler = av.AudioResampler(
+            format="s16", layout="stereo", rate=self.SAMPLERATE
+        )
+
+    def read(self, frames: int) -> np.ndarray | None:
+        while self._pending_frames < frames and not self._interrupted:
+            try:
+                frame = next(self._frames, None)
+            except Exception as e:
+                raise DecoderError(f"Decoding failed: {str(e)}")
+            if frame is None and self._resampler is None:
+                break
+            resampler = self._resampler
+            if frame is None:
+                # End of stream: drain what the resampler still holds
+                self._resampler = None
+            for resampled in resampler.resample(frame):
+                # Packed s16 comes back as a single (1, samples * channels) plane
+                pcm = resampled.to_ndarray().reshape(-1, self.CHANNELS)
+                self._pending.append(pcm)
+                self._pending_frames += len(pcm)
+        if not self._pending:
+            return None
+        data = (
+            self._pending[0]
+            if len(self._pending) == 1
+            else np.concatenate(self._pending)
+        )
+        self._pending, self._pending_frames = [], 0
+        return data
+
+    def interrupt(self) -> None:
+        self._interrupted = True
+
+    def close(self) -> None:
+        container, self._container = self._container, None
+        if container is not None:
+            container.close()
+
+
+DECODERS = {FfmpegDecoder.name: FfmpegDecoder, PyAvDecoder.name: PyAvDecoder}
+
+
+def available_decoders() -> list[str]:
+    """Backends usable in this environment."""
+    return [name for name in DECODERS if name != PyAvDecoder.name or av is not None]
+
+
+def create_decoder(name: str) -> DecoderBackend:
+    """Instantiate a backend by name, defaulting to ffmpeg."""
+    return DECODERS.get(name, FfmpegDecoder)()
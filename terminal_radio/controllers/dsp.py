@@ -0,0 +1,469 @@
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _scale(block: np.ndarray, gains: np.ndarray) -> None:
+    """Multiply each frame of a (frames, channels) block by its gain."""
+    # Channel by channel: broadcasting the gains over the channels makes
+    # numpy allocate a buffer on every call
+    for channel in block.T:
+        channel *= gains
+
+
+class DspStage(ABC):
+    """One processing step of a DspChain.
+
+    ``process`` works on a whole (frames, channels) float32 block in place
+    and keeps whatever state it needs to continue with the next block.
+    ``budget`` is the share of a block's playing time the stage may take.
+    Work buffers are allocated for the block size in use and kept, as the
+    reader hands over blocks of the same size.
+    """
+
+    name = ""
+
+    def __init__(self, samplerate: int, budget: float = 0.05) -> None:
+        self.samplerate = samplerate
+        self.budget = budget
+
+    @abstractmethod
+    def process(self, block: np.ndarray) -> None:
+        """Process one block in place."""
+
+
+class FirFilter(DspStage):
+    """Linear-phase FIR filtering by FFT overlap-add.
+
+    Subclasses give the magnitude response, flat unless overridden; the
+    kernel is designed from it by frequency sampling. Delays the audio by
+    half the kernel, ~23 ms.
+    """
+
+    TAPS = 2047
+
+    def __init__(self, samplerate: int, budget: float = 0.05) -> None:
+        super().__init__(samplerate, budget)
+        # Design grid twice as fine as the kernel, then windowed down to it
+        grid = np.fft.rfftfreq(2 * (self.TAPS + 1), 1 / samplerate)
+        impulse = np.fft.irfft(self.magnitude(grid))
+        impulse = np.roll(impulse, self.TAPS // 2)[: self.TAPS]
+        self._kernel = (impulse * np.hanning(self.TAPS)).astype(np.float32)
+        # Kernel spectra by FFT size, and the convolution tail carried over
+        self._spectra: dict[int, np.ndarray] = {}
+        self._tail: np.ndarray | None = None
+        # Zero-padded input, its spectrum and the inverse, for one block shape
+        self._shape: tuple[int, int] | None = None
+        self._padded = self._spectrum = self._out = None
+
+    def magnitude(self, freqs: np.ndarray) -> np.ndarray:
+        """Gain at each of ``freqs`` in Hz."""
+        return np.ones_like(freqs)
+
+    def _allocate(self, n: int, channels: int) -> None:
+        size = 1 << (n + self.TAPS - 2).bit_length()
+        if size not in self._spectra:
+            self._spectra[size] = np.fft.rfft(self._kernel, size)
+        self._shape = (n, channels)
+        self._padded = np.zeros((size, channels), dtype=np.float32)
+        self._spectrum = np.empty((size // 2 + 1, channels), dtype=np.complex64)
+        self._out = np.empty((size, channels), dtype=np.float32)
+        if self._tail is None or self._tail.shape[1] != channels:
+            self._tail = np.zeros((self.TAPS - 1, channels), dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> None:
+        n, overlap = len(block), self.TAPS - 1
+        if block.shape != self._shape:
+            self._allocate(*block.shape)
+        padded, spectrum, out = self._padded, self._spectrum, self._out
+        # Only the first n rows change; the padding stays zero
+        padded[:n] = block
+        # Orthonormal scaling, split over both transforms, gives the same
+        # result; unscaled transforms allocate a work copy on every call
+        np.fft.rfft(padded, axis=0, norm="ortho", out=spectrum)
+        _scale(spectrum, self._spectra[len(padded)])
+        np.fft.irfft(spectrum, len(padded), axis=0, norm="ortho", out=out)
+        out[:overlap] += self._tail
+        block[:] = out[:n]
+        self._tail[:] = out[n : n + overlap]
+
+
+def _biquad_magnitude(
+    freqs: np.ndarray, samplerate: int, b: tuple, a: tuple
+) -> np.ndarray:
+    z = np.exp(-2j * np.pi * freqs / samplerate)
+    return np.abs((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z))
+
+
+def _band_coefficients(
+    kind: str, samplerate: int, freq_hz: float, gain_db: float, q: float
+) -> tuple[tuple, tuple]:
+    """Biquad coefficients of an Audio EQ Cookbook peak or shelf filter."""
+    A = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq_hz / samplerate
+    cos, alpha = math.cos(w0), math.sin(w0) / (2 * q)
+    if kind == "peak":
+        b = (1 + alpha * A, -2 * cos, 1 - alpha * A)
+        a = (1 + alpha / A, -2 * cos, 1 - alpha / A)
+        return b, a
+    root = 2 * math.sqrt(A) * alpha
+    sign = 1 if kind == "lowshelf" else -1
+    b = (
+        A * ((A + 1) - sign * (A - 1) * cos + root),
+        sign * 2 * A * ((A - 1) - sign * (A + 1) * cos),
+        A * ((A + 1) - sign * (A - 1) * cos - root),
+    )
+    a = (
+        (A + 1) + sign * (A - 1) * cos + root,
+        -sign * 2 * ((A - 1) + sign * (A + 1) * cos),
+        (A + 1) + sign * (A - 1) * cos - root,
+    )
+    return b, a
+
+
+class HighPass(FirFilter):
+    """Removes rumble below ``cutoff_hz``, as a Butterworth of ``order``."""
+
+    name = "highpass"
+
+    def __init__(
+        self,
+        samplerate: int,
+        cutoff_hz: float = 80.0,
+        order: int = 4,
+        budget: float = 0.05,
+    ) -> None:
+        self.cutoff_hz = cutoff_hz
+        self.order = order
+        super().__init__(samplerate, budget)
+
+    def magnitude(self, freqs: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            ratio = self.cutoff_hz / freqs
+        return 1 / np.sqrt(1 + ratio ** (2 * self.order))
+
+
+class Equalizer(FirFilter):
+    """Peak and shelf bands, each a dict of ``kind`` ("peak", "lowshelf"
+    or "highshelf"), ``freq_hz``, ``gain_db`` and optionally ``q``."""
+
+    name = "eq"
+
+    def __init__(
+        self, samplerate: int, bands: list[dict] = (), budget: float = 0.05
+    ) -> None:
+        self.bands = list(bands)
+        super().__init__(samplerate, budget)
+
+    def magnitude(self, freqs: np.ndarray) -> np.ndarray:
+        gain = np.ones_like(freqs)
+        for band in self.bands:
+            b, a = _band_coefficients(
+                band.get("kind", "peak"),
+                self.samplerate,
+                band["freq_hz"],
+                band["gain_db"],
+                band.get("q", 0.707),
+            )
+            gain *= _biquad_magnitude(freqs, self.samplerate, b, a)
+        return gain
+
+
+class Compressor(DspStage):
+    """Feed-forward peak compressor.
+
+    Levels are taken per window of ``WINDOW`` frames. The gain reduction
+    they call for is held at its peaks, decaying with the release time,
+    and then smoothed with the attack time, both one-pole filters over
+    windows; the gain is interpolated across frames from there. The hold is
+    a running maximum in the log domain, where its decay is linear, and the
+    smoothing a product with a matrix of decay factors, so a block needs no
+    loop.
+    """
+
+    name = "compressor"
+    WINDOW = 64
+
+    def __init__(
+        self,
+        samplerate: int,
+        threshold_db: float = -18.0,
+        ratio: float = 3.0,
+        attack_ms: float = 10.0,
+        release_ms: float = 200.0,
+        makeup_db: float = 0.0,
+        budget: float = 0.05,
+    ) -> None:
+        super().__init__(samplerate, budget)
+        self.threshold_db = threshold_db
+        self.ratio = ratio
+        self.makeup_db = makeup_db
+        window = self.WINDOW / samplerate
+        self._attack = 1 - math.exp(-window / (attack_ms / 1000))
+        # Log of the release decay per window
+        self._release_log = -window / (release_ms / 1000)
+        # Held and smoothed gain reduction in dB at the end of the previous
+        # block
+        self._held = 0.0
+        self._reduction = 0.0
+        self._shape: tuple[int, int] | None = None
+
+    def _allocate(self, n: int, channels: int) -> None:
+        windows = -(-n // self.WINDOW)
+        steps = np.arange(windows)
+        # All float32 like the audio: mixing types makes numpy buffer
+        f32 = np.float32
+        # Release decay, in logs, from the start of the block to each window
+        self._release_decays = (steps * self._release_log).astype(f32)
+        # Row i weighs window k by how far the attack filter decays from k
+        # to i, and the carry the previous block's state
+        lags = steps[:, None] - steps[None, :]
+        self._attack_decay = np.where(
+            lags >= 0, self._attack * (1 - self._attack) ** np.maximum(lags, 0), 0.0
+        ).astype(f32)
+        self._attack_carry = ((1 - self._attack) ** (steps + 1)).astype(f32)
+        self._starts = steps * self.WINDOW
+        # Interpolation weights of the start of a window and of its change,
+        # by position of the frame in the window
+        fractions = np.arange(1, self.WINDOW + 1, dtype=f32) / f32(self.WINDOW)
+        self._interpolation = np.stack([np.ones_like(fractions), fractions])
+        self._ends = np.empty((windows, 2), dtype=f32)
+        self._shape = (n, channels)
+        self._magnitude = np.empty((n, channels), dtype=f32)
+        self._peaks = np.empty((windows, channels), dtype=f32)
+        self._levels = np.empty(windows, dtype=f32)
+        self._carried = np.empty(windows, dtype=f32)
+        self._held_levels = np.empty(windows, dtype=f32)
+        self._reductions = np.empty(windows + 1, dtype=f32)
+        self._gains = np.empty((windows, self.WINDOW), dtype=f32)
+
+    def process(self, block: np.ndarray) -> None:
+        n = len(block)
+        if block.shape != self._shape:
+            self._allocate(*block.shape)
+        np.abs(block, out=self._magnitude)
+        np.maximum.reduceat(self._magnitude, self._starts, axis=0, out=self._peaks)
+        targets = self._peaks.max(axis=1, out=self._levels)
+        targets += 1e-9
+        np.log10(targets, out=targets)
+        targets *= 20
+        targets -= self.threshold_db
+        # A hair above no reduction, so that its log is finite
+        np.maximum(targets, 1e-6, out=targets)
+        targets *= 1 - 1 / self.ratio
+        # Peak hold: the largest target so far, decayed since; in logs, the
+        # running maximum of each target undone by its decay from the start
+        held = self._held_levels
+        np.log(targets, out=held)
+        held -= self._release_decays
+        if self._held:
+            # The previous block's hold, one window later
+            held[0] = max(held[0], math.log(self._held) + self._release_log)
+        np.maximum.accumulate(held, out=held)
+        held += self._release_decays
+        np.exp(held, out=held)
+        # Attack smoothing of the held reduction
+        reductions = self._reductions
+        reductions[0] = self._reduction
+        np.matmul(self._attack_decay, held, out=reductions[1:])
+        np.multiply(self._attack_carry, self._reduction, out=self._carried)
+        reductions[1:] += self._carried
+        self._held = float(held[-1])
+        self._reduction = float(reductions[-1])
+        # Reduction at window ends, interpolated back to every frame
+        gains = self._gains
+        self._ends[:, 0] = reductions[:-1]
+        np.subtract(reductions[1:], reductions[:-1], out=self._ends[:, 1])
+        np.matmul(self._ends, self._interpolation, out=gains)
+        np.subtract(self.makeup_db, gains, out=gains)
+        gains *= math.log(10) / 20
+        np.exp(gains, out=gains)
+        _scale(block, gains.reshape(-1)[:n])
+
+
+class Loudness(DspStage):
+    """Brings the long-term RMS level towards ``target_db`` dBFS.
+
+    The level is a running mean over ``time_constant`` seconds of the
+    blocks above the ``gate_db`` silence gate; the gain moves towards it
+    by a linear ramp over each block and stays within ``max_gain_db``.
+    """
+
+    name = "loudness"
+
+    def __init__(
+        self,
+        samplerate: int,
+        target_db: float = -18.0,
+        max_gain_db: float = 12.0,
+        time_constant: float = 3.0,
+        gate_db: float = -50.0,
+        budget: float = 0.05,
+    ) -> None:
+        super().__init__(samplerate, budget)
+        self.target_db = target_db
+        self.max_gain_db = max_gain_db
+        self.time_constant = time_constant
+        self._gate = 10 ** (gate_db / 10)
+        self._mean_square: float | None = None
+        self._gain = 1.0
+        # Gain ramp over a block, and its steps for the block size in use
+        self._ramp = self._fractions = None
+
+    def process(self, block: np.ndarray) -> None:
+        n = len(block)
+        flat = block.reshape(-1)
+        mean_square = float(np.dot(flat, flat)) / len(flat)
+        if mean_square > self._gate:
+            if self._mean_square is None:
+                self._mean_square = mean_square
+            else:
+                weight = 1 - math.exp(-n / self.samplerate / self.time_constant)
+                self._mean_square += (mean_square - self._mean_square) * weight
+        gain = self._gain
+        if self._mean_square is not None:
+            level_db = 10 * math.log10(self._mean_square)
+            gain_db = max(
+                -self.max_gain_db, min(self.max_gain_db, self.target_db - level_db)
+            )
+            gain = 10 ** (gain_db / 20)
+        if gain == self._gain:
+            block *= np.float32(gain)
+            return
+        if self._ramp is None or len(self._ramp) != n:
+            self._fractions = np.arange(1, n + 1, dtype=np.float32) / np.float32(n)
+            self._ramp = np.empty(n, dtype=np.float32)
+        ramp = self._ramp
+        np.multiply(self._fractions, gain - self._gain, out=ramp)
+        ramp += self._gain
+        _scale(block, ramp)
+        self._gain = gain
+
+
+STAGES = {stage.name: stage for stage in (HighPass, Equalizer, Compressor, Loudness)}
+
+# Stage specs by preset name: dicts of a stage ``type`` and its parameters
+DSP_PRESETS: dict[str, list[dict]] = {
+    "off": [],
+    "loudness": [{"type": "loudness"}],
+    "speech": [
+        {"type": "highpass", "cutoff_hz": 100},
+        {"type": "compressor", "threshold_db": -24, "ratio": 3},
+        {"type": "loudness", "target_db": -18},
+    ],
+    "night": [
+        {"type": "highpass", "cutoff_hz": 60},
+        {"type": "compressor", "threshold_db": -30, "ratio": 4, "makeup_db": 6},
+        {"type": "loudness", "target_db": -22},
+    ],
+    "bass boost": [
+        {"type": "eq", "bands": [{"kind": "lowshelf", "freq_hz": 120, "gain_db": 6}]},
+        {"type": "compressor", "threshold_db": -12, "ratio": 2},
+    ],
+}
+
+
+def get_dsp_preset(name: str, custom: dict | None = None) -> list[dict]:
+    """Stage specs of a preset; ``custom`` presets shadow the built-in ones."""
+    presets = {**DSP_PRESETS, **(custom or {})}
+    if name not in presets:
+        logger.warning(f"Unknown DSP preset {name!r}, playing unprocessed")
+    return presets.get(name, [])
+
+
+class DspChain:
+    """Runs decoded audio through a list of stages, timing each.
+
+    Blocks come in as int16 and leave as int16. A stage that takes longer
+    than its budget on ``OVERRUNS_TO_BYPASS`` blocks in a row is bypassed
+    for the rest of the stream, so it cannot starve the output.
+    """
+
+    OVERRUNS_TO_BYPASS = 3
+    # Weight of the newest block in the reported time per block
+    SMOOTHING = 0.1
+
+    def __init__(self, stages: list[DspStage], samplerate: int) -> None:
+        self.stages = stages
+        self.samplerate = samplerate
+        self.bypassed = [False] * len(stages)
+        self._seconds = [0.0] * len(stages)
+        self._overruns = [0] * len(stages)
+        # Float work block and int16 result, for the chunk shape in use
+        self._block: np.ndarray | None = None
+        self._result: np.ndarray | None = None
+
+    @classmethod
+    def from_specs(cls, specs: list[dict], samplerate: int) -> "DspChain":
+        """Build the stages of ``specs``; unknown or invalid ones are skipped."""
+        stages = []
+        for spec in specs:
+            params = {k: v for k, v in spec.items() if k != "type"}
+            stage_class = STAGES.get(spec.get("type", ""))
+            try:
+                if stage_class is None:
+                    raise ValueError("unknown type")
+                stages.append(stage_class(samplerate, **params))
+            except (TypeError, ValueError, KeyError) as exc:
+                logger.warning(f"Skipping DSP stage {spec}: {exc}")
+        return cls(stages, samplerate)
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Return the processed copy of an int16 (frames, channels) chunk.
+
+        The copy is overwritten by the next call.
+        """
+        if not self.stages or not len(chunk):
+            return chunk
+        if self._block is None or self._block.shape != chunk.shape:
+            self._block = np.empty(chunk.shape, dtype=np.float32)
+            self._result = np.empty(chunk.shape, dtype=np.int16)
+        block = self._block
+        # Converting and scaling in one ufunc would make numpy buffer
+        block[:] = chunk
+        block *= np.float32(1 / 32768.0)
+        duration = len(chunk) / self.samplerate
+        for i, stage in enumerate(self.stages):
+            if self.bypassed[i]:
+                continue
+            start = time.perf_counter()
+            stage.process(block)
+            elapsed = time.perf_counter() - start
+            self._seconds[i] += (elapsed - self._seconds[i]) * self.SMOOTHING
+            if elapsed <= stage.budget * duration:
+                self._overruns[i] = 0
+                continue
+            self._overruns[i] += 1
+            if self._overruns[i] >= self.OVERRUNS_TO_BYPASS:
+                self.bypassed[i] = True
+                logger.warning(
+                    f"Bypassing DSP stage {stage.name}: {elapsed * 1000:.1f} ms for"
+                    f" a {duration * 1000:.0f} ms block, over its"
+                    f" {stage.budget:.0%} budget"
+                )
+        block *= np.float32(32768.0)
+        np.clip(block, -32768, 32767, out=block)
+        np.copyto(self._result, block, casting="unsafe")
+        return self._result
+
+    def stats(self) -> dict:
+        """Time per block of each stage in ms, and the stages bypassed."""
+        names = [stage.name for stage in self.stages]
+        # Repeated stages are told apart by their position
+        names = [
+            f"{name} {i + 1}" if names.count(name) > 1 else name
+            for i, name in enumerate(names)
+        ]
+        return {
+            "dsp_ms": {
+                name: seconds * 1000 for name, seconds in zip(names, self._seconds)
+            },
+            "dsp_bypassed": [
+                name for name, bypassed in zip(names, self.bypassed) if bypassed
+            ],
+        }
@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError,
+)
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from terminal_radio.controllers import trace
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Segment:
+    sequence: int
+    url: str
+    duration: float
+
+
+@dataclass
+class MediaPlaylist:
+    segments: list[Segment]
+    target_duration: float
+    ended: bool
+    init_url: str | None = None
+    encrypted: bool = False
+
+
+def parse_attributes(text: str) -> dict[str, str]:
+    """Parse ``KEY=value,KEY="quoted, value"`` tag attributes."""
+    attributes = {}
+    key, value, quoted, in_value = "", "", False, False
+    for char in text + ",":
+        if in_value:
+            if char == '"':
+                quoted = not quoted
+            elif char == "," and not quoted:
+                attributes[key.strip()] = value.strip('"')
+                key, value, in_value = "", "", False
+            else:
+                value += char
+        elif char == "=":
+            in_value = True
+        else:
+            key += char
+    return attributes
+
+
+def parse_master_playlist(text: str, base_url: str) -> list[tuple[int, str]]:
+    """Return (bandwidth, url) for each variant stream."""
+    variants = []
+    bandwidth = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = parse_attributes(line.split(":", 1)[1])
+            bandwidth = int(attributes.get("BANDWIDTH", 0))
+        elif line and not line.startswith("#") and bandwidth is not None:
+            variants.append((bandwidth, urljoin(base_url, line)))
+            bandwidth = None
+    return variants
+
+
+def parse_media_playlist(text: str, base_url: str) -> MediaPlaylist:
+    """Parse the segment list of a media playlist."""
+    segments = []
+    sequence = 0
+    target_duration = 6.0
+    ended = False
+    init_url = None
+    encrypted = False
+    duration = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0])
+        elif line.startswith("#EXT-X-ENDLIST"):
+            ended = True
+        elif line.startswith("#EXT-X-MAP:"):
+            uri = parse_attributes(line.split(":", 1)[1]).get("URI")
+            init_url = urljoin(base_url, uri) if uri else None
+        elif line.startswith("#EXT-X-KEY:"):
+            method = parse_attributes(line.split(":", 1)[1]).get("METHOD", "NONE")
+            encrypted = encrypted or method != "NONE"
+        elif line and not line.startswith("#") and duration is not None:
+            segments.append(Segment(sequence, urljoin(base_url, line), duration))
+            sequence += 1
+            duration = None
+    return MediaPlaylist(segments, target_duration, ended, init_url, encrypted)
+
+
+class HlsStream:
+    """Plays an HLS playlist by fetching segments ahead into memory.
+
+    Playlist refreshes and up to ``prefetch`` segment downloads run
+    concurrently over one pooled session, and finished segments are
+    written in order to a pipe whose read end (``stdin``) feeds the decoder.
+    """
+
+    # Segments behind the live edge to start from, as players usually do
+    LIVE_START_SEGMENTS = 3
+    TIMEOUT = 10.0
+
+    def __init__(self, url: str, prefetch: int = 3) -> None:
+        self.url = url
+        self.prefetch = max(1, prefetch)
+        self.stdin = None
+        self.fetch_times: deque[float] = deque(maxlen=20)
+        self.segments_fetched = 0
+        self.segments_failed = 0
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.prefetch + 1)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.prefetch, thread_name_prefix="hls-fetch"
+        )
+        self._media_url = url
+        self._pending: deque[tuple[Segment, Future]] = deque()
+        self._writer = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @staticmethod
+    def looks_like_hls(url: str) -> bool:
+        return urlparse(url).path.lower().endswith(".m3u8")
+
+    def _get(self, url: str) -> requests.Response:
+        response = self._session.get(url, timeout=self.TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    def connect(self) -> bool:
+        """Load the playlist; False means the decoder should handle the URL."""
+        try:
+            response = self._get(self.url)
+            text = response.text
+            if not text.lstrip().startswith("#EXTM3U") or "#EXT-X-" not in text:
+                return False
+            variants = parse_master_playlist(text, response.url)
+            if variants:
+                _, self._media_url = max(variants)
+                response = self._get(self._media_url)
+                text = response.text
+                self._media_url = response.url
+            playlist = parse_media_playlist(text, self._media_url)
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning(f"HLS playlist failed, decoder will fetch it: {exc}")
+            return False
+        if playlist.encrypted or not playlist.segments:
+            return False
+        read_fd, write_fd = os.pipe()
+        # Unbuffered: the pyav decoder should get data as soon as it arrives
+        # rather than wait for a full read
+        self.stdin = os.fdopen(read_fd, "rb", buffering=0)
+        self._writer = os.fdopen(write_fd, "wb")
+        self._thread = threading.Thread(target=self._run, args=(playlist,))
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def _fetch(self, segment: Segment) -> tuple[bytes, float]:
+        start = time.perf_counter()
+        with trace.span("hls segment", sequence=segment.sequence):
+            data = self._get(segment.url).content
+        elapsed = time.perf_counter() - start
+        self.fetch_times.append(elapsed)
+        return data, elapsed
+
+    def _run(self, playlist: MediaPlaylist) -> None:
+        segments = playlist.segments
+        if not playlist.ended:
+            segments = segments[-self.LIVE_START_SEGMENTS :]
+        queue = deque(segments)
+        last_sequence = segments[-1].sequence if segments else -1
+        ended = playlist.ended
+        refresh_at = time.monotonic() + playlist.target_duration
+        target_duration = playlist.target_duration
+        try:
+            if playlist.init_url:
+                self._writer.write(self._get(playlist.init_url).content)
+            while not self._closed:
+                if not ended and time.monotonic() >= refresh_at:
+                    new = self._refresh(last_sequence)
+                    if new is not None:
+                        fresh, ended, target_duration = new
+                        queue.extend(fresh)
+                        if fresh:
+                            last_sequence = fresh[-1].sequence
+                        # Poll faster while the playlist has nothing new
+                        wait = target_duration if fresh else target_duration / 2
+                        refresh_at = time.monotonic() + wait
+                while len(self._pending) < self.prefetch and queue:
+                    segment = queue.popleft()
+                    future = self._executor.submit(self._fetch, segment)
+                    self._pending.append((segment, future))
+                if not self._pending:
+                    if ended:
+                        break
+                    time.sleep(max(0.0, refresh_at - time.monotonic()))
+                    continue
+                segment, future = self._pending[0]
+                try:
+                    data, elapsed = future.result(timeout=0.5)
+                except TimeoutError:
+                    continue
+                except CancelledError:
+                    # Fetches still pending when the stream was closed
+                    break
+                except requests.RequestException as exc:
+                    self._pending.popleft()
+                    self.segments_failed += 1
+                    logger.warning(f"HLS segment {segment.sequence} skipped: {exc}")
+                    continue
+                logger.debug(
+                    f"HLS segment {segment.sequence} fetched in "
+                    f"{elapsed * 1000:.0f} ms, {self.fetched_seconds:.1f} s more"
+                    " waiting for the decoder"
+                )
+                self._pending.popleft()
+                if not self.segments_fetched:
+                    trace.instant("first byte", url=self.url)
+                self.segments_fetched += 1
+                self._writer.write(data)
+                self._writer.flush()
+        except (OSError, requests.RequestException) as exc:
+            if not self._closed:
+                logger.warning(f"HLS stream interrupted: {exc}")
+        finally:
+            try:
+                self._writer.close()
+            except OSError:
+                pass
+
+    def _refresh(self, last_sequence: int):
+        try:
+            playlist = parse_media_playlist(
+                self._get(self._media_url).text, self._media_url
+            )
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning(f"HLS playlist refresh failed: {exc}")
+            return None
+        fresh = [s for s in playlist.segments if s.sequence > last_sequence]
+        return fresh, playlist.ended, playlist.target_duration
+
+    @property
+    def fetched_seconds(self) -> float:
+        """Seconds of audio downloaded but not yet handed to the decoder.
+
+        Drops with each hand-off; the player adds what it has decoded ahead
+        of the playhead to tell how far ahead the stream is.
+        """
+        return sum(s.duration for s, f in list(self._pending) if f.done())
+
+    def stats(self) -> dict:
+        times = list(self.fetch_times)
+        return {
+            "hls_segments_fetched": self.segments_fetched,
+            "hls_segments_failed": self.segments_failed,
+            "hls_last_fetch_ms": times[-1] * 1000 if times else None,
+            "hls_avg_fetch_ms": sum(times) / len(times) * 1000 if times else None,
+            "hls_max_fetch_ms": max(times) * 1000 if times else None,
+            "hls_fetched_seconds": self.fetched_seconds,
+        }
+
+    def close(self) -> None:
+        """Stop fetching and drop the pipe."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.stdin is not None:
+            self.stdin.close()
+        self._session.close()
@@ -0,0 +1,197 @@
+import contextlib
+import logging
+import os
+import re
+import socket
+import threading
+from typing import Callable
+
+import requests
+
+from terminal_radio.controllers import trace
+from terminal_radio.controllers.latency import StreamClock
+
+logger = logging.getLogger(__name__)
+
+_FIELD_RE = re.compile(r"(\w+)='(.*?)';(?=\w+=|\s*$)", re.DOTALL)
+_BITRATE_RE = re.compile(r"\d+")
+
+
+def parse_metadata(block: bytes) -> dict[str, str]:
+    """Parse an ICY metadata block like ``StreamTitle='...';StreamUrl='';``."""
+    text = block.rstrip(b"\0")
+    try:
+        decoded = text.decode("utf-8")
+    except UnicodeDecodeError:
+        decoded = text.decode("latin-1")
+    return dict(_FIELD_RE.findall(decoded))
+
+
+def close_response(response: requests.Response) -> None:
+    """Close a streamed response, waking a read blocked on it at once.
+
+    Closing alone waits for a read stalled on a silent server; shutting the
+    socket down first makes it return right away.
+    """
+    with contextlib.suppress(AttributeError, OSError, ValueError):
+        fileno = response.raw.fileno()
+        # Shutdown acts on the connection, so a duplicate fd will do
+        with socket.fromfd(fileno, socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.shutdown(socket.SHUT_RDWR)
+    response.close()
+
+
+class IcyParser:
+    """Streaming splitter for audio interleaved with ICY metadata blocks.
+
+    Every ``metaint`` audio bytes the server inserts one length byte (in
+    units of 16 bytes) followed by that much metadata. Chunk boundaries may
+    fall anywhere.
+    """
+
+    def __init__(self, metaint: int) -> None:
+        self.metaint = metaint
+        self._audio_left = metaint
+        self._meta_left: int | None = None
+        self._meta = bytearray()
+
+    def feed(self, data: bytes) -> tuple[bytes, list[dict[str, str]]]:
+        """Return the audio payload of ``data`` and any completed metadata."""
+        if not self.metaint:
+            return data, []
+        view = memoryview(data)
+        audio = bytearray()
+        found = []
+        i = 0
+        while i < len(view):
+            if self._audio_left:
+                n = min(self._audio_left, len(view) - i)
+                audio += view[i : i + n]
+                self._audio_left -= n
+                i += n
+            elif self._meta_left is None:
+                self._meta_left = view[i] * 16
+                self._meta.clear()
+                i += 1
+                if not self._meta_left:
+                    self._meta_left = None
+                    self._audio_left = self.metaint
+            else:
+                n = min(self._meta_left, len(view) - i)
+                self._meta += view[i : i + n]
+                self._meta_left -= n
+                i += n
+                if not self._meta_left:
+                    found.append(parse_metadata(bytes(self._meta)))
+                    self._meta_left = None
+                    self._audio_left = self.metaint
+        return bytes(audio), found
+
+
+class IcyStream:
+    """Fetches a stream over one connection, splitting off ICY metadata.
+
+    The audio payload is written to a pipe whose read end (``stdin``) is
+    handed to the decoder, so titles and audio share the same listener slot.
+    """
+
+    CHUNK_SIZE = 4096
+    # Wrappers the decoder has to resolve itself
+    PLAYLIST_TYPES = ("mpegurl", "scpls", "dash+xml")
+
+    def __init__(
+        self,
+        url: str,
+        on_metadata: Callable[[dict[str, str]], None],
+        timeout: float = 10.0,
+    ) -> None:
+        self.url = url
+        self.on_metadata = on_metadata
+        self.timeout = timeout
+        self.stdin = None
+        self.station_name: str | None = None
+        self.content_type = ""
+        # Bytes received so far, metadata included
+        self.bytes_received = 0
+        # Announced in the icy-br header, in kbps; needed to time the audio
+        self.bitrate: int | None = None
+        self.clock = StreamClock()
+        # Half the time until the response headers, a rough one-way delay
+        self.transit = 0.0
+        self._response: requests.Response | None = None
+        self._writer = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def is_playlist(self) -> bool:
+        """Whether the server answered with an M3U playlist, possibly HLS."""
+        return "mpegurl" in self.content_type
+
+    def connect(self) -> bool:
+        """Open the connection; False means the decoder should fetch itself."""
+        try:
+            response = requests.get(
+                self.url,
+                headers={"Icy-MetaData": "1"},
+                stream=True,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            logger.warning(f"ICY fetch failed, decoder will connect itself: {exc}")
+            return False
+        self.content_type = response.headers.get("content-type", "").lower()
+        if any(t in self.content_type for t in self.PLAYLIST_TYPES):
+            response.close()
+            return False
+        self._response = response
+        self.station_name = response.headers.get("icy-name")
+        bitrate = _BITRATE_RE.match(response.headers.get("icy-br", ""))
+        if bitrate and int(bitrate.group()):
+            self.bitrate = int(bitrate.group())
+        self.transit = response.elapsed.total_seconds() / 2
+        parser = IcyParser(int(response.headers.get("icy-metaint", 0) or 0))
+        read_fd, write_fd = os.pipe()
+        # Unbuffered: the pyav decoder should get data as soon as it arrives
+        # rather than wait for a full read
+        self.stdin = os.fdopen(read_fd, "rb", buffering=0)
+        self._writer = os.fdopen(write_fd, "wb")
+        self._thread = threading.Thread(target=self._pump, args=(parser,))
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def _pump(self, parser: IcyParser) -> None:
+        try:
+            for chunk in self._response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if self._closed:
+                    break
+                if not self.bytes_received:
+                    trace.instant("first byte", url=self.url)
+                self.bytes_received += len(chunk)
+                audio, metadata = parser.feed(chunk)
+                for fields in metadata:
+                    self.on_metadata(fields)
+                if audio and self.bitrate:
+                    self.clock.on_arrival(len(audio) * 8 / (self.bitrate * 1000))
+                self._writer.write(audio)
+                self._writer.flush()
+        except (OSError, requests.RequestException) as exc:
+            # The decoder went away or the connection dropped; the decoder
+            # sees EOF either way and reports it
+            if not self._closed:
+                logger.warning(f"ICY stream interrupted: {exc}")
+        finally:
+            try:
+                self._writer.close()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Drop the connection and the pipe."""
+        self._closed = True
+        if self._response is not None:
+            close_response(self._response)
+        if self.stdin is not None:
+            self.stdin.close()
@@ -0,0 +1,144 @@
+import time
+from collections import deque
+
+
+class JitterBuffer:
+    """Sizes the playout buffer from the measured arrival jitter of chunks.
+
+    The reader reports every decoded chunk. Its transit time (arrival
+    minus the media time it starts at) is compared with the earliest
+    transit seen before it within ``WINDOW_SECONDS``; the largest such
+    delay in the window is what the buffer must absorb. The target depth
+    covers it within ``[min_seconds, max_seconds]``, growing at once and
+    shrinking slowly. The reference output converges on the target by
+    playing a little faster or slower, see ``correction``. ``jitter`` is
+    the interarrival jitter of RFC 3550, for reporting.
+    """
+
+    WINDOW_SECONDS = 60.0
+    # Headroom over the largest delay in the window
+    DELAY_MARGIN = 1.25
+    # Fraction of the target it may shrink by per second
+    SHRINK_PER_SECOND = 0.02
+    # Playback rate change at most, about 3.5 cents of pitch
+    MAX_RATE = 0.002
+    # Depth error, as a fraction of the target, that gets the full rate change
+    FULL_RATE_ERROR = 0.25
+    # Depth error ignored, so the rate does not wobble around the target
+    DEADBAND = 0.05
+
+    def __init__(
+        self,
+        samplerate: int,
+        min_seconds: float,
+        max_seconds: float,
+        initial_seconds: float,
+    ) -> None:
+        self.samplerate = samplerate
+        self.min_frames = int(min_seconds * samplerate)
+        self.max_frames = max(self.min_frames, int(max_seconds * samplerate))
+        self.target_frames = self._clamp(int(initial_seconds * samplerate))
+        # Added to the jitter-derived depth: the reader writes whole chunks
+        self._chunk_frames = 0
+        self.jitter = 0.0
+        self.peak_delay = 0.0
+        self.rate = 0.0
+        self._last: tuple[float, float] | None = None
+        self._media_time = 0.0
+        # Monotonic deques of (arrival, value) for the window's min and max
+        self._transits: deque[tuple[float, float]] = deque()
+        self._delays: deque[tuple[float, float]] = deque()
+        self._last_shrink = time.monotonic()
+        self._debt = 0.0
+        self._backlogged = False
+
+    def _clamp(self, frames: int) -> int:
+        return max(self.min_frames, min(self.max_frames, frames))
+
+    @property
+    def target_seconds(self) -> float:
+        return self.target_frames / self.samplerate
+
+    @property
+    def fill_frames(self) -> int:
+        """Depth up to which the reader may fill before waiting."""
+        return self.target_frames + 2 * self._chunk_frames
+
+    def on_chunk(self, frames: int, paced: bool = False) -> None:
+        """Record a chunk that just arrived from the decoder.
+
+        ``paced`` means the reader waited for the outputs before reading it:
+        data is queued upstream, which absorbs jitter by itself, and arrival
+        times are measured afresh from here.
+        """
+        now = time.monotonic()
+        media_time = self._media_time
+        self._media_time += frames / self.samplerate
+        self._chunk_frames = max(self._chunk_frames, frames)
+        self._backlogged = paced
+        if paced:
+            self._transits.clear()
+            self._last = None
+        transit = now - media_time
+        if self._last is not None:
+            last_arrival, last_media_time = self._last
+            d = (now - last_arrival) - (media_time - last_media_time)
+            self.jitter += (abs(d) - self.jitter) / 16
+        self._last = (now, media_time)
+
+        expired = now - self.WINDOW_SECONDS
+        for window in (self._transits, self._delays):
+            while window and window[0][0] < expired:
+                window.popleft()
+        # Bursts that catch up after a stall lower the minimum, not the delay
+        delay = max(0.0, transit - self._transits[0][1]) if self._transits else 0.0
+        while self._transits and self._transits[-1][1] >= transit:
+            self._transits.pop()
+        self._transits.append((now, transit))
+        while self._delays and self._delays[-1][1] <= delay:
+            self._delays.pop()
+        self._delays.append((now, delay))
+        self.peak_delay = self._delays[0][1]
+        self._update_target(now)
+
+    def _update_target(self, now: float) -> None:
+        desired = self._clamp(
+            int(self.DELAY_MARGIN * self.peak_delay * self.samplerate)
+            + self._chunk_frames
+        )
+        if desired >= self.target_frames:
+            self.target_frames = desired
+        else:
+            step = (
+                self.SHRINK_PER_SECOND * self.target_frames * (now - self._last_shrink)
+            )
+            self.target_frames -= int(min(self.target_frames - desired, step))
+        self._last_shrink = now
+
+    def correction(self, depth: int, frames: int) -> int:
+        """Extra frames to consume in the next period; negative to slow down.
+
+        Called from the reference output's callback with the current depth
+        (frames buffered ahead of it).
+        """
+        target = self.target_frames
+        fraction = (depth - target) / target if target else 0.0
+        if self._backlogged or abs(fraction) < self.DEADBAND:
+            # Speeding up would only drain the upstream queue into ours
+            self.rate = 0.0
+        else:
+            self.rate = self.MAX_RATE * max(
+                -1.0, min(1.0, fraction / self.FULL_RATE_ERROR)
+            )
+        self._debt += self.rate * frames
+        extra = int(self._debt)
+        self._debt -= extra
+        return extra
+
+    def stats(self) -> dict:
+        return {
+            "jitter_ms": self.jitter * 1000,
+            "peak_delay_ms": self.peak_delay * 1000,
+            "buffer_target_seconds": self.target_seconds,
+            "playback_rate": 1.0 + self.rate,
+        }
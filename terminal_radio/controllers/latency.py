@@ -0,0 +1,145 @@
+import time
+from dataclasses import dataclass, fields, replace
+
+import sounddevice as sd
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Buffering parameters shared by ffmpeg, the reader and the device."""
+
+    name: str
+    # ffmpeg input probing; None keeps ffmpeg's defaults
+    probesize: int | None = None
+    analyzeduration: int | None = None
+    ffmpeg_input_flags: tuple[str, ...] = ()
+    # Let ffmpeg reconnect dropped HTTP streams it fetches itself
+    reconnect: bool = False
+    # Frames read from the ffmpeg pipe per iteration
+    read_frames: int = 4096
+    # Frames the reader may stay ahead of the device callback
+    playout_frames: int = 8192
+    device_blocksize: int = 1024
+    device_latency: str | float = "high"
+
+    def ffmpeg_input_args(self, network: bool = True) -> list[str]:
+        """Arguments that go before ``-i``; protocol options need ``network``."""
+        args = list(self.ffmpeg_input_flags)
+        if self.reconnect and network:
+            args += [
+                "-reconnect",
+                "1",
+                "-reconnect_streamed",
+                "1",
+                "-reconnect_delay_max",
+                "5",
+            ]
+        if self.probesize is not None:
+            args += ["-probesize", str(self.probesize)]
+        if self.analyzeduration is not None:
+            args += ["-analyzeduration", str(self.analyzeduration)]
+        return args
+
+    def buffering_seconds(self, samplerate: int = 44100) -> float:
+        """Worst-case delay added by the reader and playout buffer."""
+        return (self.read_frames + self.playout_frames) / samplerate
+
+
+LATENCY_PROFILES = {
+    "low-latency": LatencyProfile(
+        name="low-latency",
+        probesize=32768,
+        analyzeduration=0,
+        ffmpeg_input_flags=("-fflags", "nobuffer"),
+        read_frames=1024,
+        playout_frames=2048,
+        device_blocksize=256,
+        device_latency="low",
+    ),
+    "balanced": LatencyProfile(name="balanced"),
+    "resilient": LatencyProfile(
+        name="resilient",
+        reconnect=True,
+        read_frames=8192,
+        playout_frames=88200,
+        device_blocksize=4096,
+        device_latency="high",
+    ),
+}
+CUSTOM_PROFILE = "custom"
+
+
+def get_latency_profile(name: str, custom: dict | None = None) -> LatencyProfile:
+    """Resolve a profile name; ``custom`` overrides fields of ``balanced``."""
+    if name == CUSTOM_PROFILE:
+        known = {f.name for f in fields(LatencyProfile)} - {"name"}
+        overrides = {k: v for k, v in (custom or {}).items() if k in known}
+        if "ffmpeg_input_flags" in overrides:
+            overrides["ffmpeg_input_flags"] = tuple(overrides["ffmpeg_input_flags"])
+        return replace(LATENCY_PROFILES["balanced"], name=CUSTOM_PROFILE, **overrides)
+    return LATENCY_PROFILES.get(name, LATENCY_PROFILES["balanced"])
+
+
+def measure_effective_latency(
+    profile: LatencyProfile,
+    device: int | None = None,
+    samplerate: int = 44100,
+    channels: int = 2,
+) -> float | None:
+    """Open (without starting) an output stream and add up the buffering.
+
+    Returns seconds, or None if the device refuses the configuration.
+    """
+    try:
+        stream = sd.OutputStream(
+            device=device,
+            channels=channels,
+            samplerate=samplerate,
+            dtype="float32",
+            blocksize=profile.device_blocksize,
+            latency=profile.device_latency,
+        )
+    except sd.PortAudioError:
+        return None
+    try:
+        device_latency = stream.latency
+    finally:
+        stream.close()
+    return (
+        device_latency
+        + profile.device_blocksize / samplerate
+        + profile.buffering_seconds(samplerate)
+    )
+
+
+class StreamClock:
+    """Tracks a live stream's audio against the wall clock as it arrives.
+
+    Live is taken to advance in real time from the first arrival, which the
+    server sent ``backlog`` seconds behind live. The backlog is what the
+    audio received ever ran ahead of the wall clock, as servers send it in
+    a burst on connect; stalls upstream show up in ``behind``.
+    """
+
+    def __init__(self) -> None:
+        self.start: float | None = None
+        # Media seconds received so far
+        self.received = 0.0
+        self.backlog = 0.0
+
+    def on_arrival(self, seconds: float, now: float | None = None) -> None:
+        """Record ``seconds`` of audio that just arrived."""
+        if now is None:
+            now = time.monotonic()
+        if self.start is None:
+            self.start = now
+        self.received += seconds
+        self.backlog = max(self.backlog, self.received - (now - self.start))
+
+    def behind(self, now: float | None = None) -> float:
+        """Seconds of live audio that have not arrived yet."""
+        if self.start is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        return max(0.0, now - self.start + self.backlog - self.received)
@@ -1,4 +1,13 @@
+import atexit
+import json
 import logging
+import math
+import os
+import queue
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
 
 
 class RoundLogBuffer:
@@ -28,7 +37,107 @@ class AppLogHandler(logging.Handler):
         self.buffer.add(self.format(record))
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created)
+            .astimezone()
+            .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RotatingLogFileHandler(RotatingFileHandler):
+    """Rotates the log file once it reaches ``max_bytes`` or gets older than
+    ``rotate_seconds``, whichever comes first; 0 disables either. Rotated
+    files are numbered as by ``RotatingFileHandler``."""
+
+    def __init__(
+        self, path: Path, max_bytes: int, rotate_seconds: float, backup_count: int
+    ) -> None:
+        super().__init__(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.rotate_seconds = rotate_seconds
+        # A file left by an earlier run counts from when it was last written
+        started = os.stat(path).st_mtime if os.path.exists(path) else time.time()
+        self.rollover_at = self._next_rollover(started)
+
+    def _next_rollover(self, start: float) -> float:
+        return start + self.rotate_seconds if self.rotate_seconds > 0 else math.inf
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return time.time() >= self.rollover_at or bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = self._next_rollover(time.time())
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to a listener thread without ever waiting for it.
+
+    When the queue is full the record is dropped and counted; the count is
+    reported in the log once the queue is down to half full.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format the message and traceback here, as the arguments may have
+        # changed by the time the listener writes the record
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped and self.queue.qsize() < self.queue.maxsize // 2:
+                self.queue.put_nowait(self.dropped_record())
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def dropped_record(self) -> logging.LogRecord:
+        """A warning with the number of records dropped since the last one."""
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log file fell behind, dropped {self.dropped} records",
+            }
+        )
+        self.dropped = 0
+        return record
+
+
+class DrainingQueueListener(QueueListener):
+    """Writes out everything queued before stopping, even when the queue is
+    full."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
 class LogController:
+    # Records waiting for the log file at most, before they are dropped
+    FILE_QUEUE_SIZE = 10000
+    DEFAULT_LOG_PATH = Path.home() / ".config" / "terminal-radio" / "terminal-radio.log"
+
     def __init__(self):
         # make python logger to log this string
         self.logger = logging.getLogger("terminal_radio")
@@ -38,6 +147,56 @@ class LogController:
         # Set up a console handler
         self.logging_handler = AppLogHandler()
         self.logger.addHandler(self.logging_handler)
+        self.file_handler: DroppingQueueHandler | None = None
+        self._file_listener: DrainingQueueListener | None = None
+
+    def open_file(
+        self,
+        path: Path,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_seconds: float = 24 * 3600,
+        backup_count: int = 5,
+    ) -> None:
+        """Also log to ``path`` as JSON lines, written by a background
+        thread so that logging never waits for the disk."""
+        self.close_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingLogFileHandler(
+            path, max_bytes, rotate_seconds, max(1, backup_count)
+        )
+        handler.setFormatter(JsonLinesFormatter())
+        log_queue = queue.Queue(self.FILE_QUEUE_SIZE)
+        self.file_handler = DroppingQueueHandler(log_queue)
+        self._file_listener = DrainingQueueListener(log_queue, handler)
+        self._file_listener.start()
+        self.logger.addHandler(self.file_handler)
+        # Write out what is queued on exit, also after an unhandled exception
+        atexit.register(self.close_file)
+
+    def close_file(self) -> None:
+        """Stop logging to the file once the queued records are written."""
+        if self._file_listener is None:
+            return
+        self.logger.removeHandler(self.file_handler)
+        if self.file_handler.dropped:
+            self._file_listener.queue.put(self.file_handler.dropped_record())
+        self._file_listener.stop()
+        for handler in self._file_listener.handlers:
+            handler.close()
+        self._file_listener = self.file_handler = None
+        atexit.unregister(self.close_file)
+
+    def apply_options(self, options) -> None:
+        """Open, reopen or close the log file as set in the options."""
+        if not options.log_file:
+            self.close_file()
+            return
+        self.open_file(
+            Path(options.log_path or self.DEFAULT_LOG_PATH).expanduser(),
+            max_bytes=options.log_max_mb * 1024 * 1024,
+            rotate_seconds=options.log_rotate_hours * 3600,
+            backup_count=options.log_backups,
+        )
 
     def log(self, *args, **kwargs):
         self.logger.log(*args, **kwargs)
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class LevelSnapshot:
+    """Levels of the latest output block.
+
+    Snapshots are replaced, never mutated, so readers on other threads get
+    a consistent set of values. ``sequence`` advances with every block.
+    """
+
+    sequence: int = 0
+    rms: tuple[float, float] = (0.0, 0.0)
+    peak: tuple[float, float] = (0.0, 0.0)
+    # Running totals since the stream started
+    clipped_samples: int = 0
+    silent_blocks: int = 0
+    # Length of the current run of silence
+    silence_seconds: float = 0.0
+
+
+class LevelMeter:
+    """Measures blocks in the device callback and publishes snapshots."""
+
+    # Full scale of the int16 source, after conversion to float
+    CLIP_LEVEL = 32767 / 32768
+    # Blocks quieter than -60 dBFS RMS count as silence by default
+    SILENCE_RMS = 10 ** (-60 / 20)
+
+    def __init__(self, samplerate: int) -> None:
+        self.samplerate = samplerate
+        self.silence_rms = self.SILENCE_RMS
+        self.snapshot = LevelSnapshot()
+
+    def reset(self) -> None:
+        """Start counting afresh, e.g. for a new stream."""
+        self.snapshot = LevelSnapshot(sequence=self.snapshot.sequence + 1)
+
+    def measure(self, block: np.ndarray) -> None:
+        """Meter one (frames, channels) float block in [-1, 1]."""
+        n = len(block)
+        previous = self.snapshot
+        if not n:
+            return
+        rms = []
+        peak = []
+        # Reductions over one strided column at a time are several times
+        # faster than axis=0 reductions over interleaved frames
+        for channel in range(block.shape[1]):
+            column = block[:, channel]
+            rms.append(float(np.sqrt(np.dot(column, column) / n)))
+            peak.append(max(float(column.max()), -float(column.min())))
+        clipped = 0
+        if max(peak) >= self.CLIP_LEVEL:
+            clipped = int(np.count_nonzero(np.abs(block) >= self.CLIP_LEVEL))
+        silent = max(rms) < self.silence_rms
+        self.snapshot = LevelSnapshot(
+            sequence=previous.sequence + 1,
+            rms=(rms[0], rms[-1]),
+            peak=(peak[0], peak[-1]),
+            clipped_samples=previous.clipped_samples + clipped,
+            silent_blocks=previous.silent_blocks + int(silent),
+            silence_seconds=(
+                previous.silence_seconds + n / self.samplerate if silent else 0.0
+            ),
+        )
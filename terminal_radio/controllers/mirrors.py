@@ -0,0 +1,116 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from queue import Empty, Queue
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorStats:
+    """Remembers how often each mirror won a race, to try likely winners first.
+
+    Counts are kept per URL in a JSON file: how many races the mirror took
+    part in and how many it won.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._counts: dict[str, dict] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self._counts = {}
+
+    def win_rate(self, url: str) -> float:
+        """Share of races won, starting from an even chance for new mirrors."""
+        counts = self._counts.get(url, {})
+        return (counts.get("wins", 0) + 1) / (counts.get("races", 0) + 2)
+
+    def order(self, urls: list[str]) -> list[str]:
+        """``urls`` by descending win rate, keeping their order on ties."""
+        return sorted(urls, key=self.win_rate, reverse=True)
+
+    def record(self, started: list[str], winner: str) -> None:
+        """Count a race between the ``started`` mirrors."""
+        with self._lock:
+            for url in started:
+                counts = self._counts.setdefault(url, {"races": 0, "wins": 0})
+                counts["races"] += 1
+                counts["wins"] += url == winner
+            data = json.dumps(self._counts, indent=2)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(data)
+            tmp.replace(self.path)
+        except OSError as exc:
+            logger.warning(f"Could not save mirror statistics: {exc}")
+
+
+def race(attempts: list, stagger: float | None) -> tuple[int, object, int]:
+    """Open ``attempts`` concurrently and keep the first to deliver audio.
+
+    Attempts provide ``open()``, blocking until the first audio and
+    returning it (None or an exception means failure), ``abort()``, safe to
+    call from another thread, and ``close()``. They are started in order,
+    the next one when an attempt fails or ``stagger`` seconds have passed
+    without a result; a stagger of None only moves on after failures. The
+    losers are aborted and closed.
+
+    Returns the index of the winner, its first audio and the number of
+    attempts started. Raises the error of the first attempt if all fail.
+    """
+    results: Queue = Queue()
+    lock = threading.Lock()
+    state = {"winner": None}
+
+    def run(index: int) -> None:
+        attempt = attempts[index]
+        try:
+            audio, error = attempt.open(), None
+            if audio is None:
+                error = EOFError("No audio")
+        except Exception as exc:
+            audio, error = None, exc
+        with lock:
+            if state["winner"] is None:
+                results.put((index, audio, error))
+                return
+        attempt.close()
+
+    def start(index: int) -> None:
+        threading.Thread(target=run, args=(index,), daemon=True).start()
+
+    start(0)
+    started, finished = 1, 0
+    errors: dict[int, Exception] = {}
+    while True:
+        try:
+            index, audio, error = results.get(
+                timeout=stagger if started < len(attempts) else None
+            )
+        except Empty:
+            start(started)
+            started += 1
+            continue
+        finished += 1
+        if error is None:
+            break
+        errors[index] = error
+        attempts[index].close()
+        if finished == len(attempts):
+            raise errors[min(errors)]
+        if started < len(attempts):
+            start(started)
+            started += 1
+
+    with lock:
+        state["winner"] = index
+        # Results that arrived meanwhile will not be collected by anyone else
+        while not results.empty():
+            attempts[results.get()[0]].close()
+    for other in range(started):
+        if other != index and other not in errors:
+            attempts[other].abort()
+    return index, audio, started
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 from pathlib import Path
 import sounddevice as sd
@@ -8,6 +8,47 @@ import sounddevice as sd
 class Options:
     output_device: int | None = None
     theme: str = "textual-dark"
+    timeshift_minutes: int = 0
+    latency_profile: str = "balanced"
+    decoder: str = "ffmpeg"
+    # "sounddevice", or "null" and "wav" to play without sound hardware;
+    # the wav sink writes to wav_path, by default output.wav in the config dir
+    output_sink: str = "sounddevice"
+    wav_path: str = ""
+    # Overrides for the "custom" latency profile, see LatencyProfile
+    custom_latency: dict = field(default_factory=dict)
+    # Further devices that play the same stream, and per-device volume (0-100)
+    extra_output_devices: list[int] = field(default_factory=list)
+    output_volumes: dict[str, int] = field(default_factory=dict)
+    # Bounds of the adaptive playout buffer; a max of 0, the default, keeps
+    # the latency profile's fixed buffer
+    jitter_buffer_min_ms: int = 0
+    jitter_buffer_max_ms: int = 0
+    # Decode and play in a worker process, away from the UI's GIL
+    audio_process: bool = False
+    # "race" opens a station's mirrors at once and plays the first to
+    # deliver audio; "sequential" only tries the next after a failure
+    mirror_start: str = "race"
+    # Reconnect after this long of silence below silence_db dBFS, or of no
+    # audio at all; 0, the default, disables it. Stations may override both
+    dead_air_seconds: int = 0
+    silence_db: int = -60
+    # DSP preset of stations that do not name their own, and presets added
+    # to or replacing the built-in ones, see controllers.dsp
+    dsp_preset: str = "off"
+    dsp_presets: dict[str, list[dict]] = field(default_factory=dict)
+    # Recordings run at once at most, and where they are saved; by default
+    # the recordings directory in the config dir
+    recording_workers: int = 32
+    recordings_dir: str = ""
+    # Keep the log in log_path as JSON lines, by default terminal-radio.log
+    # in the config dir, rotated at log_max_mb or every log_rotate_hours
+    # (0 disables either) and keeping log_backups old files
+    log_file: bool = False
+    log_path: str = ""
+    log_max_mb: int = 10
+    log_rotate_hours: int = 24
+    log_backups: int = 5
 
 
 class NoAudioDeviceError(Exception):
@@ -30,9 +71,14 @@ class OptionsController:
                     raise ValueError("Invalid JSON format in options file.") from exc
                 self.options = options
         else:
-            self.DEFAULT_CONFIG_DIR.parent.mkdir(parents=True, exist_ok=True)
+            self.DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
             self.options = Options()
-            if devices := self.get_available_devices():
+            try:
+                devices = self.get_available_devices()
+            except NoAudioDeviceError:
+                # Headless machines may still play to the null or wav sink
+                devices = []
+            if devices:
                 self.update_options(output_device=devices[0][1])
 
     def persist_options(self) -> None:
@@ -1,20 +1,309 @@
+import asyncio
+import contextlib
+import logging
 import threading
 import time
-import subprocess
 import sounddevice as sd
 import numpy as np
 from queue import Queue
+from typing import Callable
+
+from terminal_radio.controllers.bitrate import BitrateSelector
+from terminal_radio.controllers.decoders import (
+    DecoderBackend,
+    DecoderError,
+    FfmpegDecoder,
+    create_decoder,
+)
+from terminal_radio.controllers.deadair import DeadAirDetector
+from terminal_radio.controllers.dsp import DspChain, get_dsp_preset
+from terminal_radio.controllers.hls import HlsStream
+from terminal_radio.controllers.icy import IcyStream
+from terminal_radio.controllers.jitter import JitterBuffer
+from terminal_radio.controllers.latency import (
+    LatencyProfile,
+    StreamClock,
+    get_latency_profile,
+)
+from terminal_radio.controllers.metering import LevelMeter, LevelSnapshot
+from terminal_radio.controllers.mirrors import MirrorStats, race
+from terminal_radio.controllers.options import Options, OptionsController
+from terminal_radio.controllers.resolver import StreamResolver
+from terminal_radio.controllers.sinks import OutputSink, SounddeviceSink, create_sink
+from terminal_radio.controllers.stations import Station
+from terminal_radio.controllers.timeshift import TimeShiftBuffer
+from terminal_radio.controllers import trace
+
+logger = logging.getLogger(__name__)
 
 
 class AudioStreamingError(Exception):
     pass
 
 
+class AudioOutput:
+    """One output device fed from the shared buffer through its own cursor.
+
+    Outputs other than the first follow the first one's position: when
+    their clocks drift apart, a device period is stretched or squeezed by
+    a single frame until they line up again.
+    """
+
+    # ~6 ms ramp to avoid zipper noise on volume and mute changes
+    GAIN_RAMP_FRAMES = 256
+    # Beyond this the follower jumps instead of resampling
+    DRIFT_SNAP_SECONDS = 0.5
+
+    def __init__(
+        self,
+        streamer: "AudioStreamer",
+        device: int | None = None,
+        volume: float = 1.0,
+        reference: "AudioOutput | None" = None,
+    ) -> None:
+        self._streamer = streamer
+        self.device = device
+        self.volume = volume
+        self.reference = reference
+        self.position = 0
+        self.latency = 0.0
+        self.underruns = 0
+        # Times the buffer ran dry under this output, not counting startup
+        self.starvations = 0
+        self._starving = True
+        self.drift_corrections = 0
+        self.last_block = np.zeros((0, AudioStreamer.CHANNELS), dtype=np.float32)
+        self._seek_pos: int | None = None
+        self._gain = streamer._volume * volume
+        self._tolerance = 0
+        self._trace_first_write = trace.enabled()
+
+    def open(self, profile: LatencyProfile):
+        """Create the device stream; the caller starts and closes it."""
+        stream = self._streamer.sink.open(
+            self.device,
+            AudioStreamer.SAMPLERATE,
+            AudioStreamer.CHANNELS,
+            profile.device_blocksize,
+            profile.device_latency,
+            self._callback,
+        )
+        self.latency = stream.latency
+        # Callback timing jitters by up to a period; ignore that much drift
+        self._tolerance = 2 * profile.device_blocksize
+        return stream
+
+    def seek_to(self, position: int) -> None:
+        """Move the cursor; picked up by the callback, which owns it."""
+        self._seek_pos = position
+
+    def _drift(self) -> int:
+        """Frames this output is ahead of its reference, latency-aligned."""
+        reference = self.reference
+        offset = (reference.latency - self.latency) * AudioStreamer.SAMPLERATE
+        return int(self.position - reference.position + offset)
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        """Fill one device period from the buffer, applying gain."""
+        streamer = self._streamer
+        if status.output_underflow:
+            self.underruns += 1
+        buffer = streamer._buffer
+        if buffer is None or streamer._paused:
+            outdata.fill(0)
+            self.last_block = outdata[:0]
+            return
+        if self._seek_pos is not None:
+            self.position, self._seek_pos = self._seek_pos, None
+
+        wanted = frames
+        if self.reference is not None:
+            drift = self._drift()
+            if abs(drift) > self.DRIFT_SNAP_SECONDS * AudioStreamer.SAMPLERATE:
+                self.position -= drift
+            elif drift > self._tolerance:
+                wanted -= 1
+            elif drift < -self._tolerance:
+                wanted += 1
+        elif streamer._jitter is not None:
+            # Converge on the jitter buffer target by playing a bit faster
+            # or slower; followers then track this output as usual
+            wanted += streamer._jitter.correction(
+                buffer.write_pos - self.position, frames
+            )
+
+        data, self.position = buffer.read(self.position, wanted)
+        n = len(data)
+        if n and self._trace_first_write:
+            self._trace_first_write = False
+            trace.instant("first device write", device=self.device)
+        if n < wanted and not self._starving:
+            self.starvations += 1
+        self._starving = n < wanted
+        if n > frames or (n == wanted and wanted != frames):
+            # Stretch or squeeze by the correction with linear interpolation;
+            # a short read of a longer period is squeezed all the same
+            self.drift_corrections += 1
+            source = np.arange(n)
+            target = np.linspace(0, n - 1, frames)
+            for channel in range(outdata.shape[1]):
+                outdata[:, channel] = np.interp(target, source, data[:, channel])
+            outdata *= np.float32(1 / 32768.0)
+        else:
+            np.multiply(data, np.float32(1 / 32768.0), out=outdata[:n])
+            outdata[n:] = 0
+        if self.reference is None:
+            # Meter the stream itself, before volume and mute
+            streamer.meter.measure(outdata)
+        self._apply_gain(outdata, streamer._volume * self.volume)
+        streamer._drained.set()
+        if self.reference is None:
+            # Store current audio data for visualization
+            self.last_block = outdata.copy()
+            if streamer.on_block:
+                streamer.on_block(self.last_block)
+
+    def _apply_gain(self, block: np.ndarray, target: float) -> None:
+        """Scale a block in place, ramping from the previous gain."""
+        if target == self._gain:
+            if target != 1.0:
+                block *= target
+            return
+        n = min(len(block), self.GAIN_RAMP_FRAMES)
+        ramp = np.linspace(self._gain, target, n + 1, dtype=np.float32)[1:]
+        block[:n] *= ramp[:, np.newaxis]
+        block[n:] *= target
+        self._gain = target
+
+
+class MirrorAttempt:
+    """One mirror of a stream being opened: its connection and decoder."""
+
+    # A hinted start without audio by then is given up for a full probe
+    HINT_TIMEOUT = 1.0
+
+    def __init__(
+        self,
+        url: str,
+        decoder: DecoderBackend,
+        profile: LatencyProfile,
+        on_metadata: Callable[[dict[str, str]], None],
+        hint: dict | None = None,
+    ) -> None:
+        self.url = url
+        self.decoder = decoder
+        self.profile = profile
+        # Format found on an earlier play, see DecoderBackend.detected
+        self.hint = hint
+        # Fetches the encoded stream when we do it ourselves instead of the decoder
+        self.source: IcyStream | HlsStream | None = None
+        self.aborted = False
+        self._on_metadata = on_metadata
+        self._timed_out = threading.Event()
+
+    def open(self) -> np.ndarray | None:
+        """Connect and decode the first chunk of audio.
+
+        With a probe hint, a stream that fails to decode in time or turns
+        out to use another codec is connected to again and fully probed.
+        """
+        if self.hint:
+            try:
+                audio = self._open(self.hint)
+            except DecoderError:
+                audio = None
+            detected = self.decoder.detected
+            if self.aborted or (
+                audio is not None
+                and not self._timed_out.is_set()
+                and (detected is None or detected["codec"] == self.hint["codec"])
+            ):
+                return audio
+            logger.info(f"Probe hint no longer fits {self.url}; probing it fully")
+            self.hint = None
+            self.close()
+            self.decoder = create_decoder(self.decoder.name)
+        return self._open(None)
+
+    def _open(self, hint: dict | None) -> np.ndarray | None:
+        with trace.span("connect", url=self.url):
+            stdin = self._open_source()
+        if self.aborted:
+            return None
+        timer = None
+        if hint:
+            timer = threading.Timer(self.HINT_TIMEOUT, self._time_out)
+            timer.daemon = True
+            timer.start()
+        try:
+            with trace.span("decoder open", decoder=self.decoder.name, hint=bool(hint)):
+                self.decoder.open(self.url, self.profile, stdin=stdin, hint=hint)
+            if self.aborted:
+                # abort() may have come before there was anything to interrupt
+                return None
+            with trace.span("first decode"):
+                return self.decoder.read(self.profile.read_frames)
+        finally:
+            if timer:
+                timer.cancel()
+
+    def _time_out(self) -> None:
+        self._timed_out.set()
+        self.decoder.interrupt()
+        if self.source:
+            self.source.close()
+
+    def _open_source(self):
+        """Fetch the stream ourselves where we can; None leaves it to the decoder."""
+        url = self.url
+        if not url.startswith(("http://", "https://")):
+            return None
+        if HlsStream.looks_like_hls(url):
+            self.source = HlsStream(url)
+        else:
+            # ICY titles come over the audio connection
+            self.source = IcyStream(url, self._on_metadata)
+        if not self.aborted and self.source.connect():
+            return self.source.stdin
+        if isinstance(self.source, IcyStream) and self.source.is_playlist:
+            # Playlists served without an .m3u8 path may still be HLS
+            self.source = HlsStream(url)
+            if not self.aborted and self.source.connect():
+                return self.source.stdin
+        return None
+
+    def abort(self) -> None:
+        """Unblock ``open`` or reading from another thread."""
+        self.aborted = True
+        self.decoder.interrupt()
+        if self.source:
+            self.source.close()
+
+    def close(self) -> None:
+        self.decoder.close()
+        if self.source:
+            self.source.close()
+
+
 class AudioStreamer:
-    """Audio streamer using ffmpeg and sounddevice."""
+    """Audio streamer using a decoder backend and sounddevice.
+
+    A reader thread decodes into a shared ring buffer; every output device
+    pulls from it through its own callback and cursor, so one connection
+    and one decoder serve all outputs, and pause, seek and gain changes
+    apply at the output.
+    """
+
+    SAMPLERATE = 44100
+    CHANNELS = 2
+    # Minimum playout ring size when time-shift is off
+    PLAYOUT_SECONDS = 2.0
+    DEAD_AIR_CHECK_SECONDS = 0.5
+    # Head start of each mirror over the next, as in Happy Eyeballs
+    MIRROR_STAGGER_SECONDS = 0.25
 
     def __init__(self):
-        self._process = None
+        self.decoder_name = FfmpegDecoder.name
         self._volume = 1.0
         self._is_playing = False
         self._thread = None
@@ -22,46 +311,279 @@ class AudioStreamer:
         self._error_queue = Queue()
         self._current_audio_data = np.ndarray([0] * 32)
         self.output_device = sd.default.device[0]
+        self.timeshift_seconds = 0
+        self.profile: LatencyProfile = get_latency_profile("balanced")
+        self._profile = self.profile
+        # (device, volume) pairs; device None is the default output
+        self.output_config: list[tuple[int | None, float]] = [(None, 1.0)]
+        # Where every output's audio goes; applied on the next play
+        self.sink: OutputSink = SounddeviceSink()
+        self._outputs: list[AudioOutput] = []
+        self._buffer: TimeShiftBuffer | None = None
+        # (min, max) seconds of the adaptive playout buffer; max 0 disables it
+        self.jitter_bounds: tuple[float, float] = (0.0, 0.0)
+        self._jitter: JitterBuffer | None = None
+        # Stage specs of the DSP chain decoded audio goes through, see
+        # controllers.dsp; applied on the next play
+        self.dsp_preset: list[dict] = []
+        self._dsp: DspChain | None = None
+        # Decoded audio of the current stream against the wall clock
+        self._clock = StreamClock()
+        self._timeshifting = False
+        self._drained = threading.Event()
+        self._paused = False
+        # Mirrors being opened, then only the one that is playing
+        self._attempts: list[MirrorAttempt] = []
+        # Open mirrors at once rather than only after the previous failed
+        self.race_mirrors = True
+        # Called from the reader thread with the index of the mirror that
+        # delivered audio first and the number of mirrors started
+        self.on_mirror_won: Callable[[int, int], None] | None = None
+        # Probe hints by URL, and called from the reader thread with the
+        # index of the winning mirror and the format its decoder detected
+        self.probe_hints: dict[str, dict] = {}
+        self.on_probed: Callable[[int, dict], None] | None = None
+        self._first_audio_seconds: float | None = None
+        self.title: str | None = None
+        self.on_title_change: Callable[[str], None] | None = None
+        self.meter = LevelMeter(self.SAMPLERATE)
+        # Called from the reference device callback with each output block
+        self.on_block: Callable[[np.ndarray], None] | None = None
+        # Silence below silence_db dBFS, or no decoded audio, for longer
+        # than dead_air_seconds is reported once; 0 seconds disables it
+        self.dead_air_seconds = 0.0
+        self.silence_db = -60.0
+        self.on_dead_air: Callable[[str, float], None] | None = None
+        self._watching: threading.Event | None = None
+        # Called from the reader thread with the error that ended the stream
+        self.on_stream_error: Callable[[str], None] | None = None
+        # Called from the reader thread once a stream has ended on its own
+        self.on_stream_end: Callable[[], None] | None = None
 
     @property
     def current_audio_data(self) -> np.ndarray:
         """Get current audio data for visualization."""
+        if self._outputs:
+            return self._outputs[0].last_block
         return self._current_audio_data
 
-    def play(self, url: str) -> None:
-        """Start streaming audio from the given URL."""
+    @property
+    def levels(self) -> LevelSnapshot:
+        """Levels of the latest block, metered in the device callback."""
+        return self.meter.snapshot
+
+    @property
+    def outputs(self) -> list[AudioOutput]:
+        """Outputs of the current stream, the reference one first."""
+        return self._outputs
+
+    @property
+    def underruns(self) -> int:
+        """Device underruns across all outputs."""
+        return sum(output.underruns for output in self._outputs)
+
+    @property
+    def device_latency(self) -> float:
+        """Reported output latency of the reference device."""
+        return self._outputs[0].latency if self._outputs else 0.0
+
+    @property
+    def is_paused(self) -> bool:
+        """Whether time-shifted output is paused."""
+        return self._paused
+
+    def stats(self) -> dict:
+        """Buffering figures of the current stream."""
+        stats = {
+            "underruns": self.underruns,
+            "starvations": self._outputs[0].starvations if self._outputs else 0,
+            "buffered_seconds": 0.0,
+        }
+        if self._first_audio_seconds is not None:
+            stats["first_audio_ms"] = self._first_audio_seconds * 1000
+        buffer = self._buffer
+        if buffer is not None and self._outputs:
+            position = buffer.clamp(self._outputs[0].position)
+            stats["buffered_seconds"] = (
+                buffer.write_pos - position
+            ) / buffer.samplerate
+        if self._jitter is not None:
+            stats.update(self._jitter.stats())
+        if self._dsp is not None:
+            stats.update(self._dsp.stats())
+        source = self._attempts[0].source if len(self._attempts) == 1 else None
+        if isinstance(source, HlsStream):
+            stats.update(source.stats())
+            # Segments waiting for the decoder, and decoded audio not yet
+            # played; what sits in the pipe and the decoder is not known
+            stats["hls_ahead_seconds"] = (
+                stats["hls_fetched_seconds"] + stats["buffered_seconds"]
+            )
+        elif isinstance(source, IcyStream) and source.stdin is not None:
+            # Only known when we fetch the stream rather than the decoder
+            stats["received_bytes"] = source.bytes_received
+        if buffer is not None and self._outputs and self._clock.start is not None:
+            stages = self._latency_stages(source, stats["buffered_seconds"])
+            stats["latency_ms"] = sum(filter(None, stages.values()))
+            stats["latency_stages_ms"] = stages
+        return stats
+
+    def _latency_stages(self, source, buffered_seconds: float) -> dict:
+        """Milliseconds the audio heard now has spent in each stage since it
+        was live.
+
+        network: audio not received yet, from the connect backlog or stalls,
+        plus the transit estimate; decoder: received but not decoded, queued
+        in the pipe and the decoder; buffer: decoded but not played, the
+        time-shift delay included; device: the reported output latency.
+        The decoder stage is None, and counted as network, unless we fetch
+        the stream and its bitrate is announced.
+        """
+        now = time.monotonic()
+        decoded = self._clock
+        network, decoder = decoded.behind(now), None
+        if isinstance(source, IcyStream):
+            if source.clock.start is not None:
+                network = source.clock.behind(now)
+                decoder = max(0.0, source.clock.received - decoded.received)
+            network += source.transit
+        stages = {
+            "network": network,
+            "decoder": decoder,
+            "buffer": buffered_seconds,
+            "device": self.device_latency,
+        }
+        return {
+            stage: None if seconds is None else seconds * 1000
+            for stage, seconds in stages.items()
+        }
+
+    @property
+    def timeshift_active(self) -> bool:
+        """Whether the current stream is being time-shift buffered."""
+        return self._buffer is not None and self._timeshifting
+
+    @property
+    def timeshift_delay(self) -> float:
+        """Seconds the output is behind the live edge."""
+        if not self.timeshift_active or not self._outputs:
+            return 0.0
+        position = self._buffer.clamp(self._outputs[0].position)
+        return (self._buffer.write_pos - position) / self._buffer.samplerate
+
+    def pause(self) -> None:
+        """Pause output while the live stream keeps being buffered."""
+        if not self.timeshift_active:
+            raise AudioStreamingError("Time-shift is disabled")
+        self._paused = True
+
+    def resume(self) -> None:
+        """Resume output from where it was paused."""
+        self._paused = False
+
+    def seek(self, seconds: float) -> None:
+        """Move the output position; negative values rewind."""
+        if not self.timeshift_active:
+            raise AudioStreamingError("Time-shift is disabled")
+        delta = int(seconds * self._buffer.samplerate)
+        for output in self._outputs:
+            position = self._buffer.clamp(output.position + delta)
+            if delta > 0:
+                # Forward seeks stop short of the live edge, never going back
+                position = min(position, max(self._live_pos(), output.position))
+            output.seek_to(position)
+
+    def go_live(self) -> None:
+        """Jump back to the live edge."""
+        if self.timeshift_active:
+            for output in self._outputs:
+                output.seek_to(self._live_pos())
+        self._paused = False
+
+    def _live_pos(self) -> int:
+        """Where playing "live" starts: the playout depth of the latency
+        profile behind the live edge, so the device does not run dry."""
+        buffer = self._buffer
+        return max(buffer.oldest_pos, buffer.write_pos - self._profile.playout_frames)
+
+    def set_output_volume(self, device: int | None, volume: float) -> None:
+        """Set the volume (0-1 range) of a single output."""
+        volume = max(0.0, min(1.0, volume))
+        self.output_config = [
+            (d, volume if d == device else v) for d, v in self.output_config
+        ]
+        for output in self._outputs:
+            if output.device == device:
+                output.volume = volume
+
+    def play(self, url: str, mirrors: list[str] = ()) -> None:
+        """Start streaming audio from the given URL.
+
+        ``mirrors`` are further URLs of the same stream; whichever of them
+        delivers audio first is played.
+        """
         if self._is_playing:
             self.stop()
             # Wait for previous thread to finish
             if self._thread and self._thread.is_alive():
                 self._thread.join()
 
-        try:
-            self._process = subprocess.Popen(
-                [
-                    "ffmpeg",
-                    "-i",
-                    url,
-                    "-acodec",
-                    "pcm_s16le",
-                    "-f",
-                    "s16le",
-                    "-ar",
-                    "44100",
-                    "-ac",
-                    "2",
-                    "-bufsize",
-                    "4096",
-                    "pipe:1",
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # Changed to PIPE to capture errors
+        # Profile changes take effect on the next play
+        self._profile = profile = self.profile
+        self._timeshifting = self.timeshift_seconds > 0
+        if self._timeshifting:
+            self._buffer = TimeShiftBuffer(self.timeshift_seconds)
+        else:
+            seconds = max(
+                self.PLAYOUT_SECONDS,
+                2 * profile.buffering_seconds(self.SAMPLERATE),
+                2 * self.jitter_bounds[1],
             )
-        except Exception as e:
-            raise AudioStreamingError(f"Failed to start ffmpeg process: {str(e)}")
+            self._buffer = TimeShiftBuffer(seconds, ram_seconds=seconds)
+        self._jitter = None
+        if not self._timeshifting and self.jitter_bounds[1] > 0:
+            # Adaptation only adds to the depth the latency profile asks for
+            playout = profile.playout_frames / self.SAMPLERATE
+            self._jitter = JitterBuffer(
+                self.SAMPLERATE,
+                max(self.jitter_bounds[0], playout),
+                self.jitter_bounds[1],
+                initial_seconds=playout,
+            )
+        self._clock = StreamClock()
+        self._dsp = None
+        if self.dsp_preset:
+            self._dsp = DspChain.from_specs(self.dsp_preset, self.SAMPLERATE)
+        self._paused = False
+        self._outputs = []
+        for device, volume in self.output_config:
+            reference = self._outputs[0] if self._outputs else None
+            self._outputs.append(AudioOutput(self, device, volume, reference))
+
+        try:
+            self._attempts = [
+                MirrorAttempt(
+                    u,
+                    create_decoder(self.decoder_name),
+                    profile,
+                    self._on_metadata,
+                    self.probe_hints.get(u),
+                )
+                for u in [url, *mirrors]
+            ]
+        except DecoderError as e:
+            raise AudioStreamingError(str(e))
 
+        self.meter.silence_rms = 10 ** (self.silence_db / 20)
+        # Errors of an earlier stream are no news for this one
+        while not self._error_queue.empty():
+            self._error_queue.get()
+        self._first_audio_seconds = None
+        self._last_chunk_time = time.monotonic()
         self._is_playing = True
-        self._thread = threading.Thread(target=self._stream_audio)
+        self._thread = threading.Thread(
+            target=self._stream_audio, args=(self._attempts,)
+        )
         self._thread.daemon = True
         self._thread.start()
 
@@ -72,19 +594,34 @@ class AudioStreamer:
             if not self._error_queue.empty():
                 error = self._error_queue.get()
                 raise AudioStreamingError(f"Streaming thread failed to start: {error}")
+        if self.dead_air_seconds > 0:
+            self._watching = threading.Event()
+            threading.Thread(
+                target=self._watch_dead_air, args=(self._watching,), daemon=True
+            ).start()
 
     def stop(self) -> None:
         """Stop streaming audio."""
         self._is_playing = False  # Signal thread to stop
+        self._drained.set()
+        if self._watching:
+            self._watching.set()
+            self._watching = None
+        for attempt in self._attempts:
+            attempt.abort()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=1.0)  # Wait for thread to finish
-        if self._process:
-            self._process.terminate()
-            self._process = None
+        buffer, self._buffer = self._buffer, None
+        if buffer is not None and not (self._thread and self._thread.is_alive()):
+            buffer.close()
+        self._paused = False
+        self._outputs = []
+        self.meter.reset()
+        self.title = None
         self._current_audio_data = np.ndarray([0] * 32)
 
     def set_volume(self, volume: float) -> None:
-        """Set the volume (0-1 range)."""
+        """Set the volume (0-1 range); applied from the next device period."""
         self._volume = max(0.0, min(1.0, volume))
 
     def check_streaming_thread(self) -> bool:
@@ -95,88 +632,176 @@ class AudioStreamer:
             raise AudioStreamingError(f"Streaming error occurred: {error}")
         return self._thread.is_alive() if self._thread else False
 
-    def _stream_audio(self) -> None:
-        """Stream audio data to sounddevice."""
+    def _stream_audio(self, attempts: list[MirrorAttempt]) -> None:
+        """Decode the stream into the buffer feeding the output devices."""
+        buffer = self._buffer
+        profile = self._profile
+        outputs = self._outputs
+        winner = None
         try:
-            with sd.OutputStream(
-                channels=2,
-                samplerate=44100,
-                dtype="float32",
-                blocksize=4096,
-            ) as stream:
-                while self._is_playing and self._process:
-                    # Check process status
-                    if not self._process:
-                        raise AudioStreamingError("FFmpeg process not found")
-                    elif self._process.poll() is not None:
-                        stderr = self._process.stderr.read().decode(
-                            "utf-8", errors="ignore"
-                        )
-                        raise AudioStreamingError(
-                            f"FFmpeg process terminated unexpectedly: {stderr}"
-                        )
-
-                    data = self._process.stdout.read(
-                        4096 * 4
-                    )  # Reading 16-bit PCM data
-
-                    if not data:
-                        if not self._process:
-                            raise AudioStreamingError("FFmpeg process not found")
-                        elif self._process.poll() is not None:
-                            stderr = self._process.stderr.read().decode(
-                                "utf-8", errors="ignore"
-                            )
-                            raise AudioStreamingError(
-                                f"Stream ended unexpectedly: {stderr}"
-                            )
-                        break
+            stagger = self.MIRROR_STAGGER_SECONDS if self.race_mirrors else None
+            start = time.monotonic()
+            with trace.span("first audio", mirrors=len(attempts)):
+                index, audio_data, started = race(attempts, stagger)
+            self._first_audio_seconds = time.monotonic() - start
+            winner = attempts[index]
+            self._attempts = attempts = [winner]
+            probe = "probe hint" if winner.hint else "full probe"
+            logger.info(
+                f"First audio after {self._first_audio_seconds * 1000:.0f} ms"
+                f" ({probe})"
+            )
+            if started > 1:
+                logger.info(f"Mirror {index + 1} of {started} won: {winner.url}")
+            if self.on_mirror_won:
+                self.on_mirror_won(index, started)
+            if self.on_probed and winner.decoder.detected:
+                self.on_probed(index, winner.decoder.detected)
+            decoder = winner.decoder
+            with contextlib.ExitStack() as streams:
+                for output in outputs:
+                    streams.enter_context(output.open(profile))
+                jitter = self._jitter
+                clock = self._clock
+                dsp = self._dsp
+                paced = False
+                error = None
+                while self._is_playing and audio_data is not None:
+                    self._last_chunk_time = time.monotonic()
+                    clock.on_arrival(len(audio_data) / self.SAMPLERATE)
+                    if dsp:
+                        audio_data = dsp.process(audio_data)
+                    if jitter:
+                        jitter.on_chunk(len(audio_data), paced)
+                    paced = False
 
                     try:
-                        buffer = bytearray(data)
-                        # Convert from 16-bit PCM to float32
-                        audio_data = np.frombuffer(buffer, dtype=np.int16)
-                        audio_data = (
-                            audio_data.astype(np.float32) / 32768.0 * self._volume
-                        )
-                        audio_data = audio_data.reshape(-1, 2)
-
-                        # Store current audio data for visualization
-                        self._current_audio_data = audio_data
-
-                        stream.write(audio_data)
+                        buffer.write(audio_data)
                     except Exception as e:
                         raise AudioStreamingError(f"Audio processing error: {str(e)}")
 
+                    # Time-shift keeps ingesting the live edge; otherwise the
+                    # slowest device paces the reader, which paces ffmpeg,
+                    # once this depth is buffered
+                    limit = jitter.fill_frames if jitter else profile.playout_frames
+                    while (
+                        self._is_playing
+                        and not self._timeshifting
+                        and buffer.write_pos - min(o.position for o in outputs) > limit
+                    ):
+                        paced = True
+                        self._drained.wait(timeout=0.1)
+                        self._drained.clear()
+                    try:
+                        audio_data = decoder.read(profile.read_frames)
+                    except DecoderError as e:
+                        # Play what is buffered before reporting it
+                        error, audio_data = e, None
+                self._drain(buffer, outputs)
+                if error is not None:
+                    raise error
+                if self._is_playing:
+                    # Not stopped by us: the server closed or the file ended,
+                    # which is the end of playback rather than a failure
+                    logger.info("The stream ended")
+                    if self.on_stream_end:
+                        self.on_stream_end()
+
         except Exception as e:
-            self._error_queue.put(str(e))
+            # Failures caused by stop() are not errors
+            if not any(attempt.aborted for attempt in attempts):
+                self._error_queue.put(str(e))
+                if self.on_stream_error:
+                    self.on_stream_error(str(e))
         finally:
             self._is_playing = False
-            if self._process:
-                self._process.terminate()
+            # The race has closed all other attempts
+            if winner is not None:
+                winner.close()
+
+    def _drain(self, buffer: TimeShiftBuffer, outputs: list[AudioOutput]) -> None:
+        """Keep the outputs open until they have played all that is buffered,
+        which may be minutes of time-shift, or until playback is stopped."""
+        while self._is_playing and min(o.position for o in outputs) < buffer.write_pos:
+            # Waiting for buffered audio is not a stalled stream
+            self._last_chunk_time = time.monotonic()
+            self._drained.wait(timeout=0.1)
+            self._drained.clear()
+
+    def _watch_dead_air(self, stopped: threading.Event) -> None:
+        """Report silence or stalls that outlast ``dead_air_seconds``."""
+        detector = DeadAirDetector(self.dead_air_seconds)
+        while not stopped.wait(self.DEAD_AIR_CHECK_SECONDS):
+            if self._paused:
+                continue
+            stalled = time.monotonic() - self._last_chunk_time
+            silence = self.meter.snapshot.silence_seconds
+            if detector.check(silence, stalled) and self.on_dead_air:
+                self.on_dead_air(detector.kind, detector.duration)
+        detector.end("stream stopped")
+
+    def _on_metadata(self, fields: dict[str, str]) -> None:
+        """Called from the fetch thread for every ICY metadata block."""
+        title = fields.get("StreamTitle", "").strip()
+        if title and title != self.title:
+            self.title = title
+            logger.info(f"Now playing: {title}")
+            if self.on_title_change:
+                self.on_title_change(title)
 
     def cleanup(self) -> None:
         """Clean up resources before shutdown."""
         self.stop()
-        if hasattr(self, "_process") and self._process:
-            try:
-                self._process.terminate()
-                self._process.wait(timeout=1)  # Wait for process to terminate
-            except:  # noqa: E722
-                self._process.kill()  # Force kill if terminate fails
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
 
 
 class PlayerController:
     """Controls audio playback using ffmpeg and sounddevice."""
 
-    def __init__(self):
-        self._streamer = AudioStreamer()
+    # Dead air is first met by reconnecting; once this many reconnects have
+    # each been followed by more dead air within RECOVERY_WINDOW seconds,
+    # the station's fallback takes over
+    RECONNECT_ATTEMPTS = 2
+    RECOVERY_WINDOW = 300
+    BITRATE_CHECK_SECONDS = 2.0
+
+    def __init__(self, options: Options | None = None, sink: OutputSink | None = None):
+        self._streamer = None
+        # Replaces the sink chosen in the options, e.g. in benchmarks
+        self._sink = sink
+        self._station: Station | None = None
+        # Finds fallback stations by id
+        self.station_lookup: Callable[[int], Station | None] | None = None
+        self._dead_air_listener: Callable[[Station | None], None] | None = None
+        # Saves the probe hint learned for a station URL, by station id
+        self.probe_hint_store: Callable[[int, str, dict], None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._generation = 0
+        self._reconnects = 0
+        self._last_recovery = 0.0
+        self.options = options or Options()
+        self.apply_options(self.options)
         self._volume = 50  # Initial volume (0-100)
         self._pre_mute_volume = self._volume
         self._is_muted = False
         self._streamer.set_volume(self._volume / 100.0)
         self._is_playing = False
         self._current_url = None
+        self.resolver = StreamResolver(
+            OptionsController.DEFAULT_CONFIG_DIR / "resolved_urls.json"
+        )
+        self.mirror_stats = MirrorStats(
+            OptionsController.DEFAULT_CONFIG_DIR / "mirrors.json"
+        )
+        # Station URLs of the mirrors in the current race, and what they
+        # resolved to
+        self._racing: list[str] = []
+        self._media_urls: list[str] = []
+        # Quality selection among the current station's variants, if any
+        self._bitrate: BitrateSelector | None = None
+        self._bitrate_variants: dict[str, str] = {}
+        self._adapting: asyncio.Task | None = None
 
     @property
     def is_playing(self) -> bool:
@@ -221,31 +846,356 @@ class PlayerController:
             if not self._is_muted:
                 self._streamer.set_volume(self._volume / 100.0)
 
-    async def start_playback(self, url: str) -> bool:
-        """Start playback of the current or specified URL."""
+    @property
+    def is_paused(self) -> bool:
+        """Get time-shift pause state."""
+        return self._streamer.is_paused
+
+    @property
+    def timeshift_enabled(self) -> bool:
+        """Whether the time-shift buffer is configured."""
+        return self._streamer.timeshift_seconds > 0
+
+    @property
+    def timeshift_active(self) -> bool:
+        """Whether the current stream is time-shift buffered."""
+        return self._is_playing and self._streamer.timeshift_active
+
+    @property
+    def timeshift_delay(self) -> float:
+        """Seconds behind the live edge."""
+        return self._streamer.timeshift_delay
+
+    def apply_options(self, options: Options) -> bool:
+        """Apply player-related options; they take effect on the next play.
+
+        Returns True if the set of outputs changed.
+        """
+        self.options = options
+        changed = self._use_audio_process(options.audio_process)
+        self._streamer.timeshift_seconds = (options.timeshift_minutes or 0) * 60
+        self._streamer.decoder_name = options.decoder
+        self._streamer.sink = self._sink or create_sink(
+            options.output_sink,
+            options.wav_path
+            or str(OptionsController.DEFAULT_CONFIG_DIR / "output.wav"),
+        )
+        self._streamer.race_mirrors = options.mirror_start == "race"
+        self._streamer.jitter_bounds = (
+            options.jitter_buffer_min_ms / 1000,
+            options.jitter_buffer_max_ms / 1000,
+        )
+        self._streamer.profile = get_latency_profile(
+            options.latency_profile, options.custom_latency
+        )
+        volumes = options.output_volumes
+        outputs = [(None, volumes.get(str(options.output_device), 100) / 100)]
+        outputs += [
+            (device, volumes.get(str(device), 100) / 100)
+            for device in dict.fromkeys(options.extra_output_devices)
+            if device != options.output_device
+        ]
+        changed |= [d for d, _ in outputs] != [
+            d for d, _ in self._streamer.output_config
+        ]
+        self._streamer.output_config = outputs
+        for device, volume in outputs:
+            self._streamer.set_output_volume(device, volume)
+        return changed
+
+    def _use_audio_process(self, enabled: bool) -> bool:
+        """Switch between in-process and worker process audio.
+
+        Returns True if the streamer was replaced; playback then has to be
+        restarted.
+        """
+        # Imported here: the worker module builds on this one
+        from terminal_radio.controllers.worker import ProcessStreamer
+
+        streamer_class = ProcessStreamer if enabled else AudioStreamer
+        if isinstance(self._streamer, streamer_class):
+            return False
+        old, self._streamer = self._streamer, streamer_class()
+        self._streamer.on_dead_air = self._on_dead_air
+        self._streamer.on_mirror_won = self._on_mirror_won
+        self._streamer.on_probed = self._on_probed
+        self._streamer.on_stream_error = self._on_stream_error
+        self._streamer.on_stream_end = self._on_stream_end
+        if old is None:
+            return False
+        self._streamer.on_title_change = old.on_title_change
+        old.cleanup()
+        return True
+
+    def set_output_volume(self, device: int | None, volume: int) -> None:
+        """Set the volume (0-100) of one output; None is the main device."""
+        self._streamer.set_output_volume(device, max(0, min(100, volume)) / 100.0)
+
+    async def toggle_pause(self) -> bool:
+        """Pause or resume time-shifted playback."""
+        if self._streamer.is_paused:
+            self._streamer.resume()
+        else:
+            self._streamer.pause()
+        return self._streamer.is_paused
+
+    async def seek(self, seconds: float) -> float:
+        """Seek within the time-shift buffer, returning the new delay."""
+        self._streamer.seek(seconds)
+        return self._streamer.timeshift_delay
+
+    async def go_live(self) -> None:
+        """Return to the live edge."""
+        self._streamer.go_live()
+
+    async def start_playback(self, url: str, station: Station | None = None) -> bool:
+        """Start playback of the current or specified URL.
+
+        ``station``, when given, supplies the mirrors, the dead-air
+        thresholds and the fallback of the URL. Stations with quality
+        variants play the one the bitrate selector is on instead.
+        """
+        self._loop = asyncio.get_running_loop()
         try:
             if self._is_playing:
                 await self.stop_playback()
             if url:
-                self._current_url = url
+                self._current_url = self._select_variant(url, station)
+                self._station = station
             if self._current_url:
                 self._streamer.set_volume(self._volume / 100.0)
-                self._streamer.play(self._current_url)
-                self._is_playing = True
-                # Verify streaming started successfully
-                self._streamer.check_streaming_thread()
+                urls = self._urls()
+                with trace.span("resolve"):
+                    media_urls = await self._resolve(urls)
+                try:
+                    self._play(urls, media_urls)
+                except AudioStreamingError:
+                    # Cached resolutions may have gone stale; redo them once.
+                    # The error also reached _on_stream_error, which need
+                    # not retry as well
+                    self._generation += 1
+                    for u in urls:
+                        self.resolver.invalidate(u)
+                    resolved = await self._resolve(urls, wait=True)
+                    if resolved == media_urls:
+                        raise
+                    self._play(urls, resolved)
+                if self._bitrate is not None and self._adapting is None:
+                    self._adapting = self._loop.create_task(self._adapt_bitrate())
                 return True
             return False
         except AudioStreamingError:
             self._is_playing = False
             raise  # Re-raise the error to be handled by the UI layer
 
+    def _select_variant(self, url: str, station: Station | None) -> str:
+        """The URL to play for ``url``, keeping the selector of ``station``."""
+        if station is None or not station.variants:
+            self._bitrate = None
+            return url
+        if self._bitrate is None or station.variants != self._bitrate_variants:
+            self._bitrate = BitrateSelector(station.variants, station.url)
+            self._bitrate_variants = dict(station.variants)
+            if not self._bitrate.variants:
+                self._bitrate = None
+                return url
+        return self._bitrate.url
+
+    async def _adapt_bitrate(self) -> None:
+        """Switch between variants as the selector decides while playing."""
+        generation = None
+        try:
+            while self._is_playing and self._bitrate is not None:
+                selector, now = self._bitrate, time.monotonic()
+                if generation != self._generation:
+                    # Counters start over with every connection
+                    generation = self._generation
+                    selector.restart(now)
+                elif not self._streamer.is_paused:
+                    stats = self._streamer.stats()
+                    url = selector.update(
+                        now,
+                        stats.get("received_bytes"),
+                        stats["starvations"],
+                        stats["buffered_seconds"],
+                    )
+                    if url:
+                        await self.start_playback(url, self._station)
+                await asyncio.sleep(self.BITRATE_CHECK_SECONDS)
+        except AudioStreamingError as e:
+            logger.error(f"Switching bitrate failed: {e}")
+        finally:
+            self._adapting = None
+
+    def _urls(self) -> list[str]:
+        """The current URL and its mirrors, likeliest winners first."""
+        station = self._station
+        if station is None or station.url != self._current_url or not station.mirrors:
+            return [self._current_url]
+        return self.mirror_stats.order([station.url, *station.mirrors])
+
+    async def _resolve(self, urls: list[str], wait: bool = False) -> list[str]:
+        """Media URLs of ``urls``.
+
+        Unless ``wait``, mirrors do not wait for resolutions that are not
+        cached, which would hold the whole race up: they start from their
+        own URL and are resolved in the background for next time.
+        """
+        if wait or len(urls) == 1:
+            return list(await asyncio.gather(*(self.resolver.get(u) for u in urls)))
+        media_urls = []
+        for url in urls:
+            media_url = self.resolver.cached(url)
+            if media_url is None:
+                self.resolver.refresh_in_background(url)
+            media_urls.append(media_url or url)
+        return media_urls
+
+    def _play(self, urls: list[str], media_urls: list[str]) -> None:
+        station, options = self._station, self.options
+        self._streamer.dead_air_seconds = options.dead_air_seconds
+        self._streamer.silence_db = options.silence_db
+        if station is not None and station.dead_air_seconds is not None:
+            self._streamer.dead_air_seconds = station.dead_air_seconds
+        if station is not None and station.silence_db is not None:
+            self._streamer.silence_db = station.silence_db
+        preset = options.dsp_preset
+        if station is not None and station.dsp_preset is not None:
+            preset = station.dsp_preset
+        self._streamer.dsp_preset = get_dsp_preset(preset, options.dsp_presets)
+        self._generation += 1
+        self._racing = urls
+        self._media_urls = media_urls
+        hints = station.probe_hints if station is not None else {}
+        self._streamer.probe_hints = {
+            media_url: hints[url]
+            for url, media_url in zip(urls, media_urls)
+            if url in hints
+        }
+        with trace.span("play", url=media_urls[0]):
+            self._streamer.play(media_urls[0], media_urls[1:])
+        self._is_playing = True
+        # Verify streaming started successfully
+        self._streamer.check_streaming_thread()
+
     async def stop_playback(self) -> None:
         """Stop playback."""
         if self._is_playing:
-            self._streamer.stop()
+            with trace.span("stop"):
+                self._streamer.stop()
             self._is_playing = False
 
+    def set_dead_air_listener(
+        self, listener: Callable[[Station | None], None] | None
+    ) -> None:
+        """Call ``listener`` with the station playing after dead air recovery.
+
+        The station is None for plain URLs; playback may also have stopped
+        if recovery failed, after the stream failed and could not be played
+        again, or after it ended on its own. Called on the event loop.
+        """
+        self._dead_air_listener = listener
+
+    def _on_mirror_won(self, index: int, started: int) -> None:
+        """Called from the reader thread once a mirror has won the race."""
+        urls = self._racing
+        if len(urls) > 1 and index < len(urls):
+            self.mirror_stats.record(urls[:started], urls[index])
+
+    def _on_probed(self, index: int, detected: dict) -> None:
+        """Called from the reader thread with the format the winner detected."""
+        station, urls, loop = self._station, self._racing, self._loop
+        if station is None or index >= len(urls) or loop is None:
+            return
+        url = urls[index]
+        if station.probe_hints.get(url) != detected and self.probe_hint_store:
+            loop.call_soon_threadsafe(self.probe_hint_store, station.id, url, detected)
+
+    def _on_stream_error(self, error: str) -> None:
+        """Called from the reader thread when the stream failed, which for
+        connecting and decoding is after ``start_playback`` returned."""
+        loop, generation = self._loop, self._generation
+        if loop is not None:
+            loop.call_soon_threadsafe(
+                lambda: loop.create_task(self._handle_stream_error(generation, error))
+            )
+
+    def _on_stream_end(self) -> None:
+        """Called from the reader thread when the stream ended on its own."""
+        loop, generation = self._loop, self._generation
+        if loop is not None:
+            loop.call_soon_threadsafe(self._handle_stream_end, generation)
+
+    def _handle_stream_end(self, generation: int) -> None:
+        """Mark playback stopped, without retrying, and tell the listener."""
+        if generation != self._generation or not self._is_playing:
+            return
+        self._is_playing = False
+        if self._dead_air_listener:
+            self._dead_air_listener(self._station)
+
+    async def _handle_stream_error(self, generation: int, error: str) -> None:
+        """Play again if the cached resolutions had gone stale, else stop."""
+        if generation != self._generation or not self._is_playing:
+            return
+        logger.error(f"Stream failed: {error}")
+        urls, media_urls = self._racing, self._media_urls
+        for u in urls:
+            self.resolver.invalidate(u)
+        resolved = await self._resolve(urls, wait=True)
+        if generation != self._generation or not self._is_playing:
+            # The user has moved on meanwhile
+            return
+        if resolved != media_urls:
+            logger.warning(f"Retrying with fresh resolutions of {', '.join(urls)}")
+            try:
+                self._play(urls, resolved)
+                return
+            except AudioStreamingError as e:
+                logger.error(f"Retrying failed: {e}")
+        self._is_playing = False
+        if self._dead_air_listener:
+            self._dead_air_listener(self._station)
+
+    def _on_dead_air(self, kind: str, seconds: float) -> None:
+        """Called from the streamer's watch thread when dead air starts."""
+        loop, generation = self._loop, self._generation
+        if loop is not None:
+            loop.call_soon_threadsafe(
+                lambda: loop.create_task(self._recover(generation))
+            )
+
+    async def _recover(self, generation: int) -> None:
+        """Reconnect, or switch to the fallback station, after dead air."""
+        if generation != self._generation or not self._is_playing:
+            # The user has moved on since the dead air was detected
+            return
+        station = self._station
+        now = time.monotonic()
+        if now - self._last_recovery > self.RECOVERY_WINDOW:
+            self._reconnects = 0
+        self._last_recovery = now
+        fallback = None
+        if station and station.fallback_id is not None and self.station_lookup:
+            fallback = self.station_lookup(station.fallback_id)
+        name = station.name if station else self._current_url
+        try:
+            if fallback is not None and self._reconnects >= self.RECONNECT_ATTEMPTS:
+                logger.warning(f"Switching from {name} to fallback {fallback.name}")
+                self._reconnects = 0
+                await self.start_playback(fallback.url, fallback)
+            else:
+                self._reconnects += 1
+                logger.warning(f"Reconnecting to {name} ({self._reconnects})")
+                # A stale resolution may be what went quiet
+                for url in self._racing:
+                    self.resolver.invalidate(url)
+                await self.start_playback(self._current_url, station)
+        except AudioStreamingError as e:
+            logger.error(f"Recovery from dead air failed: {e}")
+        if self._dead_air_listener:
+            self._dead_air_listener(self._station)
+
     async def cleanup(self) -> None:
         """Clean up resources before shutting down."""
         if self._is_playing:
@@ -256,6 +1206,28 @@ class PlayerController:
         """Get current audio data for visualization."""
         return self._streamer.current_audio_data
 
+    def get_levels(self) -> LevelSnapshot:
+        """Levels of the latest output block, see LevelMeter."""
+        return self._streamer.levels
+
+    @property
+    def title(self) -> str | None:
+        """Current ICY stream title, if the station sends one."""
+        return self._streamer.title
+
+    def set_title_listener(self, listener: Callable[[str], None] | None) -> None:
+        """Call ``listener`` (from a worker thread) when the title changes."""
+        self._streamer.on_title_change = listener
+
+    def stats(self) -> dict:
+        """Buffering figures of the current stream, e.g. HLS fetch times."""
+        stats = self._streamer.stats()
+        if self._bitrate is not None:
+            stats["variant_kbps"] = self._bitrate.bitrate
+            if self._bitrate.throughput is not None:
+                stats["throughput_kbps"] = self._bitrate.throughput
+        return stats
+
     def set_output_device(self, device: int) -> None:
         """Set the output device for audio playback."""
         sd.default.device = device
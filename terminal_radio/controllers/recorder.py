@@ -0,0 +1,392 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from queue import Queue
+
+import requests
+
+from terminal_radio.controllers.icy import close_response
+from terminal_radio.controllers.resolver import StreamResolver
+
+logger = logging.getLogger(__name__)
+
+# File extensions by content type; anything else is saved as .audio
+EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/aac": ".aac",
+    "audio/aacp": ".aac",
+    "audio/ogg": ".ogg",
+    "application/ogg": ".ogg",
+    "audio/opus": ".opus",
+    "audio/flac": ".flac",
+}
+REPEATS = {"": 0, "daily": 24 * 60 * 60, "weekly": 7 * 24 * 60 * 60}
+
+
+@dataclass
+class Recording:
+    """A scheduled capture of a station."""
+
+    url: str
+    # Wall clock start, epoch seconds, and length in seconds
+    start: float
+    duration: float
+    id: int = 0
+    name: str = ""
+    station_id: int | None = None
+    # "", "daily" or "weekly"
+    repeat: str = ""
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class CaptureJob:
+    """Copies one stream to a file, as received, until the recording ends.
+
+    The connection is read on the pool thread running ``run`` and written
+    by a thread of its own through a bounded queue, which absorbs short
+    disk stalls. When the queue is full the reader waits, and the server
+    in turn, rather than memory growing without bound. Dropped connections
+    are reopened until the end time, appending to the same file.
+    """
+
+    CHUNK_SIZE = 16 * 1024
+    # About four minutes of a 128 kbps stream
+    QUEUE_CHUNKS = 256
+    TIMEOUT = 10.0
+    RETRY_SECONDS = 5.0
+
+    def __init__(
+        self, recording: Recording, directory: Path, resolver: StreamResolver
+    ) -> None:
+        self.recording = recording
+        self.directory = directory
+        self.resolver = resolver
+        self.state = "queued"
+        self.path: Path | None = None
+        self.error: str | None = None
+        self.bytes_received = 0
+        self.bytes_written = 0
+        self.reconnects = 0
+        # Time spent in file writes, and the reader spent waiting for them
+        self.write_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._started: float | None = None
+        self._finished: float | None = None
+        self._queue: Queue = Queue(self.QUEUE_CHUNKS)
+        self._stopped = threading.Event()
+        self._response: requests.Response | None = None
+
+    def run(self) -> None:
+        """Record until the end time or ``stop``; called on a pool thread."""
+        recording = self.recording
+        if self._stopped.is_set():
+            # Removed from the schedule before a worker got to it
+            self.state = "cancelled"
+            return
+        if time.time() >= recording.end:
+            self.state = "missed"
+            logger.warning(f"Recording {recording.name} got no worker in time")
+            return
+        self.state = "recording"
+        self._started = time.monotonic()
+        writer = None
+        try:
+            while not self._stopped.is_set() and time.time() < recording.end:
+                try:
+                    response = self._connect()
+                    if writer is None:
+                        writer = self._start_writer(response)
+                    self._copy(response)
+                except (OSError, requests.RequestException) as exc:
+                    if self._stopped.is_set():
+                        break
+                    self.error = str(exc)
+                    logger.warning(f"Recording {recording.name} interrupted: {exc}")
+                    self._stopped.wait(self.RETRY_SECONDS)
+                    self.reconnects += 1
+        finally:
+            if writer is not None:
+                self._queue.put(None)
+                writer.join()
+            self._finished = time.monotonic()
+            self.state = "done" if self.bytes_written else "failed"
+            logger.info(
+                f"Recording {recording.name} {self.state}:"
+                f" {self.bytes_written / 1e6:.1f} MB to {self.path}"
+            )
+
+    def _connect(self) -> requests.Response:
+        url = self.resolver.cached(self.recording.url) or self.resolver.resolve(
+            self.recording.url
+        )
+        response = requests.get(url, stream=True, timeout=self.TIMEOUT)
+        response.raise_for_status()
+        self._response = response
+        if self._stopped.is_set():
+            close_response(response)
+        return response
+
+    def _start_writer(self, response: requests.Response) -> threading.Thread:
+        content_type = response.headers.get("content-type", "").split(";")[0]
+        extension = EXTENSIONS.get(content_type.strip().lower(), ".audio")
+        name = re.sub(r"[^\w.-]+", "_", self.recording.name or "recording")
+        stamp = time.strftime("%Y%m%d-%H%M", time.localtime(self.recording.start))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{name}-{stamp}{extension}"
+        counter = 1
+        while path.exists():
+            counter += 1
+            path = self.directory / f"{name}-{stamp}-{counter}{extension}"
+        self.path = path
+        file = path.open("wb")
+        writer = threading.Thread(target=self._write, args=(file,), daemon=True)
+        writer.start()
+        return writer
+
+    def _copy(self, response: requests.Response) -> None:
+        queue, end = self._queue, self.recording.end
+        try:
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if self._stopped.is_set():
+                    break
+                self.bytes_received += len(chunk)
+                if queue.full():
+                    if not self.blocked_seconds:
+                        logger.warning(
+                            f"Recording {self.recording.name}: disk is falling"
+                            " behind, slowing the download down"
+                        )
+                    start = time.monotonic()
+                    queue.put(chunk)
+                    self.blocked_seconds += time.monotonic() - start
+                else:
+                    queue.put(chunk)
+                if time.time() >= end:
+                    break
+        finally:
+            close_response(response)
+
+    def _write(self, file) -> None:
+        with file:
+            while (chunk := self._queue.get()) is not None:
+                start = time.monotonic()
+                try:
+                    file.write(chunk)
+                except OSError as exc:
+                    # Keep draining so the reader never blocks for good
+                    self.error = str(exc)
+                    self._stopped.set()
+                    continue
+                self.write_seconds += time.monotonic() - start
+                self.bytes_written += len(chunk)
+
+    def stop(self) -> None:
+        """End the recording early; safe to call from any thread."""
+        self._stopped.set()
+        if self._response is not None:
+            close_response(self._response)
+
+    def stats(self) -> dict:
+        """Bandwidth, disk throughput and backpressure of this capture."""
+        elapsed = 0.0
+        if self._started is not None:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        return {
+            "state": self.state,
+            "path": str(self.path) if self.path else None,
+            "error": self.error,
+            "received_bytes": self.bytes_received,
+            "written_bytes": self.bytes_written,
+            "kbps": self.bytes_received * 8 / 1000 / elapsed if elapsed else 0.0,
+            # While writing, so a disk near its limit shows as a low figure
+            "disk_mb_per_s": (
+                self.bytes_written / 1e6 / self.write_seconds
+                if self.write_seconds
+                else None
+            ),
+            "queued_chunks": self._queue.qsize(),
+            "backpressure_seconds": self.blocked_seconds,
+            "reconnects": self.reconnects,
+        }
+
+
+class RecordingScheduler:
+    """Runs scheduled recordings alongside playback.
+
+    The schedule is kept in a JSON file. Recordings due are handed to a
+    pool of at most ``max_workers`` capture jobs, each with its own
+    connection, apart from the player's; beyond that they wait for a free
+    worker and record what is left of their slot. Repeating recordings move
+    on to their next slot when one ends, the others leave the schedule.
+    """
+
+    MAX_WORKERS = 32
+    # Longest sleep between schedule checks; changes wake the loop anyway
+    CHECK_SECONDS = 60.0
+    # Finished jobs kept for reporting
+    HISTORY = 50
+
+    def __init__(
+        self,
+        path: Path,
+        directory: Path,
+        resolver: StreamResolver,
+        max_workers: int = MAX_WORKERS,
+    ) -> None:
+        self.path = path
+        self.directory = directory
+        self.resolver = resolver
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._recordings: dict[int, Recording] = {}
+        # Ids are never reused, so they cannot meet a job of a removed one
+        self._next_id = 1
+        self._jobs: dict[int, CaptureJob] = {}
+        # Start of the slot each recording last had a job for, so a job
+        # that gave up early is not started again for the same slot
+        self._recorded: dict[int, float] = {}
+        self._history: deque[CaptureJob] = deque(maxlen=self.HISTORY)
+        self._pool = ThreadPoolExecutor(self.max_workers, "recording")
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = []
+        for entry in data:
+            recording = Recording(**entry)
+            self._recordings[recording.id] = recording
+        self._next_id = max(self._recordings, default=0) + 1
+
+    def _save(self) -> None:
+        with self._lock:
+            data = json.dumps([asdict(r) for r in self._recordings.values()], indent=2)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(data)
+            tmp.replace(self.path)
+        except OSError as exc:
+            logger.warning(f"Could not save the recording schedule: {exc}")
+
+    def start(self) -> None:
+        """Start following the schedule in the background."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, recording: Recording) -> Recording:
+        """Schedule ``recording``, assigning its id."""
+        if recording.repeat not in REPEATS:
+            raise ValueError(f"Unknown repeat {recording.repeat!r}")
+        if recording.duration <= 0:
+            raise ValueError("Recordings need a positive duration")
+        with self._lock:
+            recording.id = self._next_id
+            self._next_id += 1
+            self._recordings[recording.id] = recording
+        self._save()
+        self._wake.set()
+        return recording
+
+    def remove(self, recording_id: int) -> None:
+        """Drop a recording from the schedule, stopping it if it is running."""
+        with self._lock:
+            if self._recordings.pop(recording_id, None) is None:
+                raise ValueError(f"No recording with id {recording_id}")
+            job = self._jobs.get(recording_id)
+        if job is not None:
+            job.stop()
+        self._save()
+        self._wake.set()
+
+    def recordings(self) -> list[dict]:
+        """The schedule, with the stats of running jobs, then recent ones."""
+        with self._lock:
+            scheduled = [
+                {**asdict(r), **self._job_stats(r.id)}
+                for r in sorted(self._recordings.values(), key=lambda r: r.start)
+            ]
+            finished = [
+                {**asdict(job.recording), **job.stats()} for job in self._history
+            ]
+        return scheduled + finished
+
+    def _job_stats(self, recording_id: int) -> dict:
+        job = self._jobs.get(recording_id)
+        return job.stats() if job is not None else {"state": "scheduled"}
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.clear()
+            timeout = self._check(time.time())
+            self._wake.wait(timeout)
+
+    def _check(self, now: float) -> float:
+        """Start due recordings and retire ended ones.
+
+        Returns the seconds until the next start.
+        """
+        changed = False
+        next_start = now + self.CHECK_SECONDS
+        with self._lock:
+            for recording_id, job in list(self._jobs.items()):
+                if job.state in ("done", "failed", "missed", "cancelled"):
+                    del self._jobs[recording_id]
+                    self._history.append(job)
+            for recording in list(self._recordings.values()):
+                if recording.id in self._jobs:
+                    continue
+                if now >= recording.end:
+                    # Ended, whether recorded or missed while not running
+                    if REPEATS[recording.repeat]:
+                        while now >= recording.end:
+                            recording.start += REPEATS[recording.repeat]
+                    else:
+                        del self._recordings[recording.id]
+                    changed = True
+                if recording.start <= now < recording.end:
+                    if self._recorded.get(recording.id) != recording.start:
+                        self._submit(recording)
+                elif recording.start > now:
+                    next_start = min(next_start, recording.start)
+        if changed:
+            self._save()
+        return max(0.0, min(next_start - now, self.CHECK_SECONDS))
+
+    def _submit(self, recording: Recording) -> None:
+        # Jobs get a copy, as repeating recordings move on meanwhile
+        job = CaptureJob(Recording(**asdict(recording)), self.directory, self.resolver)
+        self._jobs[recording.id] = job
+        self._recorded[recording.id] = recording.start
+        busy = sum(job.state == "recording" for job in self._jobs.values())
+        if busy >= self.max_workers:
+            logger.warning(
+                f"Recording {recording.name} waits for one of"
+                f" {self.max_workers} workers"
+            )
+        future = self._pool.submit(job.run)
+        # Finished jobs are retired on the next check
+        future.add_done_callback(lambda _: self._wake.set())
+
+    def stop(self) -> None:
+        """Stop all recordings and the scheduler."""
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.stop()
+        self._pool.shutdown(wait=True, cancel_futures=True)
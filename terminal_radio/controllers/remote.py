@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import socket
+from pathlib import Path
+
+import numpy as np
+
+from terminal_radio.controllers.metering import LevelSnapshot
+from terminal_radio.controllers.options import Options
+from terminal_radio.controllers.player import AudioStreamingError
+
+logger = logging.getLogger(__name__)
+
+
+class RemotePlayerController:
+    """Drop-in PlayerController that forwards to a running daemon.
+
+    State properties return the status from the latest response, so the UI
+    can keep reading them synchronously; ``poll`` refreshes it and reports
+    what the daemon changed on its own, such as titles and recoveries.
+    """
+
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        self.options: Options | None = None
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+        self._status = self._request_sync("status")
+        self._title_listener = None
+        self._dead_air_listener = None
+        self.station_lookup = None
+        self._requests = 0
+        # Requests sent without waiting, kept so they are not collected early
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def daemon_running(cls, socket_path: Path) -> bool:
+        """Whether a daemon accepts connections on ``socket_path``."""
+        if not socket_path.exists():
+            return False
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(socket_path))
+            except OSError:
+                return False
+        return True
+
+    def _request_sync(self, command: str, **params) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(self.socket_path))
+            sock.sendall(json.dumps({"command": command, **params}).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                return self._parse(f.readline())
+
+    @staticmethod
+    def _parse(line: bytes) -> dict:
+        if not line:
+            raise AudioStreamingError("Daemon closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise AudioStreamingError(response["error"])
+        return response["status"]
+
+    async def request(self, command: str, **params) -> dict:
+        """Send a command and return the daemon status."""
+        async with self._lock:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    str(self.socket_path)
+                )
+            self._writer.write(
+                json.dumps({"command": command, **params}).encode() + b"\n"
+            )
+            try:
+                await self._writer.drain()
+                line = await self._reader.readline()
+            except ConnectionError:
+                line = b""
+            if not line:
+                self._writer.close()
+                self._reader = self._writer = None
+            self._requests += 1
+            self._status = self._parse(line)
+        return self._status
+
+    async def poll(self) -> None:
+        """Refresh the status and call the listeners on changes the daemon
+        made by itself."""
+        old, requests = self._status, self._requests
+        try:
+            new = await self.request("status")
+        except (AudioStreamingError, OSError) as e:
+            logger.warning(f"Daemon status unavailable: {e}")
+            return
+        if self._requests != requests + 1:
+            # Another command went in between; its changes are not news
+            return
+        if new.get("title") != old.get("title") and self._title_listener:
+            # Called from a thread, as the local player calls it
+            await asyncio.to_thread(self._title_listener, new.get("title"))
+        recovered = new["station_id"] != old["station_id"] or (
+            old["playing"] and not new["playing"]
+        )
+        if recovered and self._dead_air_listener:
+            station = None
+            if new["station_id"] is not None and self.station_lookup:
+                station = self.station_lookup(new["station_id"])
+            self._dead_air_listener(station)
+
+    @property
+    def is_playing(self) -> bool:
+        return self._status["playing"]
+
+    @property
+    def volume(self) -> int:
+        return self._status["volume"]
+
+    @property
+    def is_muted(self) -> bool:
+        return self._status["muted"]
+
+    @property
+    def is_paused(self) -> bool:
+        return self._status["paused"]
+
+    @property
+    def timeshift_enabled(self) -> bool:
+        return self._status["timeshift_enabled"]
+
+    @property
+    def timeshift_active(self) -> bool:
+        return self._status["timeshift_active"]
+
+    @property
+    def timeshift_delay(self) -> float:
+        return self._status["timeshift_delay"]
+
+    async def toggle_mute(self) -> bool:
+        return (await self.request("mute"))["muted"]
+
+    async def set_volume(self, volume: int) -> None:
+        await self.request("volume", volume=volume)
+
+    async def change_volume(self, delta: int) -> None:
+        await self.request("volume", delta=delta)
+
+    async def toggle_pause(self) -> bool:
+        return (await self.request("pause"))["paused"]
+
+    async def seek(self, seconds: float) -> float:
+        return (await self.request("seek", seconds=seconds))["timeshift_delay"]
+
+    async def go_live(self) -> None:
+        await self.request("live")
+
+    async def start_playback(self, url: str, station=None) -> bool:
+        if station is not None:
+            return (await self.request("play", station_id=station.id))["playing"]
+        return (await self.request("play", url=url))["playing"]
+
+    async def stop_playback(self) -> None:
+        await self.request("stop")
+
+    async def cleanup(self) -> None:
+        """Detach from the daemon; playback carries on."""
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    def apply_options(self, options: Options) -> bool:
+        """Ask the daemon to pick up the options file the UI just saved."""
+        self.options = options
+        task = asyncio.get_running_loop().create_task(self.request("reload_options"))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return False
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (error := task.exception()):
+            logger.warning(f"Daemon did not reload the options: {error}")
+
+    def get_current_audio_data(self) -> np.ndarray:
+        """PCM stays in the daemon; nothing to visualize."""
+        return np.zeros((0, 2), dtype=np.float32)
+
+    def get_levels(self) -> LevelSnapshot:
+        return LevelSnapshot()
+
+    @property
+    def title(self) -> str | None:
+        return self._status.get("title")
+
+    def set_title_listener(self, listener) -> None:
+        """Call ``listener`` with titles found by ``poll``."""
+        self._title_listener = listener
+
+    def set_dead_air_listener(self, listener) -> None:
+        """Call ``listener`` on the event loop when ``poll`` finds the daemon
+        stopped or switched stations by itself."""
+        self._dead_air_listener = listener
+
+    def stats(self) -> dict:
+        return self._status.get("stats", {})
+
+    def set_output_device(self, device: int) -> None:
+        """Device changes are applied by the daemon on reload."""
+
+    def get_output_device(self) -> int:
+        if self.options is not None and self.options.output_device is not None:
+            return self.options.output_device
+        return self._status["output_device"]
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def parse_playlist(text: str) -> list[str]:
+    """Stream URLs listed in a PLS or M3U playlist, in order."""
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.lower().startswith("file") and "=" in line:
+            entries.append(line.split("=", 1)[1].strip())
+        elif line and not line.startswith(("#", "[")) and "=" not in line:
+            entries.append(line)
+    return entries
+
+
+class StreamResolver:
+    """Expands playlist wrappers and redirects into the final media URL.
+
+    Resolutions are cached per station URL in a JSON file, so restarts skip
+    the chain too. Entries older than ``ttl`` are still used but re-resolved
+    in the background; ``invalidate`` drops one after a playback failure.
+    """
+
+    TTL = 6 * 60 * 60
+    MAX_HOPS = 5
+    TIMEOUT = 10.0
+    PLAYLIST_TYPES = ("scpls", "mpegurl")
+    PLAYLIST_EXTENSIONS = (".pls", ".m3u")
+    # Enough for any wrapper playlist; we never read into a media stream
+    MAX_PLAYLIST_BYTES = 64 * 1024
+
+    def __init__(self, cache_path: Path, ttl: float = TTL) -> None:
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._cache: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            self._cache = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def _save(self) -> None:
+        with self._lock:
+            data = json.dumps(self._cache, indent=2)
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(data)
+            tmp.replace(self.cache_path)
+        except OSError as exc:
+            logger.warning(f"Failed to save resolved URLs: {exc}")
+
+    def _is_playlist(self, url: str, content_type: str) -> bool:
+        path = urlparse(url).path.lower()
+        if path.endswith(".m3u8"):
+            # HLS playlists are played as such, see HlsStream
+            return False
+        return path.endswith(self.PLAYLIST_EXTENSIONS) or any(
+            t in content_type for t in self.PLAYLIST_TYPES
+        )
+
+    def resolve(self, url: str) -> str:
+        """Follow redirects and playlist wrappers now and cache the result.
+
+        Falls back to ``url`` itself when resolution fails, leaving it to the
+        decoder.
+        """
+        current = url
+        try:
+            for _ in range(self.MAX_HOPS):
+                if not current.startswith(("http://", "https://")):
+                    break
+                with requests.get(current, stream=True, timeout=self.TIMEOUT) as r:
+                    r.raise_for_status()
+                    content_type = r.headers.get("content-type", "").lower()
+                    if not self._is_playlist(r.url, content_type):
+                        current = r.url
+                        break
+                    text = r.raw.read(self.MAX_PLAYLIST_BYTES, decode_content=True)
+                text = text.decode("utf-8", errors="replace")
+                entries = parse_playlist(text)
+                if "#EXT-X-" in text or not entries:
+                    # HLS served as .m3u, or nothing to expand
+                    current = r.url
+                    break
+                current = urljoin(r.url, entries[0])
+        except requests.RequestException as exc:
+            logger.warning(f"Could not resolve {url}: {exc}")
+            return url
+        if current != url:
+            logger.info(f"Resolved {url} to {current}")
+        with self._lock:
+            self._cache[url] = {"url": current, "resolved_at": time.time()}
+        self._save()
+        return current
+
+    def cached(self, url: str) -> str | None:
+        """Cached media URL for ``url``; stale entries are refreshed meanwhile."""
+        with self._lock:
+            entry = self._cache.get(url)
+        if entry is None:
+            return None
+        if time.time() - entry["resolved_at"] > self.ttl:
+            self.refresh_in_background(url)
+        return entry["url"]
+
+    async def get(self, url: str) -> str:
+        """Media URL for ``url``, resolving off the event loop on a cache miss."""
+        if (media_url := self.cached(url)) is not None:
+            return media_url
+        return await asyncio.get_running_loop().run_in_executor(None, self.resolve, url)
+
+    def refresh_in_background(self, url: str) -> None:
+        """Re-resolve ``url`` on a worker thread unless one already is."""
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def refresh() -> None:
+            try:
+                self.resolve(url)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(url)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def invalidate(self, url: str) -> None:
+        """Forget the resolution of ``url``, e.g. after it failed to play."""
+        with self._lock:
+            removed = self._cache.pop(url, None)
+        if removed is not None:
+            self._save()
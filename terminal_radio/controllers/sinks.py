@@ -0,0 +1,228 @@
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import sounddevice as sd
+
+# Called like a sounddevice callback: (outdata, frames, time_info, status)
+Callback = Callable[[np.ndarray, int, object, object], None]
+
+
+class OutputSink(ABC):
+    """Where the periods of an AudioOutput end up.
+
+    ``open`` returns a stream behaving like ``sd.OutputStream``: used as a
+    context manager, it calls ``callback`` with float32 periods to fill from
+    its own thread until closed, and reports its ``latency`` in seconds.
+    ``device`` is the sounddevice index the output was configured with.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def open(
+        self,
+        device: int | None,
+        samplerate: int,
+        channels: int,
+        blocksize: int,
+        latency: float | str,
+        callback: Callback,
+    ):
+        """Create the stream of one output; the caller starts and closes it."""
+
+
+class SounddeviceSink(OutputSink):
+    """Plays on a PortAudio device."""
+
+    name = "sounddevice"
+
+    def open(self, device, samplerate, channels, blocksize, latency, callback):
+        return sd.OutputStream(
+            device=device,
+            channels=channels,
+            samplerate=samplerate,
+            dtype="float32",
+            blocksize=blocksize,
+            latency=latency,
+            callback=callback,
+        )
+
+
+class _Status:
+    """Callback flags of a PacedStream."""
+
+    def __init__(self, output_underflow: bool) -> None:
+        self.output_underflow = output_underflow
+
+
+class PacedStream:
+    """Calls the callback at the pace a device would and hands each filled
+    period to ``consume``.
+
+    A period that comes due more than a period late is flagged as an
+    underflow, as PortAudio does. ``speed`` above 1 runs faster than real
+    time.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int,
+        blocksize: int,
+        callback: Callback,
+        consume: Callable[[np.ndarray], None] | None = None,
+        speed: float = 1.0,
+    ) -> None:
+        # Devices with blocksize 0 pick their own; 10 ms is typical
+        self.blocksize = blocksize or samplerate // 100
+        self.samplerate = samplerate
+        self.latency = self.blocksize / samplerate
+        self._period = self.blocksize / samplerate / speed
+        self._outdata = np.zeros((self.blocksize, channels), dtype=np.float32)
+        self._callback = callback
+        self._consume = consume
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        deadline = time.monotonic()
+        while not self._stopped.is_set():
+            late = time.monotonic() - deadline > self._period
+            if late:
+                deadline = time.monotonic()
+            self._callback(self._outdata, self.blocksize, None, _Status(late))
+            if self._consume:
+                self._consume(self._outdata.copy())
+            deadline += self._period
+            self._stopped.wait(max(0.0, deadline - time.monotonic()))
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self) -> None:
+        self.stop()
+
+    def __enter__(self) -> "PacedStream":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NullSink(OutputSink):
+    """Discards the audio, consuming it at the pace of a real device."""
+
+    name = "null"
+
+    def __init__(self, speed: float = 1.0) -> None:
+        self.speed = speed
+
+    def open(self, device, samplerate, channels, blocksize, latency, callback):
+        return PacedStream(samplerate, channels, blocksize, callback, speed=self.speed)
+
+
+class _WavStream(PacedStream):
+    def __init__(self, path: Path, samplerate, channels, blocksize, callback, speed):
+        super().__init__(samplerate, channels, blocksize, callback, self._write, speed)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = wave.open(str(path), "wb")
+        self._file.setnchannels(channels)
+        self._file.setsampwidth(2)
+        self._file.setframerate(samplerate)
+
+    def _write(self, block: np.ndarray) -> None:
+        pcm = np.clip(block * 32768.0, -32768, 32767).astype("<i2")
+        self._file.writeframes(pcm.tobytes())
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class WavFileSink(OutputSink):
+    """Writes 16-bit WAV files, paced like a device.
+
+    Outputs other than the default one get the device index appended to
+    the file name.
+    """
+
+    name = "wav"
+
+    def __init__(self, path: str | Path, speed: float = 1.0) -> None:
+        self.path = Path(path)
+        self.speed = speed
+
+    def open(self, device, samplerate, channels, blocksize, latency, callback):
+        path = self.path
+        if device is not None:
+            path = path.with_name(f"{path.stem}-{device}{path.suffix}")
+        return _WavStream(path, samplerate, channels, blocksize, callback, self.speed)
+
+
+class CaptureSink(OutputSink):
+    """Keeps the output in memory, for tests and benchmarks in this process.
+
+    Periods of all streams opened since the last ``clear`` are collected
+    per device, the latest ``max_seconds`` of each.
+    """
+
+    name = "capture"
+
+    def __init__(self, speed: float = 1.0, max_seconds: float = 60.0) -> None:
+        self.speed = speed
+        self.max_seconds = max_seconds
+        self._blocks: dict[int | None, list[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def open(self, device, samplerate, channels, blocksize, latency, callback):
+        def consume(block: np.ndarray) -> None:
+            limit = int(self.max_seconds * samplerate / len(block))
+            with self._lock:
+                blocks = self._blocks.setdefault(device, [])
+                blocks.append(block)
+                del blocks[:-limit]
+
+        return PacedStream(
+            samplerate, channels, blocksize, callback, consume, self.speed
+        )
+
+    def frames(self, device: int | None = None) -> np.ndarray:
+        """Captured float32 frames of one output, oldest first."""
+        with self._lock:
+            blocks = list(self._blocks.get(device, []))
+        if not blocks:
+            return np.zeros((0, 2), dtype=np.float32)
+        return np.concatenate(blocks)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+
+SINKS = {
+    SounddeviceSink.name: SounddeviceSink,
+    NullSink.name: NullSink,
+    WavFileSink.name: WavFileSink,
+}
+
+
+def create_sink(name: str, path: str = "") -> OutputSink:
+    """Instantiate a sink by name, defaulting to sounddevice.
+
+    ``path`` is the file the wav sink writes to.
+    """
+    if name == WavFileSink.name:
+        return WavFileSink(path)
+    return SINKS.get(name, SounddeviceSink)()
@@ -1,16 +1,38 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import json
+from pathlib import Path
 
+import numpy as np
 from textual.widgets import ListItem, Label
 
 from terminal_radio.controllers.options import OptionsController
 
 
-@dataclass
+@dataclass(slots=True)
 class Station:
     name: str
     url: str
     id: int = 0
+    # Descriptive attributes the station list can be filtered by
+    tags: list[str] = field(default_factory=list)
+    country: str = ""
+    codec: str = ""
+    # Nominal bitrate in kbps
+    bitrate: int | None = None
+    # Further URLs of the same stream, raced against ``url``
+    mirrors: list[str] = field(default_factory=list)
+    # URLs of the station in other qualities by bitrate in kbps, ``url``
+    # among them; the player switches between them as bandwidth allows
+    variants: dict[str, str] = field(default_factory=dict)
+    # Input format detected per URL, so later starts can skip most probing
+    probe_hints: dict[str, dict] = field(default_factory=dict)
+    # Dead-air thresholds overriding the options; None uses those
+    dead_air_seconds: float | None = None
+    silence_db: float | None = None
+    # Station to switch to when reconnecting does not end the dead air
+    fallback_id: int | None = None
+    # DSP preset overriding the options; None uses that
+    dsp_preset: str | None = None
 
 
 def station_to_dom_node(station: Station) -> ListItem:
@@ -23,13 +45,144 @@ def station_to_dom_node(station: Station) -> ListItem:
     return item
 
 
+class StationIndex:
+    """Inverted indexes of station attributes for combined filtering.
+
+    Every station gets a slot; each indexed value (a tag, country, codec or
+    bitrate) maps to a bitmap, a numpy array of packed bits with those of
+    the slots of the stations that have it set. Adding and removing a
+    station flips its bits in place, and all bitmaps double together when
+    the slots run out. Queries OR the bitmaps of the values chosen for one
+    attribute and AND the attributes together, a few bytes per thousand
+    stations; decoding the result into ids grows with the number of slots.
+    """
+
+    FIELDS = ("tag", "country", "codec", "bitrate")
+
+    def __init__(self) -> None:
+        self._bitmaps: dict[str, dict[str | int, np.ndarray]] = {
+            f: {} for f in self.FIELDS
+        }
+        # Stations per value, so values leave the index with their last one
+        self._counts: dict[str, dict[str | int, int]] = {f: {} for f in self.FIELDS}
+        self._slots: dict[int, int] = {}
+        # Station id by slot, and the (field, value) pairs each id is under
+        self._ids = np.zeros(64, dtype=np.int64)
+        self._keys: dict[int, list[tuple[str, str | int]]] = {}
+        self._free: list[int] = []
+        self._all = np.zeros(len(self._ids) // 8, dtype=np.uint8)
+
+    @staticmethod
+    def keys(station: Station) -> list[tuple[str, str | int]]:
+        """Index entries of ``station``, normalised for matching."""
+        keys: list[tuple[str, str | int]] = [
+            ("tag", tag) for tag in dict.fromkeys(normalize_tags(station.tags))
+        ]
+        if station.country.strip():
+            keys.append(("country", station.country.strip().upper()))
+        if station.codec.strip():
+            keys.append(("codec", station.codec.strip().lower()))
+        if station.bitrate:
+            keys.append(("bitrate", int(station.bitrate)))
+        return keys
+
+    def add(self, station: Station) -> None:
+        """Index ``station``, replacing what was indexed under its id."""
+        self.remove(station.id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot == len(self._ids):
+                self._grow()
+        self._slots[station.id] = slot
+        self._ids[slot] = station.id
+        byte, bit = slot >> 3, 1 << (slot & 7)
+        self._all[byte] |= bit
+        self._keys[station.id] = keys = self.keys(station)
+        for name, value in keys:
+            bitmap = self._bitmaps[name].get(value)
+            if bitmap is None:
+                bitmap = self._bitmaps[name][value] = np.zeros_like(self._all)
+            bitmap[byte] |= bit
+            counts = self._counts[name]
+            counts[value] = counts.get(value, 0) + 1
+
+    def remove(self, station_id: int) -> None:
+        slot = self._slots.pop(station_id, None)
+        if slot is None:
+            return
+        byte, mask = slot >> 3, 0xFF ^ (1 << (slot & 7))
+        self._all[byte] &= mask
+        for name, value in self._keys.pop(station_id):
+            counts = self._counts[name]
+            counts[value] -= 1
+            if counts[value]:
+                self._bitmaps[name][value][byte] &= mask
+            else:
+                del counts[value], self._bitmaps[name][value]
+        self._free.append(slot)
+
+    def _grow(self) -> None:
+        """Double the slots, and every bitmap with them."""
+        self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+        self._all = np.concatenate([self._all, np.zeros_like(self._all)])
+        for bitmaps in self._bitmaps.values():
+            for value, bitmap in bitmaps.items():
+                bitmaps[value] = np.concatenate([bitmap, np.zeros_like(bitmap)])
+
+    def counts(self, name: str) -> dict[str | int, int]:
+        """Stations per value of one field, most frequent first."""
+        return dict(sorted(self._counts[name].items(), key=lambda item: -item[1]))
+
+    def query(
+        self,
+        tags: set[str] = frozenset(),
+        countries: set[str] = frozenset(),
+        codecs: set[str] = frozenset(),
+        min_bitrate: int | None = None,
+    ) -> np.ndarray:
+        """Ids of the stations matching any of the values given per field,
+        and all fields given."""
+        result = self._all.copy()
+        for name, values in (
+            ("tag", normalize_tags(tags)),
+            ("country", {v.strip().upper() for v in countries}),
+            ("codec", {v.strip().lower() for v in codecs}),
+        ):
+            if values:
+                result &= self._union(name, values)
+        if min_bitrate is not None:
+            bitrates = [b for b in self._bitmaps["bitrate"] if b >= min_bitrate]
+            result &= self._union("bitrate", bitrates)
+        bits = np.unpackbits(result, bitorder="little")
+        return self._ids[np.flatnonzero(bits)]
+
+    def _union(self, name: str, values) -> np.ndarray:
+        bitmaps = self._bitmaps[name]
+        union = np.zeros_like(self._all)
+        for value in values:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                union |= bitmap
+        return union
+
+
+def normalize_tags(tags) -> list[str]:
+    """Tags lowercased and stripped, empty ones dropped."""
+    return [tag.strip().lower() for tag in tags if tag.strip()]
+
+
 class StationController:
     """Manages radio station data."""
 
-    def __init__(self):
+    def __init__(self, config_path: Path | None = None):
         self._stations: dict[int, Station] = {}
+        self.index = StationIndex()
         self._next_id = 1
-        self.config_path = OptionsController.DEFAULT_CONFIG_DIR / "stations.json"
+        self.config_path = (
+            config_path or OptionsController.DEFAULT_CONFIG_DIR / "stations.json"
+        )
         self._load_stations()
 
     def _load_stations(self) -> None:
@@ -39,6 +192,7 @@ class StationController:
             for station_data in data:
                 station = Station(**station_data)
                 self._stations[station.id] = station
+                self.index.add(station)
             if self._stations:
                 self._next_id = max(self._stations.keys()) + 1
         else:
@@ -55,6 +209,7 @@ class StationController:
         """Add a new station."""
         station = Station(name=name, url=url, id=self._next_id)
         self._stations[self._next_id] = station
+        self.index.add(station)
         self._next_id += 1
         self._save_stations()
         return station
@@ -67,16 +222,67 @@ class StationController:
         """Get station by ID."""
         return self._stations.get(station_id)
 
+    def filter_stations(
+        self,
+        tags: set[str] = frozenset(),
+        countries: set[str] = frozenset(),
+        codecs: set[str] = frozenset(),
+        min_bitrate: int | None = None,
+    ) -> list[Station]:
+        """Stations with any of the given values of each attribute given,
+        by id; see ``StationIndex.query``."""
+        if not (tags or countries or codecs or min_bitrate is not None):
+            return self.get_stations()
+        ids = np.sort(self.index.query(tags, countries, codecs, min_bitrate))
+        return [self._stations[station_id] for station_id in ids.tolist()]
+
     def delete_station(self, station_id: int) -> None:
         """Delete a station by ID."""
         if station_id in self._stations:
             del self._stations[station_id]
+            self.index.remove(station_id)
+            self._save_stations()
+
+    def set_probe_hint(self, station_id: int, url: str, hint: dict) -> None:
+        """Remember the input format detected for one of a station's URLs."""
+        station = self._stations.get(station_id)
+        if station is not None:
+            station.probe_hints[url] = hint
+            if not station.codec and hint.get("codec"):
+                station.codec = hint["codec"]
+                self.index.add(station)
             self._save_stations()
 
-    def update_station(self, station_id: int, name: str, url: str) -> Station:
-        """Update an existing station."""
+    def update_station(
+        self,
+        station_id: int,
+        name: str,
+        url: str,
+        mirrors: list[str] | None = None,
+        variants: dict[str, str] | None = None,
+        tags: list[str] | None = None,
+        country: str | None = None,
+        codec: str | None = None,
+        bitrate: int | None = None,
+    ) -> Station:
+        """Update an existing station; None keeps the current value of the
+        optional attributes."""
         if station_id in self._stations:
-            self._stations[station_id].name = name
-            self._stations[station_id].url = url
+            station = self._stations[station_id]
+            station.name = name
+            station.url = url
+            if mirrors is not None:
+                station.mirrors = mirrors
+            if variants is not None:
+                station.variants = variants
+            if tags is not None:
+                station.tags = tags
+            if country is not None:
+                station.country = country
+            if codec is not None:
+                station.codec = codec
+            if bitrate is not None:
+                station.bitrate = bitrate or None
+            self.index.add(station)
             self._save_stations()
         return self._stations[station_id]
@@ -0,0 +1,123 @@
+import tempfile
+import threading
+
+import numpy as np
+
+
+class TimeShiftBuffer:
+    """Bounded PCM history: a RAM ring that spills into a memory-mapped file.
+
+    Positions are absolute frame counters since the buffer was created, so
+    readers keep a plain integer cursor and never have to deal with
+    wrap-around. The most recent ``ram_seconds`` live in memory, older frames
+    are moved to a fixed-size file mapping, and anything older than
+    ``seconds`` is overwritten. Memory and disk use never grow after
+    construction.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        ram_seconds: float = 30.0,
+        samplerate: int = 44100,
+        channels: int = 2,
+        dtype: type = np.int16,
+    ) -> None:
+        self.samplerate = samplerate
+        self.channels = channels
+        self.capacity = max(1, int(seconds * samplerate))
+        ram_frames = max(1, min(self.capacity, int(ram_seconds * samplerate)))
+        disk_frames = self.capacity - ram_frames
+        self._ram = np.zeros((ram_frames, channels), dtype=dtype)
+        self._spill_file = None
+        self._disk = None
+        if disk_frames:
+            self._spill_file = tempfile.TemporaryFile(prefix="terminal-radio-")
+            self._disk = np.memmap(
+                self._spill_file,
+                dtype=dtype,
+                mode="w+",
+                shape=(disk_frames, channels),
+            )
+        self._write_pos = 0
+        self._lock = threading.Lock()
+
+    @property
+    def write_pos(self) -> int:
+        """Absolute position of the live edge."""
+        return self._write_pos
+
+    @property
+    def oldest_pos(self) -> int:
+        """Absolute position of the oldest frame still available."""
+        return max(0, self._write_pos - self.capacity)
+
+    def write(self, frames: np.ndarray) -> None:
+        """Append frames at the live edge, evicting the oldest ones."""
+        ram_frames = len(self._ram)
+        with self._lock:
+            for start in range(0, len(frames), ram_frames):
+                self._write_chunk(frames[start : start + ram_frames])
+
+    def _write_chunk(self, frames: np.ndarray) -> None:
+        n = len(frames)
+        ram_frames = len(self._ram)
+        if self._disk is not None:
+            # Frames about to be overwritten in RAM move to the spill file.
+            evict_from = max(0, self._write_pos - ram_frames)
+            evict_to = self._write_pos + n - ram_frames
+            if evict_to > evict_from:
+                evicted = _ring_get(self._ram, evict_from, evict_to - evict_from)
+                _ring_put(self._disk, evict_from, evicted)
+        _ring_put(self._ram, self._write_pos, frames)
+        self._write_pos += n
+
+    def read(self, pos: int, frames: int) -> tuple[np.ndarray, int]:
+        """Read up to ``frames`` frames starting at ``pos``.
+
+        The cursor is clamped to the oldest retained frame. Returns the data
+        and the cursor position following it.
+        """
+        with self._lock:
+            pos = min(max(pos, self.oldest_pos), self._write_pos)
+            n = min(frames, self._write_pos - pos)
+            ram_start = max(0, self._write_pos - len(self._ram))
+            parts = []
+            if pos < ram_start:
+                disk_n = min(n, ram_start - pos)
+                parts.append(_ring_get(self._disk, pos, disk_n))
+            ram_pos = max(pos, ram_start)
+            ram_n = pos + n - ram_pos
+            if ram_n > 0:
+                parts.append(_ring_get(self._ram, ram_pos, ram_n))
+        if not parts:
+            return self._ram[:0].copy(), pos
+        data = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return data, pos + n
+
+    def clamp(self, pos: int) -> int:
+        """Clamp a cursor into the retained range."""
+        return min(max(pos, self.oldest_pos), self._write_pos)
+
+    def close(self) -> None:
+        """Release the spill file."""
+        self._disk = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
+def _ring_put(ring: np.ndarray, pos: int, data: np.ndarray) -> None:
+    start = pos % len(ring)
+    head = min(len(data), len(ring) - start)
+    ring[start : start + head] = data[:head]
+    if head < len(data):
+        ring[: len(data) - head] = data[head:]
+
+
+def _ring_get(ring: np.ndarray, pos: int, n: int) -> np.ndarray:
+    start = pos % len(ring)
+    head = min(n, len(ring) - start)
+    if head == n:
+        return ring[start : start + n].copy()
+    return np.concatenate((ring[start:], ring[: n - head]))
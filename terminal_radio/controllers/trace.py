@@ -0,0 +1,151 @@
+"""Opt-in timeline of playback lifecycle events in the Chrome trace format.
+
+Spans and instants are recorded only while tracing is enabled, with
+``--trace FILE`` or the ``TERMINAL_RADIO_TRACE`` environment variable, and
+saved to that file on exit for chrome://tracing or https://ui.perfetto.dev.
+Disabled, ``span`` and ``instant`` cost a global lookup.
+"""
+
+import atexit
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Names the trace file; inherited by the audio worker process
+ENV_VAR = "TERMINAL_RADIO_TRACE"
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """Collects trace events of this process.
+
+    Timestamps come from ``time.monotonic``, which all processes share, so
+    events forwarded from the audio worker line up with the UI's. With
+    ``forward`` set, events are handed to it instead of being kept.
+    """
+
+    # Events kept at most, should tracing be left on for long
+    MAX_EVENTS = 100_000
+
+    def __init__(
+        self, path: Path | None = None, forward: Callable[[dict], None] | None = None
+    ) -> None:
+        self.path = path
+        self.forward = forward
+        self.events: list[dict] = []
+        self._pid = os.getpid()
+
+    def add(self, event: dict) -> None:
+        """Record an event, from this process or forwarded from another."""
+        if self.forward:
+            self.forward(event)
+        elif len(self.events) < self.MAX_EVENTS:
+            self.events.append(event)
+
+    def _event(self, phase: str, name: str, ts: float, args: dict) -> dict:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "ph": phase,
+            "ts": ts * 1e6,
+            "pid": self._pid,
+            "tid": thread.ident,
+            "thread_name": thread.name,
+        }
+        if args:
+            event["args"] = args
+        return event
+
+    @contextlib.contextmanager
+    def span(self, name: str, start: float | None = None, **args):
+        """Record the time spent in the ``with`` block, from ``start`` if
+        given, as a ``time.monotonic`` value."""
+        event = self._event(
+            "X", name, time.monotonic() if start is None else start, args
+        )
+        try:
+            yield
+        finally:
+            event["dur"] = time.monotonic() * 1e6 - event["ts"]
+            self.add(event)
+
+    def instant(self, name: str, **args) -> None:
+        event = self._event("i", name, time.monotonic(), args)
+        event["s"] = "t"
+        self.add(event)
+
+    def save(self) -> None:
+        """Write the events collected so far to ``path``."""
+        threads = {(e["pid"], e["tid"]): e["thread_name"] for e in self.events}
+        events = [
+            {key: value for key, value in e.items() if key != "thread_name"}
+            for e in self.events
+        ]
+        for (pid, tid), name in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+            )
+        try:
+            self.path.write_text(
+                json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+            )
+        except OSError as exc:
+            logger.error(f"Failed to save trace to {self.path}: {exc}")
+            return
+        logger.info(f"Saved {len(self.events)} trace events to {self.path}")
+
+
+_tracer: Tracer | None = None
+
+
+def enable(path: Path) -> Tracer:
+    """Trace this process and the audio worker it starts into ``path``,
+    saved on exit."""
+    global _tracer
+    _tracer = Tracer(path)
+    os.environ[ENV_VAR] = str(path)
+    atexit.register(_tracer.save)
+    return _tracer
+
+
+def enable_forwarding(forward: Callable[[dict], None]) -> None:
+    """Trace this process for the one that started it, if that one traces."""
+    global _tracer
+    if os.environ.get(ENV_VAR):
+        _tracer = Tracer(forward=forward)
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def add(event: dict) -> None:
+    if _tracer is not None:
+        _tracer.add(event)
+
+
+def span(name: str, start: float | None = None, **args):
+    """Context manager recording a span while tracing, doing nothing
+    otherwise."""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, start, **args)
+
+
+def instant(name: str, **args) -> None:
+    if _tracer is not None:
+        _tracer.instant(name, **args)
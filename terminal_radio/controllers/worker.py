@@ -0,0 +1,345 @@
+import logging
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+import sounddevice as sd
+
+from terminal_radio.controllers.latency import LatencyProfile, get_latency_profile
+from terminal_radio.controllers.metering import LevelSnapshot
+from terminal_radio.controllers.player import AudioStreamer, AudioStreamingError
+from terminal_radio.controllers.sinks import OutputSink, SounddeviceSink
+from terminal_radio.controllers import trace
+
+logger = logging.getLogger(__name__)
+
+
+class VisualRing:
+    """Recent output blocks and levels shared between processes.
+
+    A small header holds the total frames written, the length of the
+    latest block and its LevelSnapshot. The reader copies the block without
+    any locking, which at worst shows a torn block for one frame of the
+    spectrum; snapshots are re-read if their sequence moved meanwhile.
+    """
+
+    FRAMES = 8192
+    # write position, block length, sequence, clipped samples, silent blocks
+    COUNTERS = 5
+    # rms left/right, peak left/right, silence seconds
+    VALUES = 5
+    HEADER = (COUNTERS + VALUES) * 8
+    # Re-reads of a snapshot before settling for the previous one; a worker
+    # that died mid-write would otherwise leave the reader spinning
+    MAX_READ_RETRIES = 100
+
+    def __init__(self, name: str | None = None) -> None:
+        size = self.HEADER + self.FRAMES * AudioStreamer.CHANNELS * 4
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=name is None, size=size
+        )
+        self.name = self._shm.name
+        self._last_levels = LevelSnapshot()
+        self._header = np.ndarray(
+            (self.COUNTERS,), dtype=np.int64, buffer=self._shm.buf
+        )
+        self._values = np.ndarray(
+            (self.VALUES,),
+            dtype=np.float64,
+            buffer=self._shm.buf,
+            offset=self.COUNTERS * 8,
+        )
+        self._data = np.ndarray(
+            (self.FRAMES, AudioStreamer.CHANNELS),
+            dtype=np.float32,
+            buffer=self._shm.buf,
+            offset=self.HEADER,
+        )
+
+    def write(self, block: np.ndarray, levels: LevelSnapshot | None = None) -> None:
+        if levels is not None:
+            # -1 marks a snapshot being written, see read_levels
+            self._header[2] = -1
+            self._values[:] = (*levels.rms, *levels.peak, levels.silence_seconds)
+            self._header[3:] = (levels.clipped_samples, levels.silent_blocks)
+            self._header[2] = levels.sequence
+        block = block[-self.FRAMES :]
+        n = len(block)
+        pos = int(self._header[0])
+        start = pos % self.FRAMES
+        first = min(n, self.FRAMES - start)
+        self._data[start : start + first] = block[:first]
+        self._data[: n - first] = block[first:]
+        self._header[1] = n
+        self._header[0] = pos + n
+
+    def read(self) -> np.ndarray:
+        pos, n = int(self._header[0]), int(self._header[1])
+        start = (pos - n) % self.FRAMES
+        if start + n <= self.FRAMES:
+            return self._data[start : start + n].copy()
+        return np.concatenate(
+            (self._data[start:], self._data[: start + n - self.FRAMES])
+        )
+
+    def read_levels(self) -> LevelSnapshot:
+        for _ in range(self.MAX_READ_RETRIES):
+            sequence = int(self._header[2])
+            if sequence < 0:
+                continue
+            rms_l, rms_r, peak_l, peak_r, silence = self._values.tolist()
+            clipped, silent = self._header[3:].tolist()
+            if int(self._header[2]) == sequence:
+                self._last_levels = LevelSnapshot(
+                    sequence, (rms_l, rms_r), (peak_l, peak_r), clipped, silent, silence
+                )
+                break
+        return self._last_levels
+
+    def close(self, unlink: bool = False) -> None:
+        # Views into the buffer must go before the mapping can be closed
+        del self._header, self._values, self._data
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class _EventHandler(logging.Handler):
+    """Forwards worker log records to the UI process."""
+
+    def __init__(self, send: Callable[[tuple], None]) -> None:
+        super().__init__()
+        self._send = send
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.msg, record.args = record.getMessage(), None
+        record.exc_info = record.exc_text = None
+        try:
+            self._send(("log", record))
+        except (OSError, ValueError):
+            pass
+
+
+def run_worker(commands, events, ring_name: str) -> None:
+    """Entry point of the audio process: serve commands for an AudioStreamer."""
+    events_lock = threading.Lock()
+
+    def send_event(event: tuple) -> None:
+        with events_lock:
+            events.send(event)
+
+    package_logger = logging.getLogger("terminal_radio")
+    package_logger.setLevel(logging.DEBUG)
+    package_logger.addHandler(_EventHandler(send_event))
+    trace.enable_forwarding(lambda event: send_event(("trace", event)))
+
+    ring = VisualRing(ring_name)
+    streamer = AudioStreamer()
+    streamer.on_block = lambda block: ring.write(block, streamer.levels)
+    streamer.on_title_change = lambda title: send_event(("title", title))
+    streamer.on_dead_air = lambda *args: send_event(("dead_air", args))
+    streamer.on_mirror_won = lambda *args: send_event(("mirror_won", args))
+    streamer.on_probed = lambda *args: send_event(("probed", args))
+    streamer.on_stream_error = lambda error: send_event(("stream_error", error))
+    streamer.on_stream_end = lambda: send_event(("stream_end", None))
+    while True:
+        try:
+            name, args = commands.recv()
+        except (EOFError, OSError):
+            break
+        try:
+            if name == "shutdown":
+                streamer.cleanup()
+                commands.send(("ok", None))
+                break
+            elif name == "set":
+                attribute, value = args
+                if attribute == "default_device":
+                    sd.default.device = value
+                else:
+                    setattr(streamer, attribute, value)
+                result = None
+            elif name == "get":
+                result = getattr(streamer, args[0])
+            else:
+                result = getattr(streamer, name)(*args)
+        except Exception as e:
+            commands.send(("error", str(e)))
+        else:
+            commands.send(("ok", result))
+    ring.close()
+
+
+class ProcessStreamer:
+    """AudioStreamer that decodes and plays in a dedicated worker process.
+
+    Exposes the same interface as AudioStreamer. Commands go over a pipe
+    and are answered synchronously; titles, log records and the dead-air,
+    mirror race and probe reports come back on a second pipe, and the spectrum
+    reads output blocks from a VisualRing. UI work in this process thus
+    cannot delay the device callbacks.
+    """
+
+    JOIN_TIMEOUT = 2.0
+
+    def __init__(self) -> None:
+        self.timeshift_seconds = 0
+        self.decoder_name = "ffmpeg"
+        self.race_mirrors = True
+        self.jitter_bounds: tuple[float, float] = (0.0, 0.0)
+        self.profile: LatencyProfile = get_latency_profile("balanced")
+        self.output_config: list[tuple[int | None, float]] = [(None, 1.0)]
+        # Sent to the worker, so sinks keeping their audio in memory are of
+        # no use here
+        self.sink: OutputSink = SounddeviceSink()
+        self.dead_air_seconds = 0.0
+        self.silence_db = -60.0
+        self.on_title_change: Callable[[str], None] | None = None
+        self.on_dead_air: Callable[[str, float], None] | None = None
+        self.on_mirror_won: Callable[[int, int], None] | None = None
+        self.probe_hints: dict[str, dict] = {}
+        self.dsp_preset: list[dict] = []
+        self.on_probed: Callable[[int, dict], None] | None = None
+        self.on_stream_error: Callable[[str], None] | None = None
+        self.on_stream_end: Callable[[], None] | None = None
+        self.title: str | None = None
+        self._lock = threading.Lock()
+        self._ring = VisualRing()
+        # Spawn so the worker does not inherit the UI's threads
+        context = multiprocessing.get_context("spawn")
+        self._commands, worker_commands = context.Pipe()
+        self._events, worker_events = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=run_worker,
+            args=(worker_commands, worker_events, self._ring.name),
+            name="terminal-radio-audio",
+            daemon=True,
+        )
+        self._process.start()
+        worker_commands.close()
+        worker_events.close()
+        self._event_thread = threading.Thread(target=self._read_events, daemon=True)
+        self._event_thread.start()
+
+    def _read_events(self) -> None:
+        while True:
+            try:
+                kind, payload = self._events.recv()
+            except (EOFError, OSError):
+                break
+            if kind == "log":
+                logging.getLogger(payload.name).handle(payload)
+            elif kind == "trace":
+                trace.add(payload)
+            elif kind == "title":
+                self.title = payload
+                if self.on_title_change:
+                    self.on_title_change(payload)
+            elif kind == "dead_air" and self.on_dead_air:
+                self.on_dead_air(*payload)
+            elif kind == "mirror_won" and self.on_mirror_won:
+                self.on_mirror_won(*payload)
+            elif kind == "probed" and self.on_probed:
+                self.on_probed(*payload)
+            elif kind == "stream_error" and self.on_stream_error:
+                self.on_stream_error(payload)
+            elif kind == "stream_end" and self.on_stream_end:
+                self.on_stream_end()
+
+    def _call(self, name: str, *args):
+        with self._lock:
+            if not self._process.is_alive():
+                raise AudioStreamingError("Audio worker process has exited")
+            try:
+                self._commands.send((name, args))
+                status, result = self._commands.recv()
+            except (EOFError, OSError) as e:
+                raise AudioStreamingError(f"Audio worker process failed: {e}")
+        if status == "error":
+            raise AudioStreamingError(result)
+        return result
+
+    @property
+    def current_audio_data(self) -> np.ndarray:
+        """Get current audio data for visualization."""
+        return self._ring.read()
+
+    @property
+    def levels(self) -> LevelSnapshot:
+        return self._ring.read_levels()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._call("get", "is_paused")
+
+    @property
+    def timeshift_active(self) -> bool:
+        return self._call("get", "timeshift_active")
+
+    @property
+    def timeshift_delay(self) -> float:
+        return self._call("get", "timeshift_delay")
+
+    def stats(self) -> dict:
+        return self._call("stats")
+
+    def pause(self) -> None:
+        self._call("pause")
+
+    def resume(self) -> None:
+        self._call("resume")
+
+    def seek(self, seconds: float) -> None:
+        self._call("seek", seconds)
+
+    def go_live(self) -> None:
+        self._call("go_live")
+
+    def set_output_volume(self, device: int | None, volume: float) -> None:
+        self.output_config = [
+            (d, volume if d == device else v) for d, v in self.output_config
+        ]
+        self._call("set_output_volume", device, volume)
+
+    def set_volume(self, volume: float) -> None:
+        self._call("set_volume", volume)
+
+    def play(self, url: str, mirrors: list[str] = ()) -> None:
+        """Send the current settings and start streaming in the worker."""
+        self._call("set", "default_device", sd.default.device)
+        for attribute in (
+            "timeshift_seconds",
+            "decoder_name",
+            "race_mirrors",
+            "jitter_bounds",
+            "profile",
+            "output_config",
+            "sink",
+            "probe_hints",
+            "dsp_preset",
+            "dead_air_seconds",
+            "silence_db",
+        ):
+            self._call("set", attribute, getattr(self, attribute))
+        self._call("play", url, list(mirrors))
+
+    def stop(self) -> None:
+        self.title = None
+        self._call("stop")
+
+    def check_streaming_thread(self) -> bool:
+        return self._call("check_streaming_thread")
+
+    def cleanup(self) -> None:
+        """Stop playback and shut the worker process down."""
+        try:
+            self._call("shutdown")
+        except AudioStreamingError:
+            pass
+        self._process.join(timeout=self.JOIN_TIMEOUT)
+        if self._process.is_alive():
+            self._process.kill()
+        self._commands.close()
+        self._ring.close(unlink=True)
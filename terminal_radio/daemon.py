@@ -0,0 +1,281 @@
+# daemon.py
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+
+from terminal_radio.controllers.log import LogController
+from terminal_radio.controllers.options import OptionsController
+from terminal_radio.controllers.player import AudioStreamingError, PlayerController
+from terminal_radio.controllers.recorder import Recording, RecordingScheduler
+from terminal_radio.controllers.remote import RemotePlayerController
+from terminal_radio.controllers.stations import StationController
+
+DEFAULT_SOCKET_PATH = OptionsController.DEFAULT_CONFIG_DIR / "daemon.sock"
+
+
+class PlayerDaemon:
+    """Headless player controlled over a Unix domain socket.
+
+    Requests and responses are one JSON object per line. A request names a
+    ``command`` plus its parameters; the response is ``{"ok": true,
+    "status": {...}}`` or ``{"ok": false, "error": "..."}``.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH) -> None:
+        self.socket_path = socket_path
+        self.log_controller = LogController()
+        self.options_controller = OptionsController()
+        self.log_controller.apply_options(self.options_controller.options)
+        self.player_controller = PlayerController(self.options_controller.options)
+        self.station_controller = StationController()
+        self.current_station = None
+        self.player_controller.station_lookup = (
+            lambda station_id: self.station_controller.get_station(station_id)
+        )
+        self.player_controller.set_dead_air_listener(self._on_recovered)
+        self.player_controller.probe_hint_store = self.station_controller.set_probe_hint
+        options = self.options_controller.options
+        config_dir = OptionsController.DEFAULT_CONFIG_DIR
+        self.recorder = RecordingScheduler(
+            config_dir / "recordings.json",
+            Path(options.recordings_dir or config_dir / "recordings").expanduser(),
+            self.player_controller.resolver,
+            options.recording_workers,
+        )
+        self._stop_event = asyncio.Event()
+        self.commands = {
+            "status": self.cmd_status,
+            "play": self.cmd_play,
+            "stop": self.cmd_stop,
+            "volume": self.cmd_volume,
+            "mute": self.cmd_mute,
+            "pause": self.cmd_pause,
+            "seek": self.cmd_seek,
+            "live": self.cmd_live,
+            "stations": self.cmd_stations,
+            "reload_options": self.cmd_reload_options,
+            "recordings": self.cmd_recordings,
+            "record": self.cmd_record,
+            "cancel_recording": self.cmd_cancel_recording,
+            "shutdown": self.cmd_shutdown,
+        }
+
+    async def serve(self) -> None:
+        """Serve clients until SIGINT/SIGTERM or a shutdown command."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if RemotePlayerController.daemon_running(self.socket_path):
+            raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stop_event.set)
+        old_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(
+                self.handle_client, path=str(self.socket_path)
+            )
+        finally:
+            os.umask(old_umask)
+        self.log_controller.log(logging.INFO, f"Daemon listening on {self.socket_path}")
+        self.recorder.start()
+        async with server:
+            await self._stop_event.wait()
+        await asyncio.get_running_loop().run_in_executor(None, self.recorder.stop)
+        await self.player_controller.cleanup()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer requests from one client until it disconnects."""
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    command = request.pop("command", None)
+                    handler = self.commands.get(command)
+                    if handler is None:
+                        response = {"ok": False, "error": f"Unknown command: {command}"}
+                    else:
+                        response = {"ok": True, "status": await handler(**request)}
+                except (
+                    AttributeError,
+                    TypeError,
+                    ValueError,
+                    AudioStreamingError,
+                ) as exc:
+                    response = {"ok": False, "error": str(exc).split("\n")[0]}
+                except Exception as exc:
+                    # A failing command must not cost the client its connection
+                    self.log_controller.log(
+                        logging.ERROR, f"Command {line!r} failed", exc_info=True
+                    )
+                    response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    def status(self) -> dict:
+        """Snapshot of the player state sent with every response."""
+        player = self.player_controller
+        station = self.current_station
+        return {
+            "playing": player.is_playing,
+            "volume": player.volume,
+            "muted": player.is_muted,
+            "paused": player.is_paused,
+            "station_id": station.id if station else None,
+            "station": station.name if station else None,
+            "title": player.title,
+            "timeshift_enabled": player.timeshift_enabled,
+            "timeshift_active": player.timeshift_active,
+            "timeshift_delay": player.timeshift_delay,
+            "output_device": player.get_output_device(),
+            "stats": player.stats(),
+        }
+
+    async def cmd_status(self) -> dict:
+        return self.status()
+
+    async def cmd_play(self, station_id: int | None = None, url: str | None = None):
+        if station_id is not None:
+            station = self.station_controller.get_station(int(station_id))
+            if station is None:
+                # Stations may have been added by a client since startup
+                self.station_controller = StationController()
+                station = self.station_controller.get_station(int(station_id))
+            if station is None:
+                raise ValueError(f"No station with id {station_id}")
+            self.current_station, url = station, station.url
+        elif url:
+            matching = [
+                s for s in self.station_controller.get_stations() if s.url == url
+            ]
+            self.current_station = matching[0] if matching else None
+        await self.player_controller.start_playback(url, self.current_station)
+        name = self.current_station.name if self.current_station else url
+        self.log_controller.log(logging.INFO, f"Playing {name}")
+        return self.status()
+
+    def _on_recovered(self, station) -> None:
+        """Follow a switch to the fallback station after dead air."""
+        if station is not None:
+            self.current_station = station
+
+    async def cmd_stop(self) -> dict:
+        await self.player_controller.stop_playback()
+        return self.status()
+
+    async def cmd_volume(self, volume: int | None = None, delta: int | None = None):
+        if volume is not None:
+            await self.player_controller.set_volume(int(volume))
+        elif delta is not None:
+            await self.player_controller.change_volume(int(delta))
+        return self.status()
+
+    async def cmd_mute(self) -> dict:
+        await self.player_controller.toggle_mute()
+        return self.status()
+
+    async def cmd_pause(self) -> dict:
+        await self.player_controller.toggle_pause()
+        return self.status()
+
+    async def cmd_seek(self, seconds: float) -> dict:
+        await self.player_controller.seek(float(seconds))
+        return self.status()
+
+    async def cmd_live(self) -> dict:
+        await self.player_controller.go_live()
+        return self.status()
+
+    async def cmd_stations(self) -> dict:
+        stations = self.station_controller.get_stations()
+        status = self.status()
+        status["stations"] = [{"id": s.id, "name": s.name} for s in stations]
+        return status
+
+    async def cmd_recordings(self) -> dict:
+        status = self.status()
+        status["recordings"] = self.recorder.recordings()
+        return status
+
+    async def cmd_record(
+        self,
+        duration: float,
+        start: float | str | None = None,
+        station_id: int | None = None,
+        url: str | None = None,
+        name: str | None = None,
+        repeat: str = "",
+    ) -> dict:
+        """Schedule a recording of a station or URL.
+
+        ``start`` is epoch seconds or a local ISO date and time, by default
+        now; ``duration`` is in seconds.
+        """
+        if station_id is not None:
+            station = self.station_controller.get_station(int(station_id))
+            if station is None:
+                raise ValueError(f"No station with id {station_id}")
+            url, name = station.url, name or station.name
+        elif not url:
+            raise ValueError("Give a station_id or url to record")
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start).timestamp()
+        recording = self.recorder.add(
+            Recording(
+                url=url,
+                start=time.time() if start is None else float(start),
+                duration=float(duration),
+                name=name or url,
+                station_id=None if station_id is None else int(station_id),
+                repeat=repeat,
+            )
+        )
+        self.log_controller.log(
+            logging.INFO, f"Scheduled recording {recording.id}: {recording.name}"
+        )
+        return await self.cmd_recordings()
+
+    async def cmd_cancel_recording(self, recording_id: int) -> dict:
+        self.recorder.remove(int(recording_id))
+        return await self.cmd_recordings()
+
+    async def cmd_reload_options(self) -> dict:
+        """Re-read options saved by a client and restart playback if needed."""
+        self.options_controller = OptionsController()
+        options = self.options_controller.options
+        self.log_controller.apply_options(options)
+        player = self.player_controller
+        restart = player.apply_options(options)
+        if (
+            options.output_device is not None
+            and options.output_device != player.get_output_device()
+        ):
+            player.set_output_device(options.output_device)
+            restart = True
+        if restart and player.is_playing:
+            await player.start_playback(None)
+        return self.status()
+
+    async def cmd_shutdown(self) -> dict:
+        self._stop_event.set()
+        return self.status()
+
+
+def run_daemon(socket_path=DEFAULT_SOCKET_PATH) -> None:
+    """Run the headless player in the foreground."""
+    asyncio.run(PlayerDaemon(socket_path).serve())
@@ -1,8 +1,7 @@
 from textual.app import ComposeResult
 from textual.screen import ModalScreen
-from textual.widgets import Button, Label, Input, ListView
+from textual.widgets import Button, Label, Input
 from textual.containers import Horizontal, Vertical
-from terminal_radio.controllers.stations import station_to_dom_node
 
 
 class AddStationScreen(ModalScreen):
@@ -29,11 +28,8 @@ class AddStationScreen(ModalScreen):
             url_input = self.query_one("#url", Input)
             url = url_input.value
             if name and url:
-                station = self.app.station_controller.add_station(name, url)
-                stations_list: ListView = self.app.main_screen.query_one(
-                    "#stations", ListView
-                )
-                await stations_list.append(station_to_dom_node(station))
+                self.app.station_controller.add_station(name, url)
+                await self.app.main_screen.refresh_filters()
 
                 [
                     children.clear()
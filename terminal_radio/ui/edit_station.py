@@ -1,8 +1,17 @@
 from textual.app import ComposeResult
 from textual.screen import ModalScreen
-from textual.widgets import Button, Label, Input, ListView
+from textual.widgets import Button, Label, Input
 from textual.containers import Horizontal, Vertical
-from terminal_radio.controllers.stations import station_to_dom_node
+
+
+def parse_variants(text: str) -> dict[str, str]:
+    """Parse "128=URL, 64=URL" into variants; malformed entries are dropped."""
+    variants = {}
+    for entry in text.split(","):
+        kbps, _, url = entry.partition("=")
+        if kbps.strip().isdigit() and url.strip():
+            variants[kbps.strip()] = url.strip()
+    return variants
 
 
 class EditStationScreen(ModalScreen):
@@ -27,6 +36,36 @@ class EditStationScreen(ModalScreen):
                 valid_empty=False,
                 id="edit-url",
             ),
+            Input(
+                value=", ".join(self.station.mirrors),
+                placeholder="Mirror URLs, comma separated (optional)",
+                id="edit-mirrors",
+            ),
+            Input(
+                value=", ".join(
+                    f"{kbps}={url}" for kbps, url in self.station.variants.items()
+                ),
+                placeholder="Quality variants as kbps=URL, comma separated (optional)",
+                id="edit-variants",
+            ),
+            Input(
+                value=", ".join(self.station.tags),
+                placeholder="Tags, comma separated (optional)",
+                id="edit-tags",
+            ),
+            Horizontal(
+                Input(
+                    value=self.station.country, placeholder="Country", id="edit-country"
+                ),
+                Input(value=self.station.codec, placeholder="Codec", id="edit-codec"),
+                Input(
+                    value=str(self.station.bitrate or ""),
+                    placeholder="kbps",
+                    type="integer",
+                    id="edit-bitrate",
+                ),
+                id="details",
+            ),
             Horizontal(
                 Button("Save", variant="success", id="save"),
                 Button("Cancel", variant="error", id="cancel"),
@@ -40,20 +79,23 @@ class EditStationScreen(ModalScreen):
         if event.button.id == "save":
             name = self.query_one("#edit-name", Input).value
             url = self.query_one("#edit-url", Input).value
+            mirrors = self.query_one("#edit-mirrors", Input).value
+            variants = self.query_one("#edit-variants", Input).value
+            tags = self.query_one("#edit-tags", Input).value
+            bitrate = self.query_one("#edit-bitrate", Input).value.strip()
             if name and url:
-                station = self.app.station_controller.update_station(
+                self.app.station_controller.update_station(
                     self.station.id,
                     name,
                     url,
+                    [m.strip() for m in mirrors.split(",") if m.strip()],
+                    parse_variants(variants),
+                    tags=[t.strip() for t in tags.split(",") if t.strip()],
+                    country=self.query_one("#edit-country", Input).value.strip(),
+                    codec=self.query_one("#edit-codec", Input).value.strip(),
+                    bitrate=int(bitrate) if bitrate.isdigit() else 0,
                 )
-                stations_list: ListView = self.app.main_screen.query_one(
-                    "#stations", ListView
-                )
-                index_to_replace = stations_list.index
-                await stations_list.pop(index_to_replace)
-                await stations_list.insert(
-                    index_to_replace, [station_to_dom_node(station)]
-                )
+                await self.app.main_screen.refresh_filters()
                 self.query_one("#edit-name", Input).focus()
                 self.app.main_screen.update_status(f"Station '{name}' updated")
 
@@ -86,6 +128,15 @@ class EditStationScreen(ModalScreen):
         margin: 1 0;
     }
 
+    #details {
+        height: auto;
+    }
+
+    #details Input {
+        width: 1fr;
+        margin: 0 1 1 0;
+    }
+
     #buttons {
         width: 100%;
         height: 3;
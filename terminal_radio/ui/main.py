@@ -13,14 +13,16 @@ from textual.widgets import (
 )
 from textual.containers import Container, Horizontal
 from textual.timer import Timer
+from terminal_radio.controllers import trace
 from terminal_radio.controllers.options import NoAudioDeviceError, OptionsController
 from terminal_radio.controllers.player import PlayerController
-from terminal_radio.controllers.stations import StationController, station_to_dom_node
-import requests
-from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor
+from terminal_radio.controllers.stations import (
+    Station,
+    StationController,
+    station_to_dom_node,
+)
 import asyncio
-import time
+from terminal_radio.ui.widgets.filter_chips import FilterChips
 from terminal_radio.ui.widgets.spectrum import SpectrumVisualizer
 
 
@@ -61,20 +63,23 @@ class MainScreen(Screen):
                     id="volume_panel",
                 ),
                 Horizontal(
-                    Label("Station Latency", id="latency_label"),
+                    Label("Behind live", id="latency_label"),
                     Label(
-                        "0000",
+                        "--",
                         id="latency_digits",
                     ),
                     id="latency_panel",
                 ),
                 Horizontal(
-                    SpectrumVisualizer(summary_function=max, id="sparkline"),
-                    id="sparkline_box",
+                    SpectrumVisualizer(id="spectrum"),
+                    id="spectrum_box",
                 ),
                 classes="top_panel",
             ),
             Static("No station playing", id="status_bar", classes="status"),
+            FilterChips(
+                FilterChips.facets_of(self.station_controller), id="filter_chips"
+            ),
             ListView(id="stations"),
             id="main",
         )
@@ -83,12 +88,14 @@ class MainScreen(Screen):
         try:
             _ = self.options_controller.get_available_devices()
         except NoAudioDeviceError as exc:
-            self.notify(
-                "No available output devices found. Please check your audio settings.",
-                title="Error",
-                severity="error",
-            )
-            self.log_controller.log(logging.ERROR, exc)
+            # The null and wav sinks play without them
+            if self.options_controller.options.output_sink == "sounddevice":
+                self.notify(
+                    "No available output devices found. Please check your audio settings.",
+                    title="Error",
+                    severity="error",
+                )
+                self.app.log_controller.log(logging.ERROR, exc)
 
     def on_mount(self) -> None:
         """Load stations when screen is mounted."""
@@ -105,8 +112,48 @@ class MainScreen(Screen):
         self.selected_station = stations[0] if stations else None
         if stations_list.children:
             stations_list.children[0].add_class("-selected")
+        # The filter chips come first and would otherwise take the focus
+        stations_list.focus()
         self.latency_update_timer = self.set_interval(3, self.update_latency)
-        self.set_interval(0.05, self.update_spectrum)  # 20fps update rate
+        self.set_interval(1 / 30, self.update_spectrum)  # 30fps update rate
+
+    @property
+    def visible_stations(self) -> list[Station]:
+        """Stations in the list, as narrowed by the filter chips."""
+        return [item.station for item in self.query_one("#stations", ListView).children]
+
+    async def on_filter_chips_changed(self, event: FilterChips.Changed) -> None:
+        await self.show_stations()
+
+    async def refresh_filters(self) -> None:
+        """Offer chips for the current stations and list the matching ones,
+        e.g. after stations were added or edited."""
+        chips = self.query_one(FilterChips)
+        await chips.set_facets(FilterChips.facets_of(self.station_controller))
+        await self.show_stations()
+
+    async def show_stations(self) -> None:
+        """List the stations matching the active filter chips."""
+        selected = self.query_one(FilterChips).selected
+        bitrates = selected.get("bitrate")
+        stations = self.station_controller.filter_stations(
+            tags=selected.get("tag", set()),
+            countries=selected.get("country", set()),
+            codecs=selected.get("codec", set()),
+            min_bitrate=min(bitrates) if bitrates else None,
+        )
+        stations_list = self.query_one("#stations", ListView)
+        index = stations_list.index
+        await stations_list.clear()
+        await stations_list.extend([station_to_dom_node(s) for s in stations])
+        if self.selected_station in stations:
+            index = stations.index(self.selected_station)
+            stations_list.children[index].add_class("-selected")
+        if stations:
+            stations_list.index = min(index or 0, len(stations) - 1)
+        if selected:
+            total = len(self.station_controller.get_stations())
+            self.update_status(f"{len(stations)} of {total} stations")
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
@@ -124,13 +171,22 @@ class MainScreen(Screen):
 
     async def on_list_view_selected(self, event: ListView.Selected) -> None:
         """Handle station selection."""
-        self.selected_station = event.item.station
+        # Traced from the key press, including the wait for this handler
+        with trace.span("select station", event.time, station=event.item.station.name):
+            await self.play_selected(event.item)
+
+    async def play_selected(self, item: ListItem) -> None:
+        self.selected_station = item.station
         self.query("#stations > ListItem").remove_class("-selected")
-        event.item.add_class("-selected")
+        item.add_class("-selected")
         if self.player_controller.is_playing:
-            await self.player_controller.stop_playback()
+            with trace.span("stop_playback"):
+                await self.player_controller.stop_playback()
         try:
-            await self.player_controller.start_playback(self.selected_station.url)
+            with trace.span("start_playback"):
+                await self.player_controller.start_playback(
+                    self.selected_station.url, self.selected_station
+                )
         except Exception as e:
             self.notify("Some error happened, see log", title="Error", severity="error")
             self.app.log_controller.log(
@@ -139,6 +195,7 @@ class MainScreen(Screen):
             )
         else:
             self.update_status(f"Now playing: {self.selected_station.name}")
+            trace.instant("status update")
 
     def update_volume(self, volume: int) -> None:
         """Update the volume progress bar."""
@@ -152,6 +209,24 @@ class MainScreen(Screen):
         else:
             status_bar.update("No station playing")
 
+    def show_title(self, title: str) -> None:
+        """Show the stream title announced by the station."""
+        if self.selected_station and self.player_controller.is_playing:
+            self.update_status(f"Now playing: {self.selected_station.name} - {title}")
+
+    def show_recovery(self, station: Station | None) -> None:
+        """Reflect a reconnect or fallback switch after dead air."""
+        if not self.player_controller.is_playing:
+            self.update_status("Playback stopped (see log)")
+            return
+        if station is not None and station is not self.selected_station:
+            self.selected_station = station
+            self.query("#stations > ListItem").remove_class("-selected")
+            # The filter chips may be hiding it
+            self.query(f"#station-{station.id}").add_class("-selected")
+        if self.selected_station:
+            self.update_status(f"Now playing: {self.selected_station.name}")
+
     def selected_station_by_id(self, station_id: int) -> None:
         """Set the selected station by ID."""
         station_list = self.query_one("#stations", ListView).remove_class("-selected")
@@ -161,43 +236,39 @@ class MainScreen(Screen):
         station_list.index = station_list.children.index(target_station)
         station_list.action_select_cursor()
 
-    def measure_latency(self, url: str) -> float:
-        """Measure network latency to the station server."""
-        try:
-            parsed = urlparse(url)
-            host = parsed.netloc
-            if not host:
-                return 0.0
-
-            start_time = time.time()
-            _ = requests.head(url, timeout=2)
-            latency = (time.time() - start_time) * 1000
-            return latency
-        except Exception:
-            return 999.0
-
     async def update_latency(self) -> None:
-        """Update latency display with actual network measurement."""
-        if not self.selected_station or not self.player_controller.is_playing:
-            self.query_one("#latency_digits", Label).update("0000")
-            return
-
-        # Run the network request in a thread pool to avoid blocking
-        with ThreadPoolExecutor() as executor:
-            latency = await asyncio.get_event_loop().run_in_executor(
-                executor, self.measure_latency, self.selected_station.url
+        """Show how far playback is behind the live stream, per stage in the
+        tooltip."""
+        label = self.query_one("#latency_digits", Label)
+        stats = {}
+        if self.player_controller.is_playing:
+            # A worker process answers over a pipe; keep that off the UI loop
+            stats = await asyncio.get_running_loop().run_in_executor(
+                None, self.player_controller.stats
             )
+        if "latency_ms" not in stats:
+            label.update("--")
+            label.tooltip = None
+            return
 
-        value = str(int(latency)).zfill(4) if latency < 1000 else ">999"
-        label = self.query_one("#latency_digits", Label)
-        label.update(value)
+        latency = stats["latency_ms"]
+        label.update(
+            f"{latency:.0f} ms" if latency < 10000 else f"{latency / 1000:.0f} s"
+        )
+        label.tooltip = "\n".join(
+            f"{stage}: {'-' if ms is None else f'{ms:.0f} ms'}"
+            for stage, ms in stats["latency_stages_ms"].items()
+        )
 
     async def update_spectrum(self) -> None:
         """Update spectrum visualization."""
-        audio_data = self.player_controller.get_current_audio_data()
         spectrum = self.query_one(SpectrumVisualizer)
-        if audio_data is not None:
-            spectrum.update_spectrum(audio_data)
+        levels = self.player_controller.get_levels()
+        # Only fetch PCM for the FFT when a new block has been played
+        audio_data = None
+        if levels.sequence != spectrum.sequence:
+            audio_data = self.player_controller.get_current_audio_data()
+        spectrum.update_spectrum(audio_data, levels)
 
     CSS = """
     #main {
@@ -272,17 +343,14 @@ class MainScreen(Screen):
         background: $accent;
         color: $text;
     }
-    #sparkline_box {
+    #spectrum_box {
         border: solid $primary;
-        height: 3;
+        height: 5;
         margin: 0 1;
         padding: 0 1;
-        width: 20%;
+        width: 1fr;
     }
-    #sparkline > .sparkline--max-color {
-        color: $accent;
-    }
-    #sparkline > .sparkline--min-color {
-        color: $accent 20%;
+    #spectrum {
+        height: 3;
     }
     """
@@ -1,9 +1,17 @@
 from textual.app import ComposeResult
 from textual.screen import ModalScreen
-from textual.widgets import Button, Label, Select
+from textual.widgets import Button, Label, Select, SelectionList
 from textual.containers import Horizontal, Vertical
 from textual.theme import BUILTIN_THEMES
-from terminal_radio.controllers.options import OptionsController
+from terminal_radio.controllers.decoders import available_decoders
+from terminal_radio.controllers.dsp import DSP_PRESETS
+from terminal_radio.controllers.latency import (
+    CUSTOM_PROFILE,
+    LATENCY_PROFILES,
+    get_latency_profile,
+    measure_effective_latency,
+)
+from terminal_radio.controllers.options import NoAudioDeviceError, OptionsController
 from terminal_radio.events.config import ConfigUpdated
 
 
@@ -11,14 +19,54 @@ class OptionsScreen(ModalScreen):
     """Screen for adding a new station."""
 
     CONFIG_UPDATED_EVENT = ConfigUpdated
+    TIMESHIFT_CHOICES = [
+        ("Off", 0),
+        ("1 minute", 1),
+        ("5 minutes", 5),
+        ("15 minutes", 15),
+        ("30 minutes", 30),
+        ("60 minutes", 60),
+    ]
+    AUDIO_ENGINE_CHOICES = [
+        ("In UI process", False),
+        ("Worker process", True),
+    ]
+    OUTPUT_SINK_CHOICES = [
+        ("Sound device", "sounddevice"),
+        ("Discard (null)", "null"),
+        ("WAV file", "wav"),
+    ]
+    MIRROR_START_CHOICES = [
+        ("Race all mirrors", "race"),
+        ("One at a time", "sequential"),
+    ]
+    DEAD_AIR_CHOICES = [
+        ("Off", 0),
+        ("10 seconds", 10),
+        ("15 seconds", 15),
+        ("30 seconds", 30),
+        ("60 seconds", 60),
+    ]
+    JITTER_BUFFER_CHOICES = [
+        ("Off", 0),
+        ("Up to 2 seconds", 2000),
+        ("Up to 5 seconds", 5000),
+        ("Up to 10 seconds", 10000),
+    ]
 
     def __init__(self, *args, options_controller: OptionsController, **kwargs):
         super().__init__(*args, **kwargs)
         self.options_controller = options_controller
 
     def compose(self) -> ComposeResult:
-        device_options = self.options_controller.get_available_devices()
+        try:
+            device_options = self.options_controller.get_available_devices()
+        except NoAudioDeviceError:
+            # Without sound hardware the null and wav sinks can still play
+            device_options = []
         current_device = self.options_controller.options.output_device
+        extra_devices = self.options_controller.options.extra_output_devices
+        decoders = available_decoders()
         layout = Vertical(
             Vertical(
                 Horizontal(
@@ -31,12 +79,23 @@ class OptionsScreen(ModalScreen):
                         classes="config-part",
                         name="output_device",
                         value=current_device
-                        if current_device is not None
+                        if any(index == current_device for _, index in device_options)
                         else Select.BLANK,
                         disabled=not device_options,
                     ),
                     classes="button-box",
                 ),
+                Horizontal(
+                    Label("Also play on"),
+                    SelectionList[int](
+                        *[
+                            (name, index, index in extra_devices)
+                            for name, index in device_options
+                        ],
+                        id="extra_output_devices",
+                    ),
+                    classes="button-box",
+                ),
                 Horizontal(
                     Label("Theme"),
                     Select(
@@ -47,6 +106,109 @@ class OptionsScreen(ModalScreen):
                     ),
                     classes="button-box",
                 ),
+                Horizontal(
+                    Label("Time-shift"),
+                    Select(
+                        self.TIMESHIFT_CHOICES,
+                        name="timeshift_minutes",
+                        value=self.options_controller.options.timeshift_minutes,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Latency"),
+                    Select(
+                        self.latency_choices(),
+                        name="latency_profile",
+                        value=self.options_controller.options.latency_profile,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Decoder"),
+                    Select(
+                        [(name, name) for name in decoders],
+                        name="decoder",
+                        value=(
+                            self.options_controller.options.decoder
+                            if self.options_controller.options.decoder in decoders
+                            else decoders[0]
+                        ),
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Audio engine"),
+                    Select(
+                        self.AUDIO_ENGINE_CHOICES,
+                        name="audio_process",
+                        value=self.options_controller.options.audio_process,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Audio output"),
+                    Select(
+                        self.OUTPUT_SINK_CHOICES,
+                        name="output_sink",
+                        value=self.options_controller.options.output_sink,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Sound processing"),
+                    Select(
+                        [(name, name) for name in self.dsp_presets()],
+                        name="dsp_preset",
+                        value=self.options_controller.options.dsp_preset,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Station mirrors"),
+                    Select(
+                        self.MIRROR_START_CHOICES,
+                        name="mirror_start",
+                        value=self.options_controller.options.mirror_start,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Dead air reconnect"),
+                    Select(
+                        self.dead_air_choices(),
+                        name="dead_air_seconds",
+                        value=self.options_controller.options.dead_air_seconds,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
+                Horizontal(
+                    Label("Jitter buffer"),
+                    Select(
+                        self.jitter_buffer_choices(),
+                        name="jitter_buffer_max_ms",
+                        value=self.options_controller.options.jitter_buffer_max_ms,
+                        allow_blank=False,
+                        classes="config-part",
+                    ),
+                    classes="button-box",
+                ),
             ),
             Horizontal(
                 Button("Save", variant="success", id="save"),
@@ -58,12 +220,47 @@ class OptionsScreen(ModalScreen):
         layout.border_title = "Options"
         yield layout
 
+    def latency_choices(self) -> list[tuple[str, str]]:
+        """Profile choices labelled with their measured effective latency."""
+        options = self.options_controller.options
+        choices = []
+        for name in [*LATENCY_PROFILES, CUSTOM_PROFILE]:
+            profile = get_latency_profile(name, options.custom_latency)
+            latency = measure_effective_latency(profile, options.output_device)
+            label = f"{name} (~{latency * 1000:.0f} ms)" if latency else name
+            choices.append((label, name))
+        return choices
+
+    def dsp_presets(self) -> list[str]:
+        """Built-in and custom DSP preset names, the current one included."""
+        options = self.options_controller.options
+        names = [*DSP_PRESETS, *options.dsp_presets, options.dsp_preset]
+        return list(dict.fromkeys(names))
+
+    def dead_air_choices(self) -> list[tuple[str, int]]:
+        """Dead air timeouts, including one set by hand in the options file."""
+        current = self.options_controller.options.dead_air_seconds
+        choices = list(self.DEAD_AIR_CHOICES)
+        if current not in dict(choices).values():
+            choices.append((f"{current} seconds", current))
+        return choices
+
+    def jitter_buffer_choices(self) -> list[tuple[str, int]]:
+        """Jitter buffer limits, including one set by hand in the options file."""
+        current = self.options_controller.options.jitter_buffer_max_ms
+        choices = list(self.JITTER_BUFFER_CHOICES)
+        if current not in dict(choices).values():
+            choices.append((f"Up to {current} ms", current))
+        return choices
+
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
         if event.button.id == "save":
             config_parts = self.query(".config-part").results()
+            extra_devices = self.query_one("#extra_output_devices", SelectionList)
             self.options_controller.update_options(
-                **{c.name: c.value or None for c in config_parts}
+                **{c.name: None if c.is_blank() else c.value for c in config_parts},
+                extra_output_devices=list(extra_devices.selected),
             )
             self.app.post_message(self.CONFIG_UPDATED_EVENT())
             self.app.notify(
@@ -93,7 +290,7 @@ class OptionsScreen(ModalScreen):
     }
 
     .button-box {
-        height: 3;
+        height: auto;
         content-align: center middle;
         margin: 1 1;
     }
@@ -102,6 +299,10 @@ class OptionsScreen(ModalScreen):
         content-align: left middle;
         width: 20;
     }
+    .button-box > SelectionList {
+        height: auto;
+        max-height: 6;
+    }
     .button-box > Select {
         height: 3;
         content-align: center middle;
@@ -0,0 +1,106 @@
+from textual.app import ComposeResult
+from textual.containers import HorizontalScroll
+from textual.message import Message
+from textual.widgets import Button
+
+from terminal_radio.controllers.stations import StationController
+
+# Chips offered per attribute, the most common values
+MAX_CHIPS = {"tag": 8, "country": 5, "codec": 4}
+# Minimum bitrates offered, in kbps, where some station reaches them
+BITRATE_STEPS = (64, 128, 256)
+
+
+class FilterChips(HorizontalScroll):
+    """A row of toggle chips narrowing the station list.
+
+    Chips of one attribute widen the selection (any of them matches),
+    chips of different attributes narrow it. Posts ``Changed`` with the
+    active values by attribute whenever a chip is toggled.
+    """
+
+    DEFAULT_CSS = """
+    FilterChips {
+        height: auto;
+        margin: 0 1;
+        scrollbar-size: 0 0;
+    }
+    FilterChips > Button {
+        min-width: 0;
+        height: 1;
+        border: none;
+        margin: 0 1 0 0;
+    }
+    FilterChips > Button.-active {
+        background: $accent;
+    }
+    """
+
+    # Only the chips take focus, not the row scrolling them
+    can_focus = False
+
+    class Changed(Message):
+        """The active chips changed."""
+
+        def __init__(self, selected: dict[str, set]) -> None:
+            self.selected = selected
+            super().__init__()
+
+    def __init__(self, facets: list[tuple[str, str | int]] = (), **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.facets = list(facets)
+        self.selected: dict[str, set] = {}
+
+    @staticmethod
+    def facets_of(controller: StationController) -> list[tuple[str, str | int]]:
+        """Chips worth offering for the stations of ``controller``."""
+        facets = []
+        for name, limit in MAX_CHIPS.items():
+            counts = controller.index.counts(name)
+            facets += [(name, value) for value in list(counts)[:limit]]
+        bitrates = controller.index.counts("bitrate")
+        facets += [
+            ("bitrate", step)
+            for step in BITRATE_STEPS
+            if any(b >= step for b in bitrates)
+        ]
+        return facets
+
+    def compose(self) -> ComposeResult:
+        for name, value in self.facets:
+            label = f"{value}+ kbps" if name == "bitrate" else str(value)
+            chip = Button(label, classes="chip")
+            chip.facet = (name, value)
+            if value in self.selected.get(name, ()):
+                chip.add_class("-active")
+            yield chip
+
+    async def set_facets(self, facets: list[tuple[str, str | int]]) -> None:
+        """Offer other chips, keeping the selection where still offered."""
+        self.facets = list(facets)
+        offered = set(self.facets)
+        selected = {
+            name: {v for v in values if (name, v) in offered}
+            for name, values in self.selected.items()
+        }
+        self.selected = {name: values for name, values in selected.items() if values}
+        await self.remove_children()
+        await self.mount_all(list(self.compose()))
+        self.display = bool(self.facets)
+
+    def on_mount(self) -> None:
+        self.display = bool(self.facets)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        name, value = event.button.facet
+        values = self.selected.setdefault(name, set())
+        if value in values:
+            values.remove(value)
+            event.button.remove_class("-active")
+        else:
+            values.add(value)
+            event.button.add_class("-active")
+        if not values:
+            del self.selected[name]
+        self.post_message(self.Changed({k: set(v) for k, v in self.selected.items()}))
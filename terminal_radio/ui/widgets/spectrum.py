@@ -1,59 +1,275 @@
-from textual.widgets import Sparkline
+from time import monotonic, perf_counter
+
 import numpy as np
+from rich.segment import Segment
+from textual.geometry import Region
+from textual.strip import Strip
+from textual.widget import Widget
+
+from terminal_radio.controllers.metering import LevelMeter, LevelSnapshot
+
+
+class SpectrumVisualizer(Widget):
+    """Multi-row spectrum analyzer with peak hold and a stereo VU meter.
+
+    The bands come from an FFT of the latest output block, the VU meter
+    from its LevelSnapshot. Each update turns the levels into a grid of
+    cells and refreshes only the cells that differ from the previous frame.
+    When analysis takes longer than ``frame_budget`` seconds, following
+    updates are skipped so the UI keeps its frame rate.
+    """
 
+    COMPONENT_CLASSES = {
+        "spectrum--bar",
+        "spectrum--peak",
+        "spectrum--vu",
+        "spectrum--clip",
+    }
 
-class SpectrumVisualizer(Sparkline):
-    """Widget showing audio frequency spectrum."""
+    DEFAULT_CSS = """
+    SpectrumVisualizer {
+        height: 3;
+    }
+    SpectrumVisualizer > .spectrum--bar {
+        color: $accent;
+    }
+    SpectrumVisualizer > .spectrum--peak {
+        color: $warning;
+    }
+    SpectrumVisualizer > .spectrum--vu {
+        color: $success;
+    }
+    SpectrumVisualizer > .spectrum--clip {
+        color: $error;
+    }
+    """
 
+    BLOCKS = " ▁▂▃▄▅▆▇█"
+    PEAK = "▔"
     _FFT_SIZE = 4096
-    _RESAMPLE_SIZE = 9
-
-    def __init__(self, *args, **kwargs):
-        self.plug = np.zeros(self._RESAMPLE_SIZE + 1).tolist()
-        # Calculate logarithmic frequency bands
-        self.freq_bands = np.logspace(
-            np.log10(20),  # Start from 20Hz
-            np.log10(20000),  # Up to 20kHz
-            self._RESAMPLE_SIZE + 1,
-        ).astype(int)
-        super().__init__(
-            data=self.plug,
-            *args,
-            **kwargs,
+    _SAMPLERATE = 44100
+    # Levels at or below these map to an empty bar
+    SPECTRUM_FLOOR_DB = -72.0
+    VU_FLOOR_DB = -48.0
+    # Without new blocks for this long, the meters fall back to silence
+    STALE_SECONDS = 0.2
+
+    def __init__(
+        self,
+        bands: int = 16,
+        peak_hold: float = 1.0,
+        peak_decay: float = 0.6,
+        fall_rate: float = 1.5,
+        vu_meter: bool = True,
+        frame_budget: float = 0.004,
+        **kwargs,
+    ) -> None:
+        """Create the visualizer.
+
+        ``peak_hold`` is how long (seconds) a peak marker stays put before it
+        decays by ``peak_decay`` of the full height per second; bars fall by
+        at most ``fall_rate`` of the full height per second.
+        """
+        super().__init__(**kwargs)
+        self.bands = bands
+        self.peak_hold = peak_hold
+        self.peak_decay = peak_decay
+        self.fall_rate = fall_rate
+        self.vu_meter = vu_meter
+        self.frame_budget = frame_budget
+        meters = bands + (2 if vu_meter else 0)
+        self._levels = np.zeros(meters)
+        self._peaks = np.zeros(meters)
+        self._peak_until = np.zeros(meters)
+        self._clipping = np.zeros(meters, dtype=bool)
+        # Levels the bars move towards, from the latest block
+        self._targets = np.zeros(meters)
+        self._sequence = -1
+        self._clipped_samples = 0
+        self._last_block = 0.0
+        self._last_update: float | None = None
+        self._skip = 0
+        self._analysis: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        # Per screen row: (characters, style name per column) and its strip
+        self._rows: list[tuple[str, tuple[str, ...]]] = []
+        self._strips: dict[int, Strip] = {}
+
+    def _band_edges(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Window and rfft bin edges of the log-spaced bands for ``n`` samples."""
+        if n not in self._analysis:
+            freqs = np.fft.rfftfreq(n, 1 / self._SAMPLERATE)
+            edges = np.searchsorted(
+                freqs, np.logspace(np.log10(20), np.log10(20000), self.bands + 1)
+            )
+            # Every band gets at least one bin, even at small block sizes
+            edges = np.maximum(edges, 1)
+            for i in range(1, len(edges)):
+                edges[i] = max(edges[i], edges[i - 1] + 1)
+            self._analysis[n] = (np.hanning(n), np.minimum(edges[:-1], len(freqs) - 1))
+        return self._analysis[n]
+
+    def _analyze(self, audio_data: np.ndarray) -> np.ndarray:
+        """Levels (0-1) of the spectrum bands."""
+        if len(audio_data) == 0:
+            return np.zeros(self.bands)
+        block = audio_data[-self._FFT_SIZE :]
+        mono = block.mean(axis=1) if block.ndim > 1 else block
+        n = len(mono)
+        window, starts = self._band_edges(n)
+        # A full-scale sine peaks at n / 4 with a Hann window
+        magnitude = np.abs(np.fft.rfft(mono * window)) / (n / 4)
+        db = 20 * np.log10(np.maximum.reduceat(magnitude, starts) + 1e-9)
+        return np.clip(1 - db / self.SPECTRUM_FLOOR_DB, 0.0, 1.0)
+
+    def _vu_levels(self, levels: LevelSnapshot) -> np.ndarray:
+        db = 20 * np.log10(np.array(levels.rms) + 1e-9)
+        return np.clip(1 - db / self.VU_FLOOR_DB, 0.0, 1.0)
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last level snapshot shown."""
+        return self._sequence
+
+    def update_spectrum(
+        self, audio_data: np.ndarray | None, levels: LevelSnapshot | None = None
+    ) -> None:
+        """Update the visualization.
+
+        ``audio_data`` may be None when ``levels`` shows no new block has
+        arrived; the previous analysis is then kept on screen, and dropped
+        once blocks have stopped for ``STALE_SECONDS``.
+        """
+        if self._skip:
+            self._skip -= 1
+            return
+        start = perf_counter()
+        now = monotonic()
+        dt = now - self._last_update if self._last_update is not None else 0.0
+        self._last_update = now
+
+        clipped = np.zeros(len(self._targets), dtype=bool)
+        if audio_data is not None:
+            self._targets[: self.bands] = self._analyze(audio_data)
+        if levels is not None and levels.sequence != self._sequence:
+            self._sequence = levels.sequence
+            self._last_block = now
+            if self.vu_meter:
+                self._targets[self.bands :] = self._vu_levels(levels)
+                if levels.clipped_samples > self._clipped_samples:
+                    clipped[self.bands :] = (
+                        np.array(levels.peak) >= LevelMeter.CLIP_LEVEL
+                    )
+                self._clipped_samples = levels.clipped_samples
+        elif audio_data is None and now - self._last_block > self.STALE_SECONDS:
+            self._targets[:] = 0.0
+
+        targets = self._targets
+        pushed = targets > self._peaks
+        self._levels = np.maximum(targets, self._levels - self.fall_rate * dt)
+        rising = targets >= self._peaks
+        self._peaks = np.where(
+            rising,
+            targets,
+            np.where(
+                now > self._peak_until, self._peaks - self.peak_decay * dt, self._peaks
+            ),
         )
+        self._peak_until[rising] = now + self.peak_hold
+        # A clip indication lasts until the peak marker is next pushed up
+        self._clipping = (self._clipping & ~pushed) | clipped
+        self._peaks = np.clip(self._peaks, 0.0, 1.0)
+        self._repaint()
+
+        cost = perf_counter() - start
+        if cost > self.frame_budget:
+            self._skip = int(cost // self.frame_budget)
+
+    def _columns(self, width: int) -> list[tuple[int, str]]:
+        """Meter index and base style per screen column; -1 is a gap."""
+        vu_width = 3 if self.vu_meter else 0
+        band_width = max(1, (width - vu_width) // self.bands)
+        columns = []
+        for band in range(self.bands):
+            columns += [(band, "spectrum--bar")] * max(1, band_width - 1)
+            if band_width > 1:
+                columns.append((-1, ""))
+        columns = columns[: max(0, width - vu_width)]
+        columns += [(-1, "")] * (width - vu_width - len(columns))
+        if self.vu_meter:
+            columns += [(-1, "")]
+            columns += [(self.bands, "spectrum--vu"), (self.bands + 1, "spectrum--vu")]
+        return columns[:width]
+
+    def _repaint(self) -> None:
+        """Rebuild the cell grid and refresh the spans that changed."""
+        width, height = self.size
+        if not width or not height:
+            return
+        eighths = np.round(self._levels * height * 8).astype(int)
+        peak_rows = np.minimum((self._peaks * height).astype(int), height - 1)
+        show_peak = self._peaks > self._levels + 0.5 / height
+        columns = self._columns(width)
+        if len(self._rows) != height:
+            self._rows = [("", ())] * height
+        for y in range(height):
+            row = height - 1 - y
+            fill = np.clip(eighths - row * 8, 0, 8)
+            chars = []
+            styles = []
+            for meter, style in columns:
+                if meter < 0:
+                    chars.append(" ")
+                    styles.append("")
+                elif fill[meter]:
+                    chars.append(self.BLOCKS[fill[meter]])
+                    styles.append("spectrum--clip" if self._clipping[meter] else style)
+                elif show_peak[meter] and peak_rows[meter] == row:
+                    chars.append(self.PEAK)
+                    styles.append("spectrum--peak")
+                else:
+                    chars.append(" ")
+                    styles.append("")
+            text, style_names = "".join(chars), tuple(styles)
+            old_text, old_styles = self._rows[y]
+            if text == old_text and style_names == old_styles:
+                continue
+            changed = [
+                x
+                for x in range(width)
+                if x >= len(old_text)
+                or text[x] != old_text[x]
+                or style_names[x] != old_styles[x]
+            ]
+            self._rows[y] = (text, style_names)
+            self._strips.pop(y, None)
+            self.refresh(Region(changed[0], y, changed[-1] - changed[0] + 1, 1))
+
+    def render_line(self, y: int) -> Strip:
+        if y >= len(self._rows):
+            return Strip.blank(self.size.width, self.rich_style)
+        if y not in self._strips:
+            text, style_names = self._rows[y]
+            base = self.rich_style
+            segments = []
+            start = 0
+            for x in range(1, len(text) + 1):
+                if x == len(text) or style_names[x] != style_names[start]:
+                    name = style_names[start]
+                    style = base + self.get_component_rich_style(name) if name else base
+                    segments.append(Segment(text[start:x], style))
+                    start = x
+            self._strips[y] = Strip(segments, len(text)).extend_cell_length(
+                self.size.width, base
+            )
+        return self._strips[y]
+
+    def on_resize(self) -> None:
+        self._rows = []
+        self._strips.clear()
+        self._repaint()
+        self.refresh()
 
-    def update_spectrum(self, audio_data: np.ndarray) -> None:
-        """Update spectrum visualization from audio data."""
-        _audio_data = audio_data.copy()
-        if len(_audio_data) == 0:
-            return self.plug
-
-        # Convert stereo to mono if needed
-        if len(_audio_data.shape) > 1:
-            _audio_data = _audio_data.mean(axis=1)
-
-        # Apply window function to reduce spectral leakage
-        window = np.hanning(len(_audio_data[: self._FFT_SIZE]))
-        _audio_data = _audio_data[: self._FFT_SIZE] * window
-
-        # Calculate FFT
-        fft_data = np.fft.fft(_audio_data[: self._FFT_SIZE])
-        # Get magnitude spectrum
-        magnitude = np.abs(fft_data[: self._FFT_SIZE // 2])
-
-        # Calculate frequency bins
-        freqs = np.linspace(0, 44100 // 2, len(magnitude))
-
-        # Group frequencies into logarithmic bands
-        spectrum = []
-        for i in range(len(self.freq_bands) - 1):
-            start = np.searchsorted(freqs, self.freq_bands[i])
-            end = np.searchsorted(freqs, self.freq_bands[i + 1])
-            spectrum.append(float(np.mean(magnitude[start:end])))
-
-        # Apply log scaling to compress dynamic range
-        spectrum = np.log10(np.array(spectrum) + 1)
-        # Normalize
-        max_val = float(max(spectrum)) if max(spectrum) > 0 else 1.0
-        spectrum = [max(0.0, min(float(value) / max_val, 1.0)) for value in spectrum]
-        self.data = spectrum
+    def notify_style_update(self) -> None:
+        super().notify_style_update()
+        # Theme changes alter the component styles baked into the strips
+        self._strips.clear()
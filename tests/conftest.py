@@ -0,0 +1,16 @@
+import json
+
+import pytest
+
+from terminal_radio.controllers.options import OptionsController
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """A fresh config directory playing to the null sink."""
+    monkeypatch.setattr(OptionsController, "DEFAULT_CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(
+        OptionsController, "DEFAULT_CONFIG_PATH", tmp_path / "options.json"
+    )
+    (tmp_path / "options.json").write_text(json.dumps({"output_sink": "null"}))
+    return tmp_path
@@ -0,0 +1,26 @@
+import asyncio
+import json
+
+from textual.widgets import ListView
+
+from terminal_radio.app import RadioPlayerApp
+
+STATIONS = [
+    {"id": 1, "name": "One", "url": "http://one", "tags": ["rock"], "country": "DE"},
+    {"id": 2, "name": "Two", "url": "http://two", "tags": ["jazz"], "codec": "mp3"},
+]
+
+
+def test_station_list_has_initial_focus(config_dir):
+    (config_dir / "stations.json").write_text(json.dumps(STATIONS))
+
+    async def run():
+        app = RadioPlayerApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert app.screen.query_one("#filter_chips").display
+            assert app.focused is app.screen.query_one("#stations", ListView)
+            await pilot.press("down")
+            assert app.focused.index == 0
+
+    asyncio.run(run())
@@ -0,0 +1,68 @@
+import asyncio
+import wave
+
+import numpy as np
+import pytest
+
+from terminal_radio.controllers.decoders import available_decoders
+from terminal_radio.controllers.latency import get_latency_profile
+from terminal_radio.controllers.options import Options
+from terminal_radio.controllers.player import PlayerController
+from terminal_radio.controllers.sinks import CaptureSink
+
+SAMPLERATE = 44100
+# A constant signal, so every frame shows the gain applied to it
+LEVEL = 0.25
+PROFILE = "low-latency"
+
+
+@pytest.fixture
+def constant_wav(tmp_path):
+    path = tmp_path / "constant.wav"
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(2)
+        file.setsampwidth(2)
+        file.setframerate(SAMPLERATE)
+        file.writeframes(np.full((10 * SAMPLERATE, 2), LEVEL * 32768, "<i2").tobytes())
+    return path
+
+
+async def volume_zero(controller: PlayerController) -> None:
+    await controller.set_volume(0)
+
+
+async def mute(controller: PlayerController) -> None:
+    await controller.toggle_mute()
+
+
+@pytest.mark.parametrize("control", [volume_zero, mute])
+def test_control_reaches_output_within_a_period(config_dir, constant_wav, control):
+    period = get_latency_profile(PROFILE).device_blocksize
+    decoder = "pyav" if "pyav" in available_decoders() else "ffmpeg"
+    sink = CaptureSink()
+
+    async def run() -> np.ndarray:
+        controller = PlayerController(
+            Options(latency_profile=PROFILE, decoder=decoder), sink=sink
+        )
+        try:
+            assert await controller.start_playback(str(constant_wav))
+            await controller.set_volume(100)
+            await asyncio.sleep(0.5)
+            issued = len(sink.frames())
+            await control(controller)
+            await asyncio.sleep(0.2)
+            return sink.frames()[issued:, 0]
+        finally:
+            await controller.cleanup()
+
+    output = asyncio.run(run())
+    # The period in flight when the control came may still play at full
+    # level; the next one fades out
+    falling = output < LEVEL - 1e-5
+    assert falling.any()
+    fading = int(np.argmax(falling))
+    assert fading <= period
+    loud = np.flatnonzero(np.abs(output) > 1e-4)
+    assert loud[-1] + 1 - fading <= period
+    assert not output[loud[-1] + 1 :].any()